@@ -0,0 +1,116 @@
+import asyncio
+import time
+import tracemalloc
+from collections.abc import AsyncIterator, Callable, Coroutine
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+import httpx
+from rss_parser import AtomParser
+
+from twittergram.infrastructure.adapters.rss_reader import ElementTreeRssReader
+
+_ENTRIES = 2000
+_CHUNK_SIZE = 64 * 1024
+
+
+def _build_feed(entries: int) -> bytes:
+    newest = datetime(2025, 1, 1, tzinfo=UTC)
+    body = "".join(
+        f"""
+  <entry>
+    <id>tag:example.org,2025:changes/{index}</id>
+    <title>Change {index}</title>
+    <link rel="alternate" href="https://example.org/changes/{index}"/>
+    <updated>{(newest - timedelta(hours=index)).isoformat()}</updated>
+    <summary>{"Something changed. " * 20}</summary>
+  </entry>"""
+        for index in range(entries)
+    )
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <id>tag:example.org,2025:changes</id>
+  <title>Changelog</title>
+  <updated>{newest.isoformat()}</updated>{body}
+</feed>
+""".encode()
+
+
+_FEED = _build_feed(_ENTRIES)
+
+
+async def _read_element_tree() -> int:
+    async def _chunks() -> AsyncIterator[bytes]:
+        for start in range(0, len(_FEED), _CHUNK_SIZE):
+            yield _FEED[start : start + _CHUNK_SIZE]
+
+    reader = ElementTreeRssReader(
+        "https://example.org/feed.atom",
+        httpx.AsyncClient(
+            transport=httpx.MockTransport(
+                lambda request: httpx.Response(200, content=_chunks())
+            )
+        ),
+    )
+    async with reader.list_items(None) as listing:
+        return len([item async for item in listing.items])
+
+
+async def _read_rss_parser() -> int:
+    # What parsing with rss_parser on the event loop would take
+    feed = AtomParser.parse(_FEED.decode())
+    return len(feed.feed.content.entries)
+
+
+def _measure(
+    read: Callable[[], Coroutine[Any, Any, int]],
+) -> tuple[int, float, int, float]:
+    """
+    :return: the number of entries, the seconds and peak bytes reading took, and the
+      longest time the event loop was blocked
+    """
+    stall = 0.0
+
+    async def _run() -> int:
+        nonlocal stall
+        task = asyncio.create_task(read())
+        last = time.perf_counter()
+        while not task.done():
+            await asyncio.sleep(0)
+            now = time.perf_counter()
+            stall = max(stall, now - last)
+            last = now
+        return task.result()
+
+    tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        count = asyncio.run(_run())
+        seconds = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return count, seconds, peak, stall
+
+
+def test_atom_benchmark(report):
+    results = {
+        "element_tree": _measure(_read_element_tree),
+        "rss_parser": _measure(_read_rss_parser),
+    }
+
+    report(
+        f"Reading {_ENTRIES} Atom entries ({len(_FEED)} bytes):",
+        *(
+            f"{name:>12}: {seconds * 1000:.0f} ms, peak {peak / 2**20:.1f} MB,"
+            f" event loop blocked for up to {stall * 1000:.0f} ms"
+            for name, (_, seconds, peak, stall) in results.items()
+        ),
+    )
+
+    element_tree = results["element_tree"]
+    rss_parser = results["rss_parser"]
+    assert element_tree[0] == rss_parser[0] == _ENTRIES
+    assert element_tree[2] < rss_parser[2]
+    assert element_tree[3] < rss_parser[3]
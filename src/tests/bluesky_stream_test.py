@@ -0,0 +1,326 @@
+import asyncio
+import json
+import time
+from collections.abc import AsyncIterable, Callable
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+import httpx
+from websockets.asyncio.server import ServerConnection, serve
+
+from twittergram.application.model import (
+    BlueskyPost,
+    BlueskyState,
+    MediaFile,
+    Medium,
+)
+from twittergram.application.ports import BlueskyReader, TelegramUploader
+from twittergram.application.repos import StateRepo
+from twittergram.application.use_cases import StreamBlueskyPosts
+from twittergram.infrastructure.adapters.bluesky_reader import (
+    JetstreamBlueskyStream,
+    ReplayBlueskyStream,
+)
+from twittergram.infrastructure.adapters.html_sanitizer import NaiveHtmlSanitizer
+from twittergram.infrastructure.adapters.media_downloader import (
+    DownloaderRegistry,
+    DownloadLimits,
+    DownloadWorkspace,
+    LimitedDownloadScheduler,
+)
+
+_DID = "did:plc:author"
+_TIMEOUT = 5.0
+_START = datetime(2025, 1, 1, tzinfo=UTC)
+
+
+class _FakeUploader(TelegramUploader):
+    def __init__(self) -> None:
+        self.captions: list[str | None] = []
+
+    async def send_text_message(self, text: str, use_html: bool = False) -> None:
+        self.captions.append(text)
+
+    async def send_documents_message(
+        self,
+        documents: list[MediaFile],
+        *,
+        caption: str | None,
+        use_html: bool = False,
+        disable_notification: bool = False,
+    ) -> None:
+        self.captions.append(caption)
+
+    async def send_image_message(
+        self,
+        image_files: list[MediaFile],
+        caption: str | None,
+        use_html: bool = False,
+    ) -> None:
+        self.captions.append(caption)
+
+    @property
+    def sends_by_url(self) -> bool:
+        return True
+
+    async def send_image_urls_message(
+        self,
+        images: list[Medium],
+        caption: str | None,
+        use_html: bool = False,
+    ) -> bool:
+        self.captions.append(caption)
+        return True
+
+    async def close(self) -> None:
+        pass
+
+
+class _FakeReader(BlueskyReader):
+    def __init__(self, posts: list[BlueskyPost]) -> None:
+        self.posts = posts
+        self.reads = 0
+
+    def save_session(self) -> str | None:
+        return None
+
+    def restore_session(self, session: str) -> None:
+        pass
+
+    async def list_posts(self) -> AsyncIterable[BlueskyPost]:
+        self.reads += 1
+        for post in reversed(self.posts):
+            yield post
+
+
+def _created_at(number: int) -> datetime:
+    return _START + timedelta(minutes=number)
+
+
+def _post(number: int) -> BlueskyPost:
+    return BlueskyPost(
+        created_at=_created_at(number),
+        id=f"cid{number}",
+        text=f"Post {number}",
+        images=[],
+        url=None,
+    )
+
+
+def _event(
+    number: int,
+    time_us: int,
+    *,
+    did: str = _DID,
+    operation: str = "create",
+    collection: str = "app.bsky.feed.post",
+    **record: Any,
+) -> dict[str, Any]:
+    return {
+        "did": did,
+        "time_us": time_us,
+        "kind": "commit",
+        "commit": {
+            "rev": str(number),
+            "operation": operation,
+            "collection": collection,
+            "rkey": str(number),
+            "record": {
+                "$type": collection,
+                "createdAt": _created_at(number).isoformat(),
+                "text": f"Post {number}",
+                **record,
+            },
+            "cid": f"cid{number}",
+        },
+    }
+
+
+def _write_events(path: Path, events: list[dict[str, Any]]) -> None:
+    path.write_text("".join(f"{json.dumps(event)}\n" for event in events))
+
+
+async def _wait_for(condition: Callable[[], bool]) -> None:
+    async with asyncio.timeout(_TIMEOUT):
+        while not condition():
+            await asyncio.sleep(0.01)
+
+
+def test_replay_yields_new_posts_of_author(tmp_path):
+    path = tmp_path / "events.jsonl"
+    image = {"$type": "blob", "ref": {"$link": "image"}, "mimeType": "image/jpeg"}
+    reply: dict[str, Any] = {"root": {}, "parent": {}}
+    _write_events(
+        path,
+        [
+            _event(1, 10),
+            _event(2, 20),
+            _event(3, 30, reply=reply),
+            _event(4, 40, collection="app.bsky.feed.repost"),
+            _event(5, 50, operation="delete"),
+            _event(6, 60, did="did:plc:other"),
+            {"did": _DID, "time_us": 70, "kind": "identity", "identity": {}},
+            _event(
+                8,
+                80,
+                embed={
+                    "$type": "app.bsky.embed.images",
+                    "images": [{"alt": "", "image": image}],
+                },
+            ),
+            _event(
+                9,
+                90,
+                embed={
+                    "$type": "app.bsky.embed.external",
+                    "external": {"uri": "https://example.com", "title": "Example"},
+                },
+            ),
+        ],
+    )
+    stream = ReplayBlueskyStream(path, _DID)
+
+    async def _read(cursor: int | None) -> list[Any]:
+        async with stream.open(cursor) as events:
+            return [event async for event in events]
+
+    events = asyncio.run(_read(20))
+
+    assert [event.cursor for event in events] == [20, 80, 90]
+    assert [event.post.id for event in events] == ["cid2", "cid8", "cid9"]
+    assert events[0].post.created_at == _created_at(2)
+    assert events[0].post.text == "Post 2"
+    [medium] = events[1].post.images
+    assert medium.id == "image"
+    assert httpx.URL(medium.url).params["did"] == _DID
+    url = events[2].post.url
+    assert url is not None
+    assert (url.url, url.title) == ("https://example.com", "Example")
+
+    # Without a cursor, only posts from now on are received
+    assert asyncio.run(_read(None)) == []
+
+
+def test_jetstream_subscribes_to_author_since_cursor():
+    paths: list[str] = []
+
+    async def _handle(websocket: ServerConnection) -> None:
+        request = websocket.request
+        assert request is not None
+        paths.append(request.path)
+        await websocket.send(json.dumps(_event(1, 10, did="did:plc:other")))
+        await websocket.send(json.dumps(_event(2, 20)))
+
+    async def _read() -> list[str]:
+        async with serve(_handle, "127.0.0.1", 0) as server:
+            port = next(iter(server.sockets)).getsockname()[1]
+            async with httpx.AsyncClient() as client:
+                stream = JetstreamBlueskyStream(
+                    _DID,
+                    f"ws://127.0.0.1:{port}/subscribe",
+                    client,
+                )
+                async with stream.open(15) as events:
+                    return [event.post.id async for event in events]
+
+    assert asyncio.run(_read()) == ["cid2"]
+
+    params = httpx.URL(paths[0]).params
+    assert params["wantedCollections"] == "app.bsky.feed.post"
+    assert params["wantedDids"] == _DID
+    assert params["cursor"] == "15"
+
+
+def _create_use_case(
+    tmp_path: Path,
+    reader: BlueskyReader,
+    stream: ReplayBlueskyStream,
+    state_repo: StateRepo,
+    uploader: TelegramUploader,
+) -> StreamBlueskyPosts:
+    workspace = DownloadWorkspace(tmp_path / "work", quota=0, max_age=timedelta())
+    return StreamBlueskyPosts(
+        download_scheduler=LimitedDownloadScheduler(
+            DownloaderRegistry([]),
+            DownloadLimits(concurrency=1, host_concurrency=1),
+            workspace,
+        ),
+        media_workspace=workspace,
+        sanitizer=NaiveHtmlSanitizer(),
+        reader=reader,
+        state_repo=state_repo,
+        uploader=uploader,
+        stream=stream,
+    )
+
+
+def _run_until(use_case: StreamBlueskyPosts, condition: Callable[[], bool]) -> None:
+    async def _run() -> None:
+        task = asyncio.create_task(use_case())
+        try:
+            await _wait_for(condition)
+        finally:
+            task.cancel()
+
+    asyncio.run(_run())
+
+
+def test_stream_bluesky_posts_resumes_from_cursor(tmp_path, state_repo):
+    now = time.time_ns() // 1000
+    path = tmp_path / "events.jsonl"
+    _write_events(path, [_event(number, now + number) for number in range(1, 5)])
+    reader = _FakeReader([])
+    uploader = _FakeUploader()
+    state_repo.states[BlueskyState] = BlueskyState(
+        session=None,
+        last_post_id="cid2",
+        last_post_time=_created_at(2),
+        cursor=now + 2,
+    )
+    use_case = _create_use_case(
+        tmp_path,
+        reader,
+        ReplayBlueskyStream(path, _DID),
+        state_repo,
+        uploader,
+    )
+
+    _run_until(use_case, lambda: len(uploader.captions) == 2)
+
+    assert uploader.captions == ["Post 3", "Post 4"]
+    state = state_repo.states[BlueskyState]
+    assert state.last_post_id == "cid4"
+    assert state.cursor == now + 4
+    # The stream still holds the posts since the cursor
+    assert reader.reads == 0
+
+
+def test_stream_bluesky_posts_catches_up_without_cursor(tmp_path, state_repo):
+    # The events are received after subscribing, which is now
+    later = time.time_ns() // 1000 + 10**6
+    path = tmp_path / "events.jsonl"
+    _write_events(path, [_event(2, later), _event(3, later + 1)])
+    reader = _FakeReader([_post(1), _post(2)])
+    uploader = _FakeUploader()
+    state_repo.states[BlueskyState] = BlueskyState(
+        session=None,
+        last_post_id="cid0",
+        last_post_time=_created_at(0),
+    )
+    use_case = _create_use_case(
+        tmp_path,
+        reader,
+        ReplayBlueskyStream(path, _DID),
+        state_repo,
+        uploader,
+    )
+
+    _run_until(use_case, lambda: len(uploader.captions) == 3)
+
+    # The post read while catching up isn't forwarded twice
+    assert uploader.captions == ["Post 1", "Post 2", "Post 3"]
+    state = state_repo.states[BlueskyState]
+    assert state.last_post_id == "cid3"
+    assert state.cursor == later + 1
+    assert reader.reads == 1
@@ -1,7 +1,7 @@
 import pytest
 from bs_config import Env
 
-from twittergram.config import RssConfig, RssOrder
+from twittergram.config import ConfigMapStateConfig, RssConfig, RssOrder, StateConfig
 
 
 @pytest.mark.parametrize(
@@ -16,3 +16,44 @@ def test_rss_config(value, order):
     config = RssConfig.from_env(env)
     assert config
     assert config.order == order
+
+
+def test_rss_config_options():
+    env = Env.load_from_dict({"FEED_URL": "https://example.org"})
+    config = RssConfig.from_env(
+        env,
+        {"feed-url": "https://example.com", "order": "chronological"},
+    )
+    assert config
+    assert config.feed_urls == ["https://example.com"]
+    assert config.order == RssOrder.CHRONOLOGICAL
+
+
+def test_rss_config_feed_urls():
+    env = Env.load_from_dict(
+        {"FEED_URL": "https://example.org/a.xml\n  https://example.org/b.xml"}
+    )
+    config = RssConfig.from_env(env)
+    assert config
+    assert config.feed_urls == [
+        "https://example.org/a.xml",
+        "https://example.org/b.xml",
+    ]
+
+
+def test_state_config_for_instance():
+    config = StateConfig(
+        type="file",
+        config_map=ConfigMapStateConfig(
+            namespace="default",
+            name_prefix="state",
+            name_suffix=None,
+        ),
+        state_file="state/rss.json",
+    )
+
+    instance_config = config.for_instance("signal")
+
+    assert instance_config.state_file == "state/rss-signal.json"
+    assert instance_config.config_map
+    assert instance_config.config_map.name_suffix == "signal"
@@ -0,0 +1,347 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+from collections import Counter
+from collections.abc import AsyncIterator, Callable, Iterator
+from pathlib import Path
+from typing import Any
+
+import httpx
+import pytest
+
+from twittergram.application.model import State
+from twittergram.application.repos import StateRepo
+
+
+def run_python(*args: str) -> subprocess.CompletedProcess[str]:
+    """
+    Runs a fresh interpreter that can import the package, so measurements don't
+    include what the tests have imported already.
+    """
+    paths = [str(Path(__file__).parents[1]), os.getenv("PYTHONPATH")]
+    return subprocess.run(
+        [sys.executable, *args],
+        capture_output=True,
+        check=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(p for p in paths if p)},
+    )
+
+
+@pytest.fixture
+def report(capsys: pytest.CaptureFixture[str]) -> Callable[[str], None]:
+    """
+    Prints benchmark results, which are shown even though the output is captured.
+    """
+
+    def _report(*lines: str) -> None:
+        with capsys.disabled():
+            print("", *lines, sep="\n")
+
+    return _report
+
+
+class MemoryStateRepo(StateRepo):
+    def __init__(self) -> None:
+        self.states: dict[type, Any] = {}
+
+    async def load_state[T: State](self, state_type: type[T]) -> T:
+        return self.states.get(state_type) or state_type.initial()
+
+    async def store_state[T: State](self, state: T) -> None:
+        self.states[type(state)] = state
+
+    async def close(self) -> None:
+        pass
+
+
+@pytest.fixture
+def state_repo() -> MemoryStateRepo:
+    return MemoryStateRepo()
+
+
+_BOT_USER = {
+    "id": 1,
+    "is_bot": True,
+    "first_name": "Twittergram",
+    "username": "twittergram_bot",
+}
+
+
+def _message(chat_id: int, **content: Any) -> dict[str, Any]:
+    return {
+        "message_id": 1,
+        "date": 0,
+        "chat": {"id": chat_id, "type": "private"},
+        **content,
+    }
+
+
+def _file(file_id: str, **attributes: Any) -> dict[str, Any]:
+    return {
+        "file_id": file_id,
+        "file_unique_id": file_id,
+        "file_size": 1,
+        **attributes,
+    }
+
+
+class FakeBotApi:
+    """
+    A minimal Telegram Bot API server speaking HTTP/1.1 with keep-alive. It counts
+    the connections it accepted, the API methods it was asked to execute and the
+    requests that uploaded files.
+    """
+
+    def __init__(self) -> None:
+        self.connections = 0
+        self.requests: Counter[str] = Counter()
+        self.uploads = 0
+        self.received_bytes = 0
+        self.port = 0
+        self._loop = asyncio.new_event_loop()
+        self._server: asyncio.Server | None = None
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/bot"
+
+    def start(self) -> None:
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._start(), self._loop).result()
+
+    async def _start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    def stop(self) -> None:
+        async def _stop() -> None:
+            if self._server is not None:
+                self._server.close()
+
+        asyncio.run_coroutine_threadsafe(_stop(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    async def _read_body(
+        self,
+        reader: asyncio.StreamReader,
+        headers: dict[str, str],
+    ) -> None:
+        if headers.get("transfer-encoding") == "chunked":
+            while True:
+                size = int((await reader.readline()).strip(), 16)
+                self.received_bytes += size
+                await reader.readexactly(size + 2)
+                if size == 0:
+                    return
+
+        remaining = int(headers.get("content-length", "0"))
+        self.received_bytes += remaining
+        while remaining:
+            chunk = await reader.read(min(remaining, 65536))
+            if not chunk:
+                raise EOFError
+            remaining -= len(chunk)
+
+    async def _handle(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ) -> None:
+        self.connections += 1
+        try:
+            while request_line := await reader.readline():
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b""):
+                    key, _, value = line.decode().partition(":")
+                    headers[key.strip().lower()] = value.strip()
+
+                await self._read_body(reader, headers)
+
+                method = request_line.split()[1].decode().rsplit("/", 1)[-1]
+                self.requests[method] += 1
+                if headers.get("content-type", "").startswith("multipart/"):
+                    self.uploads += 1
+                body = json.dumps({"ok": True, "result": self._result(method)})
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\n"
+                    b"Content-Type: application/json\r\n"
+                    + f"Content-Length: {len(body)}\r\n\r\n".encode()
+                    + body.encode()
+                )
+                await writer.drain()
+        except (ConnectionError, EOFError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _result(method: str) -> Any:
+        match method:
+            case "getMe":
+                return _BOT_USER
+            case "sendPhoto":
+                return _message(1, photo=[_file("photo", width=1, height=1)])
+            case "sendVideo":
+                video = _file("video", width=1, height=1, duration=1)
+                return _message(1, video=video)
+            case "sendDocument":
+                return _message(1, document=_file("document"))
+            case "sendMediaGroup":
+                return [_message(1, text="")]
+            case _:
+                return _message(1, text="")
+
+
+@pytest.fixture
+def fake_bot_api() -> Iterator[FakeBotApi]:
+    api = FakeBotApi()
+    api.start()
+    yield api
+    api.stop()
+
+
+class FakeMastodonApi:
+    """
+    Serves the public toots of a single account like the Mastodon REST API does,
+    newest first and paginated with Link headers. It counts the requested pages.
+    New toots are posted to the user streams, which are served as server-sent
+    events from a separate streaming host.
+    """
+
+    account_name = "user@mastodon.example"
+    streaming_host = "streaming.mastodon.example"
+    user_id = 1
+
+    def __init__(self, toots: int, page_latency: float = 0) -> None:
+        self.toots = toots
+        self.page_latency = page_latency
+        self.pages = 0
+        self.lookups = 0
+        self.streaming = True
+        self.stream_requests: list[httpx.Request] = []
+        self._streams: list[asyncio.Queue[bytes | None]] = []
+
+    @property
+    def streams(self) -> int:
+        return len(self._streams)
+
+    def post(self, **status: Any) -> int:
+        """
+        Adds a toot, or sends a status of another kind to the streams only.
+        """
+        if not status:
+            self.toots += 1
+            status = self.status(self.toots)
+
+        event = f"event: update\ndata: {json.dumps(status)}\n\n".encode()
+        for stream in self._streams:
+            stream.put_nowait(event)
+        return self.toots
+
+    def close_streams(self) -> None:
+        for stream in self._streams:
+            stream.put_nowait(None)
+        self._streams.clear()
+
+    def status(self, toot_id: int) -> dict[str, Any]:
+        return {
+            "id": str(toot_id),
+            "account": {"id": str(self.user_id)},
+            "in_reply_to_account_id": None,
+            "reblog": None,
+            "visibility": "public",
+            "url": f"https://mastodon.example/@user/{toot_id}",
+            "content": f"<p>Toot {toot_id}</p>",
+            "created_at": "2025-01-01T00:00:00.000Z",
+            "media_attachments": [
+                {
+                    "id": str(toot_id),
+                    "type": "image",
+                    "url": f"https://cdn.mastodon.example/{toot_id}.jpg",
+                },
+                {
+                    "id": f"{toot_id}-audio",
+                    "type": "audio",
+                    "url": f"https://cdn.mastodon.example/{toot_id}.mp3",
+                },
+            ],
+        }
+
+    async def _stream(self, queue: asyncio.Queue[bytes | None]) -> AsyncIterator[bytes]:
+        yield b":)\n\n"
+        while event := await queue.get():
+            yield b":thump\n\n"
+            yield event
+
+    def _handle_stream(self, request: httpx.Request) -> httpx.Response:
+        self.stream_requests.append(request)
+        if not self.streaming or request.url.path != "/api/v1/streaming/user":
+            return httpx.Response(503)
+
+        queue: asyncio.Queue[bytes | None] = asyncio.Queue()
+        self._streams.append(queue)
+        return httpx.Response(
+            200,
+            headers={"Content-Type": "text/event-stream"},
+            content=self._stream(queue),
+        )
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        if request.url.host == self.streaming_host:
+            return self._handle_stream(request)
+
+        path = request.url.path
+        if path == "/api/v2/instance":
+            return httpx.Response(
+                200,
+                json={
+                    "configuration": {
+                        "urls": {"streaming": f"wss://{self.streaming_host}"},
+                    },
+                },
+            )
+
+        if path == "/api/v1/accounts/lookup":
+            self.lookups += 1
+            if request.url.params["acct"] != self.account_name:
+                return httpx.Response(404, json={"error": "Record not found"})
+            return httpx.Response(200, json={"id": str(self.user_id)})
+
+        if path != f"/api/v1/accounts/{self.user_id}/statuses":
+            return httpx.Response(404, json={"error": "Not found"})
+
+        self.pages += 1
+        await asyncio.sleep(self.page_latency)
+
+        params = request.url.params
+        limit = int(params.get("limit", 20))
+        max_id = int(params.get("max_id", self.toots + 1))
+        since_id = int(params.get("since_id", 0))
+        toot_ids = list(range(max_id - 1, since_id, -1))[:limit]
+
+        headers = {}
+        if toot_ids:
+            # Like Mastodon, the links drop since_id
+            query = {
+                "exclude_replies": params["exclude_replies"],
+                "exclude_reblogs": params["exclude_reblogs"],
+                "limit": limit,
+            }
+            next_url = request.url.copy_with(params={**query, "max_id": toot_ids[-1]})
+            prev_url = request.url.copy_with(params={**query, "min_id": toot_ids[0]})
+            headers["Link"] = f'<{next_url}>; rel="next", <{prev_url}>; rel="prev"'
+
+        return httpx.Response(
+            200,
+            headers=headers,
+            json=[self.status(toot_id) for toot_id in toot_ids],
+        )
+
+    def client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=httpx.MockTransport(self.handle))
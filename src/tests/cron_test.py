@@ -0,0 +1,70 @@
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from twittergram.interface.scheduler import CronSchedule
+
+
+@pytest.mark.parametrize(
+    "expression,moment,expected",
+    [
+        ("*/20 * * * *", datetime(2024, 5, 1, 10, 5), datetime(2024, 5, 1, 10, 20)),
+        ("*/20 * * * *", datetime(2024, 5, 1, 10, 40), datetime(2024, 5, 1, 11, 0)),
+        ("23 */2 * * *", datetime(2024, 5, 1, 10, 23), datetime(2024, 5, 1, 12, 23)),
+        (
+            "0,30 7-22 * * *",
+            datetime(2024, 5, 1, 22, 30),
+            datetime(2024, 5, 2, 7, 0),
+        ),
+        (
+            "0 7,12,18-21 * * *",
+            datetime(2024, 12, 31, 21, 0),
+            datetime(2025, 1, 1, 7, 0),
+        ),
+        # 2024-05-05 is a Sunday
+        ("0 9 * * 0", datetime(2024, 5, 1, 0, 0), datetime(2024, 5, 5, 9, 0)),
+        ("0 9 * * 7", datetime(2024, 5, 1, 0, 0), datetime(2024, 5, 5, 9, 0)),
+        # Day of month and day of week match if either matches
+        ("0 0 15 * 0", datetime(2024, 5, 1, 0, 0), datetime(2024, 5, 5, 0, 0)),
+        ("0 0 29 2 *", datetime(2023, 3, 1, 0, 0), datetime(2024, 2, 29, 0, 0)),
+        ("0 0 1 * *", datetime(2024, 1, 31, 12, 0), datetime(2024, 2, 1, 0, 0)),
+    ],
+)
+def test_next_after(expression, moment, expected):
+    schedule = CronSchedule.parse(expression)
+    assert schedule.next_after(moment) == expected
+
+
+def test_next_after_keeps_timezone():
+    timezone = ZoneInfo("Europe/Berlin")
+    schedule = CronSchedule.parse("0 7 * * *")
+    # DST starts on 2024-03-31
+    moment = datetime(2024, 3, 30, 8, 0, tzinfo=timezone)
+
+    result = schedule.next_after(moment)
+
+    assert result == datetime(2024, 3, 31, 7, 0, tzinfo=timezone)
+    assert result.utcoffset() != moment.utcoffset()
+
+
+@pytest.mark.parametrize(
+    "expression",
+    [
+        "* * * *",
+        "60 * * * *",
+        "* 24 * * *",
+        "*/0 * * * *",
+        "5-1 * * * *",
+        "a * * * *",
+    ],
+)
+def test_parse_invalid(expression):
+    with pytest.raises(ValueError):
+        CronSchedule.parse(expression)
+
+
+def test_never_matches():
+    schedule = CronSchedule.parse("0 0 31 2 *")
+    with pytest.raises(ValueError):
+        schedule.next_after(datetime(2024, 1, 1))
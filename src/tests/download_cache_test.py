@@ -0,0 +1,93 @@
+import asyncio
+
+from twittergram.infrastructure.adapters.media_downloader import DownloadCache
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = DownloadCache(tmp_path / "cache", max_size=2048)
+    files = []
+    for name in ("a", "b", "c"):
+        path = tmp_path / name
+        path.write_bytes(name.encode() * 1024)
+        files.append(path)
+
+    async def _fill() -> None:
+        await cache.put("https://example.org/a", [(files[0], "image/jpeg")])
+        await cache.put("https://example.org/b", [(files[1], "image/jpeg")])
+        assert await cache.get("https://example.org/a")
+        await cache.put("https://example.org/c", [(files[2], "image/jpeg")])
+        await cache.close()
+
+    asyncio.run(_fill())
+
+    # A new cache instance reads the persisted index
+    cache = DownloadCache(tmp_path / "cache", max_size=2048)
+    assert asyncio.run(cache.get("https://example.org/a"))
+    assert asyncio.run(cache.get("https://example.org/b")) is None
+    assert asyncio.run(cache.get("https://example.org/c"))
+    assert len(list((tmp_path / "cache" / "blobs").glob("*/*"))) == 2
+
+
+def test_deduplicates_content(tmp_path):
+    cache = DownloadCache(tmp_path / "cache", max_size=4096)
+    path = tmp_path / "image.jpg"
+    path.write_bytes(b"\xff" * 1024)
+
+    async def _fill() -> None:
+        await cache.put("https://example.org/a", [(path, "image/jpeg")])
+        await cache.put("https://example.org/b", [(path, "image/jpeg")])
+
+    asyncio.run(_fill())
+
+    assert len(list((tmp_path / "cache" / "blobs").glob("*/*"))) == 1
+    entry = asyncio.run(cache.get("https://example.org/b"))
+    assert entry
+    restored = asyncio.run(cache.restore(entry, tmp_path / "restored"))
+    assert restored
+    assert restored[0].read_bytes() == path.read_bytes()
+
+
+def test_writes_index_on_close(tmp_path):
+    cache = DownloadCache(tmp_path / "cache", max_size=4096)
+    files = []
+    for name in ("a", "b"):
+        path = tmp_path / name
+        path.write_bytes(name.encode() * 1024)
+        files.append(path)
+    index_file = tmp_path / "cache" / "index.json"
+
+    async def _use() -> None:
+        await cache.put("https://example.org/a", [(files[0], "image/jpeg")])
+        await cache.put("https://example.org/b", [(files[1], "image/jpeg")])
+        assert not index_file.exists()
+
+        assert await cache.get("https://example.org/a")
+        assert not index_file.exists()
+
+        await cache.close()
+
+    asyncio.run(_use())
+
+    # The hit made the first entry the most recently used one
+    cache = DownloadCache(tmp_path / "cache", max_size=2048)
+    path = tmp_path / "c"
+    path.write_bytes(b"c" * 1024)
+    asyncio.run(cache.put("https://example.org/c", [(path, "image/jpeg")]))
+    assert asyncio.run(cache.get("https://example.org/a"))
+    assert asyncio.run(cache.get("https://example.org/b")) is None
+
+
+def test_discards_unindexed_blobs(tmp_path):
+    path = tmp_path / "image.jpg"
+    path.write_bytes(b"\xff" * 1024)
+    # The process ended before the index was written
+    asyncio.run(
+        DownloadCache(tmp_path / "cache", max_size=4096).put(
+            "https://example.org/a", [(path, "image/jpeg")]
+        )
+    )
+
+    cache = DownloadCache(tmp_path / "cache", max_size=4096)
+
+    assert asyncio.run(cache.get("https://example.org/a")) is None
+    assert not list((tmp_path / "cache" / "blobs").glob("*/*"))
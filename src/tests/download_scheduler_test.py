@@ -0,0 +1,193 @@
+import asyncio
+from contextlib import aclosing
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+
+from twittergram.application.model import MediaFile, MediaType, Medium
+from twittergram.application.ports import MediaDownloader, MediaRoute
+from twittergram.infrastructure.adapters.media_downloader import (
+    DownloaderRegistry,
+    DownloadLimits,
+    DownloadWorkspace,
+    LimitedDownloadScheduler,
+)
+
+
+class _FakeDownloader(MediaDownloader):
+    def __init__(self) -> None:
+        self.running: dict[str, int] = {}
+        self.max_running: dict[str, int] = {}
+        self.max_total = 0
+        self.order: list[str] = []
+
+    @property
+    def routes(self) -> list[MediaRoute]:
+        return [MediaRoute(media_type=MediaType.PHOTO)]
+
+    async def download(self, medium: Medium) -> list[MediaFile]:
+        host = medium.url.split("/")[2]
+        self.order.append(medium.id)
+        self.running[host] = self.running.get(host, 0) + 1
+        self.max_running[host] = max(self.max_running.get(host, 0), self.running[host])
+        self.max_total = max(self.max_total, sum(self.running.values()))
+        await asyncio.sleep(0.01)
+        self.running[host] -= 1
+        return []
+
+
+class _WorkspaceDownloader(MediaDownloader):
+    def __init__(self, workspace: DownloadWorkspace, failing: str | None = None):
+        self.workspace = workspace
+        self.failing = failing
+
+    @property
+    def routes(self) -> list[MediaRoute]:
+        return [MediaRoute(media_type=MediaType.PHOTO)]
+
+    async def download(self, medium: Medium) -> list[MediaFile]:
+        if medium.id == self.failing:
+            await asyncio.sleep(0.01)
+            raise OSError("Download failed")
+
+        path = await self.workspace.create_directory() / "image.jpg"
+        path.write_bytes(b"\xff")
+        return [MediaFile(medium=medium, path=path, mime_type="image/jpeg")]
+
+
+def _workspace(tmp_path: Path) -> DownloadWorkspace:
+    return DownloadWorkspace(tmp_path / "work", quota=0, max_age=timedelta())
+
+
+def _create_scheduler(
+    downloader: MediaDownloader,
+    limits: DownloadLimits,
+    tmp_path: Path,
+) -> LimitedDownloadScheduler:
+    return LimitedDownloadScheduler(
+        DownloaderRegistry([downloader]),
+        limits,
+        _workspace(tmp_path),
+    )
+
+
+def _media(prefix: str, host: str, count: int) -> list[Medium]:
+    return [
+        Medium(type=MediaType.PHOTO, id=f"{prefix}{i}", url=f"https://{host}/{i}")
+        for i in range(count)
+    ]
+
+
+def test_limits(tmp_path):
+    downloader = _FakeDownloader()
+    scheduler = _create_scheduler(
+        downloader,
+        DownloadLimits(concurrency=3, host_concurrency=2),
+        tmp_path,
+    )
+    media = _media("a", "i.redd.it", 5) + _media("b", "cdn.bsky.app", 5)
+
+    asyncio.run(scheduler.download_all(media))
+
+    assert downloader.max_total == 3
+    assert downloader.max_running == {"i.redd.it": 2, "cdn.bsky.app": 2}
+
+
+def test_feeds_take_turns(tmp_path):
+    downloader = _FakeDownloader()
+    limits = DownloadLimits(concurrency=1, host_concurrency=10)
+    busy = _create_scheduler(downloader, limits, tmp_path)
+    idle = _create_scheduler(downloader, limits, tmp_path)
+
+    async def _run() -> None:
+        async with asyncio.TaskGroup() as tg:
+            tg.create_task(busy.download_all(_media("a", "example.org", 4)))
+            await asyncio.sleep(0)
+            tg.create_task(idle.download_all(_media("b", "example.org", 2)))
+
+    asyncio.run(_run())
+
+    assert downloader.order == ["a0", "a1", "b0", "a2", "b1", "a3"]
+
+
+def test_unsupported(tmp_path):
+    downloader = _FakeDownloader()
+    scheduler = _create_scheduler(
+        downloader,
+        DownloadLimits(concurrency=1, host_concurrency=1),
+        tmp_path,
+    )
+    medium = Medium(type=MediaType.VIDEO, id="1", url="https://example.org/1")
+
+    assert asyncio.run(scheduler.download(medium)) == []
+    assert not downloader.order
+
+
+def test_invalid_concurrency():
+    with pytest.raises(ValueError):
+        DownloadLimits(concurrency=0, host_concurrency=1)
+
+
+def test_prefetch(tmp_path):
+    downloader = _FakeDownloader()
+    scheduler = _create_scheduler(
+        downloader,
+        DownloadLimits(concurrency=10, host_concurrency=10),
+        tmp_path,
+    )
+    media = _media("a", "example.org", 5)
+    started: list[int] = []
+
+    async def _consume() -> list[str]:
+        result = []
+        prefetch = scheduler.prefetch(media, lambda it: [it], window=2)
+        async for medium, _ in prefetch:
+            started.append(len(downloader.order))
+            result.append(medium.id)
+        return result
+
+    assert asyncio.run(_consume()) == ["a0", "a1", "a2", "a3", "a4"]
+    # The first item is sent before the later downloads even started
+    assert started[0] == 2
+    assert downloader.max_total <= 2
+
+
+def test_prefetch_discards_unconsumed_downloads(tmp_path):
+    workspace = _workspace(tmp_path)
+    scheduler = LimitedDownloadScheduler(
+        DownloaderRegistry([_WorkspaceDownloader(workspace)]),
+        DownloadLimits(concurrency=10, host_concurrency=10),
+        workspace,
+    )
+
+    async def _consume_first() -> None:
+        prefetch = scheduler.prefetch(
+            _media("a", "example.org", 5),
+            lambda it: [it],
+            window=3,
+        )
+        async with aclosing(prefetch):
+            async for _, media_files in prefetch:
+                # Let the downloads of the next items finish
+                await asyncio.sleep(0.05)
+                await workspace.release(media_files)
+                break
+
+    asyncio.run(_consume_first())
+
+    assert not list(workspace.directory.iterdir())
+
+
+def test_download_all_discards_finished_downloads_on_failure(tmp_path):
+    workspace = _workspace(tmp_path)
+    scheduler = LimitedDownloadScheduler(
+        DownloaderRegistry([_WorkspaceDownloader(workspace, failing="a2")]),
+        DownloadLimits(concurrency=10, host_concurrency=10),
+        workspace,
+    )
+
+    with pytest.raises(ExceptionGroup):
+        asyncio.run(scheduler.download_all(_media("a", "example.org", 3)))
+
+    assert not list(workspace.directory.iterdir())
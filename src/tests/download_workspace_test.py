@@ -0,0 +1,69 @@
+import asyncio
+import os
+import time
+from datetime import timedelta
+
+from twittergram.application.model import MediaFile, MediaType, Medium
+from twittergram.infrastructure.adapters.media_downloader import DownloadWorkspace
+
+_MEDIUM = Medium(type=MediaType.PHOTO, id="1", url="https://example.org/image.jpg")
+
+
+async def _download(workspace: DownloadWorkspace, size: int) -> MediaFile:
+    directory = await workspace.create_directory()
+    path = directory / "image.jpg"
+    path.write_bytes(b"\xff" * size)
+    return MediaFile(medium=_MEDIUM, path=path, mime_type="image/jpeg")
+
+
+def _age(media_file: MediaFile, seconds: int) -> None:
+    moment = time.time() - seconds
+    os.utime(media_file.path.parent, (moment, moment))
+
+
+def test_scope_releases_files(tmp_path):
+    workspace = DownloadWorkspace(tmp_path, quota=0, max_age=timedelta(hours=1))
+
+    async def _forward() -> None:
+        async with workspace.scope() as scope:
+            sent = scope.hold([await _download(workspace, 1024)])
+            scope.hold([await _download(workspace, 1024)])
+            await scope.release(sent)
+            assert not sent[0].path.exists()
+            assert len(list(tmp_path.iterdir())) == 1
+
+    asyncio.run(_forward())
+
+    assert not list(tmp_path.iterdir())
+
+
+def test_sweep(tmp_path):
+    workspace = DownloadWorkspace(tmp_path, quota=2048, max_age=timedelta(hours=1))
+
+    async def _leave_behind() -> list[MediaFile]:
+        # Another process that crashed before releasing its files
+        other = DownloadWorkspace(tmp_path, quota=0, max_age=timedelta())
+        return [await _download(other, 1024) for _ in range(3)]
+
+    stale, old, new = asyncio.run(_leave_behind())
+    _age(stale, 7200)
+    _age(old, 60)
+    active = asyncio.run(_download(workspace, 1024))
+    _age(active, 7200)
+
+    asyncio.run(workspace.sweep())
+
+    assert not stale.path.exists()
+    assert not old.path.exists()
+    assert new.path.exists()
+    assert active.path.exists()
+
+
+def test_sweep_expires_leaked_directories(tmp_path):
+    workspace = DownloadWorkspace(tmp_path, quota=2048, max_age=timedelta())
+    leaked = asyncio.run(_download(workspace, 1024))
+
+    asyncio.run(workspace.sweep())
+
+    # Still in use after the maximum age, so it was never released
+    assert not leaked.path.parent.exists()
@@ -0,0 +1,48 @@
+from httpx import URL
+
+from twittergram.application.model import MediaFile, MediaType, Medium
+from twittergram.application.ports import MediaDownloader, MediaRoute
+from twittergram.infrastructure.adapters.media_downloader import DownloaderRegistry
+
+
+class _FakeDownloader(MediaDownloader):
+    def __init__(self, *routes: MediaRoute) -> None:
+        self._routes = list(routes)
+
+    @property
+    def routes(self) -> list[MediaRoute]:
+        return self._routes
+
+    async def download(self, medium: Medium) -> list[MediaFile]:
+        return []
+
+
+_GALLERY = _FakeDownloader(
+    MediaRoute(
+        media_type=MediaType.PHOTO,
+        host="www.reddit.com",
+        path_prefix="/gallery/",
+    )
+)
+_HTTP = _FakeDownloader(MediaRoute(media_type=MediaType.PHOTO))
+
+
+def test_most_specific_route_wins():
+    registry = DownloaderRegistry([_HTTP, _GALLERY])
+
+    def _resolve(url: str) -> MediaDownloader | None:
+        return registry.resolve(MediaType.PHOTO, URL(url))
+
+    assert _resolve("https://www.reddit.com/gallery/abc") is _GALLERY
+    assert _resolve("https://www.reddit.com/r/pics") is _HTTP
+    assert _resolve("https://i.redd.it/abc.jpg") is _HTTP
+    assert registry.resolve(MediaType.VIDEO, URL("https://i.redd.it/abc.mp4")) is None
+
+
+def test_routing_table():
+    registry = DownloaderRegistry([_HTTP, _GALLERY])
+
+    assert registry.routing_table() == [
+        "photo www.reddit.com/gallery/* -> _FakeDownloader",
+        "photo */* -> _FakeDownloader",
+    ]
@@ -0,0 +1,61 @@
+import asyncio
+import importlib.util
+from collections import Counter
+from datetime import timedelta
+
+import httpx
+
+from twittergram.config import HttpConfig
+from twittergram.infrastructure.adapters.http_client import (
+    HostLimitedTransport,
+    create_http_client,
+)
+
+
+def test_host_limit():
+    transport = HostLimitedTransport(
+        httpx.MockTransport(lambda request: httpx.Response(200, content=b"\xff")),
+        host_connections=2,
+    )
+    active: Counter[str] = Counter()
+    max_active: Counter[str] = Counter()
+
+    async def _get(client: httpx.AsyncClient, url: str) -> None:
+        async with client.stream("GET", url) as response:
+            host = response.url.host
+            active[host] += 1
+            max_active[host] = max(max_active[host], active[host])
+            # The slot is held while the body is being read
+            await asyncio.sleep(0.01)
+            await response.aread()
+            active[host] -= 1
+
+    async def _run() -> None:
+        async with httpx.AsyncClient(transport=transport) as client:
+            async with asyncio.TaskGroup() as tg:
+                for index in range(6):
+                    tg.create_task(_get(client, f"https://a.example/{index}"))
+                    tg.create_task(_get(client, f"https://b.example/{index}"))
+
+    asyncio.run(_run())
+
+    assert max_active == {"a.example": 2, "b.example": 2}
+
+
+def test_create_http_client_with_http2():
+    client = create_http_client(
+        HttpConfig(
+            connect_timeout=timedelta(seconds=10),
+            host_connections=6,
+            keepalive_expiry=timedelta(seconds=30),
+            read_timeout=timedelta(seconds=30),
+        )
+    )
+
+    # httpx only checks for h2 if the client creates its own transport
+    assert importlib.util.find_spec("h2") is not None
+    transport = client._transport
+    assert isinstance(transport, HostLimitedTransport)
+    assert isinstance(transport._transport, httpx.AsyncHTTPTransport)
+    assert transport._transport._pool._http2
+    asyncio.run(client.aclose())
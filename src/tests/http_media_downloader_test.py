@@ -0,0 +1,123 @@
+import asyncio
+from collections.abc import AsyncIterator, Callable
+from datetime import timedelta
+from pathlib import Path
+
+import httpx
+import pytest
+
+from twittergram.application.model import MediaType, Medium
+from twittergram.infrastructure.adapters.media_downloader import (
+    DownloadCache,
+    DownloadWorkspace,
+    HttpMediaDownloader,
+)
+
+_MEDIUM = Medium(type=MediaType.PHOTO, id="1", url="https://example.org/image.jpg")
+
+
+async def _chunks(count: int) -> AsyncIterator[bytes]:
+    for _ in range(count):
+        yield b"\xff" * 1024
+
+
+def _create_downloader(
+    tmp_path: Path,
+    handler: Callable[[httpx.Request], httpx.Response],
+    cache_size: int = 0,
+) -> HttpMediaDownloader:
+    return HttpMediaDownloader(
+        DownloadWorkspace(tmp_path / "work", quota=0, max_age=timedelta()),
+        max_file_size=4096,
+        cache=DownloadCache(tmp_path / "cache", max_size=cache_size),
+        client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+
+
+@pytest.mark.parametrize("chunks", [1, 4])
+def test_download(tmp_path, chunks):
+    downloader = _create_downloader(
+        tmp_path,
+        lambda _: httpx.Response(
+            200,
+            headers={"Content-Type": "image/jpeg"},
+            content=_chunks(chunks),
+        ),
+    )
+
+    files = asyncio.run(downloader.download(_MEDIUM))
+
+    assert len(files) == 1
+    assert files[0].path.stat().st_size == chunks * 1024
+
+
+def test_download_content_length_too_large(tmp_path):
+    def _handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200,
+            headers={"Content-Type": "image/jpeg", "Content-Length": "5000"},
+            content=_chunks(0),
+        )
+
+    downloader = _create_downloader(tmp_path, _handler)
+
+    assert asyncio.run(downloader.download(_MEDIUM)) == []
+
+
+def test_download_streamed_too_large(tmp_path):
+    downloader = _create_downloader(
+        tmp_path,
+        lambda _: httpx.Response(
+            200,
+            headers={"Content-Type": "image/jpeg"},
+            content=_chunks(5),
+        ),
+    )
+
+    assert asyncio.run(downloader.download(_MEDIUM)) == []
+    assert not list(tmp_path.glob("work/*"))
+
+
+def test_download_revalidates_cached(tmp_path):
+    requests: list[httpx.Request] = []
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+
+        return httpx.Response(
+            200,
+            headers={"Content-Type": "image/jpeg", "ETag": '"v1"'},
+            content=_chunks(2),
+        )
+
+    downloader = _create_downloader(tmp_path, _handler, cache_size=1024 * 1024)
+
+    first = asyncio.run(downloader.download(_MEDIUM))
+    second = asyncio.run(downloader.download(_MEDIUM))
+
+    assert len(requests) == 2
+    assert second[0].path != first[0].path
+    assert second[0].path.read_bytes() == first[0].path.read_bytes()
+    assert second[0].mime_type == "image/jpeg"
+
+
+def test_download_fresh_cached(tmp_path):
+    requests: list[httpx.Request] = []
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(
+            200,
+            headers={"Content-Type": "image/jpeg", "Cache-Control": "max-age=3600"},
+            content=_chunks(2),
+        )
+
+    downloader = _create_downloader(tmp_path, _handler, cache_size=1024 * 1024)
+
+    asyncio.run(downloader.download(_MEDIUM))
+    files = asyncio.run(downloader.download(_MEDIUM))
+
+    assert len(requests) == 1
+    assert files[0].path.stat().st_size == 2048
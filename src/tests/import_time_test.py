@@ -0,0 +1,121 @@
+import json
+import os
+
+import pytest
+
+from .conftest import run_python
+
+# Each command may only import the third-party packages of the ports it uses
+_HEAVY_MODULES = {"asyncpraw", "atproto", "jmapc", "mastodon", "rss_parser"}
+
+_COMMANDS: dict[str, tuple[str, set[str]]] = {
+    "forward-bluesky-posts": ("forward_bluesky_posts", {"atproto"}),
+    "forward-mails": ("forward_mails", {"jmapc"}),
+    "forward-reddit-posts": ("forward_reddit_posts", {"asyncpraw"}),
+    "forward-rss-feed": ("forward_rss_feed", {"rss_parser"}),
+    "forward-toots": ("forward_toots", set()),
+    "forward-xcode": ("forward_xcode", set()),
+}
+
+# Summed import time of the modules a command needs. Import times depend on the
+# machine, so the default budget is a multiple of what a bare interpreter imports.
+# It's generous enough for the heaviest SDKs; the variable overrides it.
+_BUDGET_ENV_KEY = "TWITTERGRAM_IMPORT_BUDGET_MS"
+_BUDGET_FACTOR = 1000
+
+_ENV = {
+    "BLUESKY__USERNAME": "user",
+    "BLUESKY__PASSWORD": "password",
+    "BLUESKY__AUTHOR_ID": "author",
+    "DOWNLOAD_DIR": "/tmp/twittergram",
+    "MAIL__MAILBOX_NAME": "inbox",
+    "MAIL__TOKEN": "token",
+    "MASTODON__CLIENT_ID": "id",
+    "MASTODON__CLIENT_SECRET": "secret",
+    "MASTODON__SOURCE_ACCOUNT": "account",
+    "REDDIT__CLIENT_ID": "id",
+    "REDDIT__CLIENT_SECRET": "secret",
+    "REDDIT__SOURCE_USERNAME": "user",
+    "RSS__FEED_URL": "https://example.org/feed.xml",
+    "STATE__FILE_PATH": "/tmp/twittergram/state.json",
+    "TELEGRAM__TARGET_CHAT_ID": "1",
+    "TELEGRAM__TOKEN": "token",
+    "TELEGRAM__UPLOAD_CHAT_ID": "2",
+}
+
+_SCRIPT = """
+import json
+import sys
+
+from bs_config import Env
+from injector import Injector
+
+import twittergram.interface.cli.app
+from twittergram.config import (
+    Config,
+    DownloadConfig,
+    HttpConfig,
+    StateConfig,
+    TelegramBotConfig,
+)
+from twittergram.init import SharedModule, _create_app
+
+env = Env.load_from_dict(json.loads(sys.argv[1]))
+shared = Injector(
+    modules=[
+        SharedModule(
+            DownloadConfig.from_env(env),
+            HttpConfig.from_env(env),
+            StateConfig.from_env(env / "state"),
+            TelegramBotConfig.from_env(env / "telegram"),
+        )
+    ],
+)
+app = _create_app(Config.from_env(env), shared)
+getattr(app, sys.argv[2])
+print(json.dumps(sorted({name.split(".")[0] for name in sys.modules})))
+"""
+
+
+def _import_ms(stderr: str) -> float:
+    total_us = 0
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us = line.removeprefix("import time:").split("|")[0].strip()
+        if self_us.isdigit():
+            total_us += int(self_us)
+
+    return total_us / 1000
+
+
+def _measure(use_case: str) -> tuple[set[str], float]:
+    result = run_python("-X", "importtime", "-c", _SCRIPT, json.dumps(_ENV), use_case)
+
+    modules = set(json.loads(result.stdout.splitlines()[-1]))
+    return modules, _import_ms(result.stderr)
+
+
+@pytest.fixture(scope="module")
+def budget_ms() -> float:
+    if budget := os.getenv(_BUDGET_ENV_KEY):
+        return float(budget)
+
+    # The fastest of a few runs, since a single one is easily skewed by the machine
+    bare_ms = min(
+        _import_ms(run_python("-X", "importtime", "-c", "pass").stderr)
+        for _ in range(3)
+    )
+    return bare_ms * _BUDGET_FACTOR
+
+
+@pytest.mark.parametrize("command", _COMMANDS)
+def test_command_imports(command, budget_ms):
+    use_case, allowed = _COMMANDS[command]
+
+    modules, total_ms = _measure(use_case)
+
+    assert modules & _HEAVY_MODULES <= allowed
+    assert total_ms <= budget_ms, (
+        f"{command} imports took {total_ms:.0f} ms of {budget_ms:.0f} ms"
+    )
@@ -0,0 +1,68 @@
+import pytest
+from pydantic import ValidationError
+
+from twittergram.manifest import Manifest
+
+_MANIFEST = """
+concurrency = 8
+
+[[rss]]
+id = "scaleway"
+target-chat = -1002673102174
+feed-url = "https://www.scaleway.com/en/docs/changelog/rss.xml"
+
+[[rss]]
+id = "signal"
+target-chat = 133399998
+schedule = "42 14 * * *"
+feed-url = "https://signal.org/blog/rss.xml"
+order = "reverse_chronological"
+
+[[xcode]]
+id = "xcode"
+target-chat = -1001914864431
+"""
+
+
+def test_load(tmp_path):
+    path = tmp_path / "manifest.toml"
+    path.write_text(_MANIFEST)
+
+    manifest = Manifest.load(path)
+
+    assert manifest.concurrency == 8
+    instances = [(source, i.id) for source, i in manifest.instances()]
+    assert instances == [("rss", "scaleway"), ("rss", "signal"), ("xcode", "xcode")]
+
+    signal = manifest.rss[1].to_config()
+    assert signal.target_chat == 133399998
+    assert signal.options == {
+        "feed-url": "https://signal.org/blog/rss.xml",
+        "order": "reverse_chronological",
+    }
+    assert manifest.rss[1].schedule == "42 14 * * *"
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        # Unknown option
+        {"rss": [{"id": "a", "target-chat": 1, "author-id": "x"}]},
+        # Invalid option value
+        {"rss": [{"id": "a", "target-chat": 1, "order": "random"}]},
+        # Invalid schedule
+        {"rss": [{"id": "a", "target-chat": 1, "schedule": "every hour"}]},
+        {"xcode": [{"id": "a", "target-chat": 1, "schedule": "0 25 * * *"}]},
+        # Duplicate ID
+        {
+            "rss": [{"id": "a", "target-chat": 1}],
+            "xcode": [{"id": "a", "target-chat": 2}],
+        },
+        # Unknown source
+        {"twitter": [{"id": "a", "target-chat": 1}]},
+        {"concurrency": 0},
+    ],
+)
+def test_invalid(raw):
+    with pytest.raises(ValidationError):
+        Manifest.model_validate(raw)
@@ -0,0 +1,79 @@
+import asyncio
+import time
+from contextlib import aclosing
+from datetime import timedelta
+
+from twittergram.config import MastodonConfig, MastodonReaderType
+from twittergram.infrastructure.adapters.mastodon_reader import RestApiMastodonReader
+
+from .conftest import FakeMastodonApi
+
+_TOOTS = 2000
+_PAGE_LATENCY = 0.02
+_FIRST_RUN_TOOTS = 10
+
+
+def _create_reader(api: FakeMastodonApi) -> RestApiMastodonReader:
+    config = MastodonConfig(
+        access_token=None,
+        api_base_url="https://mastodon.example",
+        client_id="id",
+        client_secret="secret",
+        poll_interval=timedelta(minutes=5),
+        reader=MastodonReaderType.REST_API,
+        source_account=api.account_name,
+        stream=None,
+    )
+    return RestApiMastodonReader(config, api.client())
+
+
+async def _read(
+    reader: RestApiMastodonReader,
+    until_id: int | None,
+    limit: int | None = None,
+) -> tuple[int, float, float]:
+    """
+    :return: the number of toots read, and the seconds until the first and the last
+    """
+    start = time.monotonic()
+    first = 0.0
+    count = 0
+    async with aclosing(reader.list_toots(1, until_id=until_id)) as toots:
+        async for _ in toots:
+            count += 1
+            if count == 1:
+                first = time.monotonic() - start
+            if count == limit:
+                break
+
+    return count, first, time.monotonic() - start
+
+
+def test_mastodon_backlog_benchmark(report):
+    backlog_api = FakeMastodonApi(toots=_TOOTS, page_latency=_PAGE_LATENCY)
+    backlog = asyncio.run(_read(_create_reader(backlog_api), until_id=1))
+
+    first_run_api = FakeMastodonApi(toots=_TOOTS, page_latency=_PAGE_LATENCY)
+    first_run = asyncio.run(
+        _read(_create_reader(first_run_api), until_id=None, limit=_FIRST_RUN_TOOTS)
+    )
+
+    report(
+        f"Reading toots with {_PAGE_LATENCY * 1000:.0f} ms per page:",
+        *(
+            f"{name:>10}: {count} toots from {api.pages} pages,"
+            f" first after {first * 1000:.0f} ms, all after {total * 1000:.0f} ms"
+            for name, api, (count, first, total) in [
+                ("backlog", backlog_api, backlog),
+                ("first run", first_run_api, first_run),
+            ]
+        ),
+    )
+
+    # The whole backlog is read, not just its newest page
+    assert backlog[0] == _TOOTS - 1
+    # Toots are yielded as soon as their page arrives
+    assert backlog[1] < backlog[2] / 10
+    # Pages after the toots needed aren't requested
+    assert first_run[0] == _FIRST_RUN_TOOTS
+    assert first_run_api.pages == 1
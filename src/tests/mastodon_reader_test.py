@@ -0,0 +1,80 @@
+import asyncio
+from contextlib import aclosing
+from datetime import timedelta
+
+import pytest
+
+from twittergram.application.exceptions.io import IoException
+from twittergram.application.model import MediaType, Toot
+from twittergram.config import MastodonConfig, MastodonReaderType
+from twittergram.infrastructure.adapters.mastodon_reader import RestApiMastodonReader
+
+from .conftest import FakeMastodonApi
+
+
+def _create_reader(
+    api: FakeMastodonApi,
+    account: str | None = None,
+) -> RestApiMastodonReader:
+    config = MastodonConfig(
+        access_token=None,
+        api_base_url="https://mastodon.example",
+        client_id="id",
+        client_secret="secret",
+        poll_interval=timedelta(minutes=5),
+        reader=MastodonReaderType.REST_API,
+        source_account=account or api.account_name,
+        stream=None,
+    )
+    return RestApiMastodonReader(config, api.client())
+
+
+async def _list(reader: RestApiMastodonReader, until_id: int | None) -> list[Toot]:
+    return [toot async for toot in reader.list_toots(1, until_id=until_id)]
+
+
+def test_lookup_user_id():
+    api = FakeMastodonApi(toots=0)
+
+    assert asyncio.run(_create_reader(api).lookup_user_id()) == api.user_id
+
+    with pytest.raises(IoException):
+        asyncio.run(_create_reader(api, "unknown@example").lookup_user_id())
+
+
+def test_list_toots_follows_pages():
+    api = FakeMastodonApi(toots=100)
+    reader = _create_reader(api)
+
+    toots = asyncio.run(_list(reader, until_id=10))
+
+    assert [toot.id for toot in toots] == list(range(100, 10, -1))
+    # 90 toots in pages of 40, plus the empty page after the last toot
+    assert api.pages == 3
+    toot = toots[0]
+    assert toot.url == "https://mastodon.example/@user/100"
+    assert toot.content == "<p>Toot 100</p>"
+    assert toot.created_at.tzinfo is not None
+    # Unsupported media are skipped
+    assert [medium.type for medium in toot.media_attachments] == [MediaType.PHOTO]
+
+
+def test_list_toots_without_new_toots():
+    api = FakeMastodonApi(toots=5)
+
+    assert asyncio.run(_list(_create_reader(api), until_id=5)) == []
+    assert api.pages == 1
+
+
+def test_list_toots_stops_early():
+    api = FakeMastodonApi(toots=1000)
+    reader = _create_reader(api)
+
+    async def _read_first() -> Toot | None:
+        async with aclosing(reader.list_toots(1)) as toots:
+            return await anext(toots, None)
+
+    first = asyncio.run(_read_first())
+
+    assert first is not None and first.id == 1000
+    assert api.pages == 1
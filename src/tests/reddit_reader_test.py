@@ -0,0 +1,47 @@
+from types import SimpleNamespace
+
+from twittergram.application.model import MediaType
+from twittergram.infrastructure.adapters.reddit_reader.praw import _media
+
+
+def _image(media_id: str, mime_type: str = "image/jpg") -> dict[str, object]:
+    return {"status": "valid", "e": "Image", "m": mime_type, "id": media_id}
+
+
+def _gallery(**metadata: dict[str, object]) -> SimpleNamespace:
+    return SimpleNamespace(
+        id="abc",
+        url="https://www.reddit.com/gallery/abc",
+        is_gallery=True,
+        gallery_data={"items": [{"media_id": media_id} for media_id in metadata]},
+        media_metadata=metadata,
+    )
+
+
+def test_image_post():
+    submission = SimpleNamespace(id="abc", url="https://i.redd.it/abc.jpg")
+
+    media = _media(submission)
+
+    assert [medium.url for medium in media] == ["https://i.redd.it/abc.jpg"]
+
+
+def test_gallery():
+    submission = _gallery(second=_image("second", "image/png"), first=_image("first"))
+
+    media = _media(submission)
+
+    assert [medium.url for medium in media] == [
+        "https://i.redd.it/second.png",
+        "https://i.redd.it/first.jpg",
+    ]
+    assert [medium.id for medium in media] == ["abc-0", "abc-1"]
+    assert all(medium.type == MediaType.PHOTO for medium in media)
+
+
+def test_unresolved_gallery():
+    submission = _gallery(first=_image("first"), failed={"status": "failed"})
+
+    media = _media(submission)
+
+    assert [medium.url for medium in media] == ["https://www.reddit.com/gallery/abc"]
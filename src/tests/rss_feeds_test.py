@@ -0,0 +1,230 @@
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from twittergram.application.exceptions.io import IoException
+from twittergram.application.model import (
+    URL,
+    CacheValidators,
+    Listing,
+    MediaFile,
+    Medium,
+    RssItem,
+    RssState,
+)
+from twittergram.application.ports import RssReader, TelegramUploader
+from twittergram.application.repos import StateRepo
+from twittergram.application.use_cases import ForwardRssFeed
+from twittergram.config import RssConfig, RssParserType
+from twittergram.infrastructure.adapters.html_sanitizer import NaiveHtmlSanitizer
+
+_START = datetime(2025, 1, 1, tzinfo=UTC)
+
+
+def _item(feed: str, index: int) -> RssItem:
+    return RssItem(
+        id=f"{feed}-{index}",
+        title=f"{feed}-{index}",
+        links=[URL(f"https://{feed}.example/{index}")],
+        published_at=_START + timedelta(hours=index),
+        synopsis=None,
+    )
+
+
+async def _iterate(items: list[RssItem]) -> AsyncIterator[RssItem]:
+    for item in items:
+        yield item
+
+
+class _FakeRssReader(RssReader):
+    """
+    Serves the items like a feed with an ETag. Listings yield nothing while the
+    items match the given ETag.
+    """
+
+    def __init__(self, feed_url: str, items: list[RssItem]) -> None:
+        self._feed_url = feed_url
+        self.items = items
+        self.failing = False
+
+    @property
+    def feed_url(self) -> str:
+        return self._feed_url
+
+    @asynccontextmanager
+    async def list_items(
+        self,
+        validators: CacheValidators | None,
+    ) -> AsyncIterator[Listing[RssItem]]:
+        if self.failing:
+            raise IoException("Reading failed")
+
+        etag = ",".join(item.id for item in self.items)
+        if validators is not None and validators.etag == etag:
+            yield Listing.unchanged(validators)
+            return
+
+        yield Listing(
+            validators=CacheValidators(etag=etag, last_modified=None),
+            items=_iterate(self.items),
+        )
+
+
+class _FakeUploader(TelegramUploader):
+    def __init__(self, fail_at: int | None = None) -> None:
+        self.titles: list[str] = []
+        self.fail_at = fail_at
+
+    async def send_text_message(self, text: str, use_html: bool = False) -> None:
+        if len(self.titles) == self.fail_at:
+            raise IoException("Sending failed")
+        self.titles.append(text.split("\n")[0])
+
+    async def send_documents_message(
+        self,
+        documents: list[MediaFile],
+        *,
+        caption: str | None,
+        use_html: bool = False,
+        disable_notification: bool = False,
+    ) -> None:
+        raise NotImplementedError
+
+    async def send_image_message(
+        self,
+        image_files: list[MediaFile],
+        caption: str | None,
+        use_html: bool = False,
+    ) -> None:
+        raise NotImplementedError
+
+    @property
+    def sends_by_url(self) -> bool:
+        return False
+
+    async def send_image_urls_message(
+        self,
+        images: list[Medium],
+        caption: str | None,
+        use_html: bool = False,
+    ) -> bool:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+
+def _forward(
+    readers: list[RssReader],
+    state_repo: StateRepo,
+    uploader: _FakeUploader | None = None,
+) -> list[str]:
+    uploader = uploader or _FakeUploader()
+    forward_rss_feed = ForwardRssFeed(
+        config=RssConfig(
+            feed_urls=[reader.feed_url for reader in readers],
+            order=None,
+            parser=RssParserType.ELEMENT_TREE,
+        ),
+        readers=readers,
+        sanitizer=NaiveHtmlSanitizer(),
+        state_repo=state_repo,
+        uploader=uploader,
+    )
+    asyncio.run(forward_rss_feed())
+    return uploader.titles
+
+
+def test_merge_feeds(state_repo):
+    a = _FakeRssReader("https://a.example/feed", [_item("a", 3), _item("a", 1)])
+    b = _FakeRssReader("https://b.example/feed", [_item("b", 2)])
+
+    assert _forward([a, b], state_repo) == ["a-1", "b-2", "a-3"]
+
+    # Reordered, with a deleted and a new item
+    a.items = [_item("a", 1), _item("a", 4)]
+    b.items = [_item("b", 5), _item("b", 2)]
+
+    assert _forward([a, b], state_repo) == ["a-4", "b-5"]
+    assert _forward([a, b], state_repo) == []
+
+
+def test_failed_send_is_retried_on_unchanged_feed(state_repo):
+    a = _FakeRssReader("https://a.example/feed", [_item("a", 2), _item("a", 1)])
+
+    with pytest.raises(IoException):
+        _forward([a], state_repo, _FakeUploader(fail_at=1))
+
+    # The feed hasn't changed, but it still holds an item that wasn't forwarded
+    assert _forward([a], state_repo) == ["a-2"]
+    assert _forward([a], state_repo) == []
+
+
+def test_failed_send_is_retried_on_unchanged_feeds(state_repo):
+    a = _FakeRssReader("https://a.example/feed", [_item("a", 2), _item("a", 1)])
+    b = _FakeRssReader("https://b.example/feed", [_item("b", 3)])
+
+    with pytest.raises(IoException):
+        _forward([a, b], state_repo, _FakeUploader(fail_at=1))
+
+    assert _forward([a, b], state_repo) == ["a-2", "b-3"]
+    assert _forward([a, b], state_repo) == []
+
+
+def test_new_feed_backlog(state_repo):
+    a = _FakeRssReader("https://a.example/feed", [_item("a", i) for i in range(15)])
+    b = _FakeRssReader("https://b.example/feed", [])
+
+    titles = _forward([a, b], state_repo)
+
+    # Only the newest items of a feed that has never been read are forwarded
+    assert titles == [f"a-{index}" for index in range(5, 15)]
+    assert _forward([a, b], state_repo) == []
+
+
+def test_seen_index_is_bounded(state_repo):
+    a = _FakeRssReader("https://a.example/feed", [_item("a", i) for i in range(2000)])
+    b = _FakeRssReader("https://b.example/feed", [])
+    _forward([a, b], state_repo)
+
+    for batch in range(5):
+        a.items = [_item("a", 2000 + batch * 1000 + i) for i in range(1000)]
+        _forward([a, b], state_repo)
+
+    state = state_repo.states[RssState]
+    assert len(state.feeds[a.feed_url].seen_items) == 1024
+
+
+def test_unreadable_feed_is_skipped(state_repo):
+    a = _FakeRssReader("https://a.example/feed", [_item("a", 1)])
+    b = _FakeRssReader("https://b.example/feed", [_item("b", 2)])
+    _forward([a, b], state_repo)
+    previous = state_repo.states[RssState].feeds[b.feed_url]
+
+    a.items = [_item("a", 3), _item("a", 1)]
+    b.items = [_item("b", 4), _item("b", 2)]
+    b.failing = True
+
+    assert _forward([a, b], state_repo) == ["a-3"]
+    assert state_repo.states[RssState].feeds[b.feed_url] == previous
+
+    b.failing = False
+
+    assert _forward([a, b], state_repo) == ["b-4"]
+
+
+def test_added_feed_continues_legacy_state(state_repo):
+    a = _FakeRssReader("https://a.example/feed", [_item("a", i) for i in range(15)])
+    b = _FakeRssReader("https://b.example/feed", [_item("b", 15)])
+    # Forwarded by a single feed up to the second newest item
+    state_repo.states[RssState] = RssState(
+        last_item_id="a-13",
+        last_item_time=_item("a", 13).published_at,
+        validators=CacheValidators(etag="a", last_modified=None),
+    )
+
+    assert _forward([a, b], state_repo) == ["a-14", "b-15"]
+    assert _forward([a, b], state_repo) == []
@@ -0,0 +1,121 @@
+import asyncio
+import time
+import tracemalloc
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime, timedelta
+from email.utils import format_datetime
+
+import httpx
+import pytest
+
+from twittergram.config import RssParserType
+from twittergram.infrastructure.adapters.rss_reader import (
+    ElementTreeRssReader,
+    RssParserRssReader,
+)
+from twittergram.infrastructure.adapters.rss_reader.feed import HttpFeedRssReader
+
+_ITEMS = 2000
+_CHUNK_SIZE = 64 * 1024
+
+_READERS: dict[RssParserType, type[HttpFeedRssReader]] = {
+    RssParserType.ELEMENT_TREE: ElementTreeRssReader,
+    RssParserType.RSS_PARSER: RssParserRssReader,
+}
+
+
+def _build_feed(items: int) -> bytes:
+    newest = datetime(2025, 1, 1, tzinfo=UTC)
+    entries = "".join(
+        f"""
+    <item>
+      <guid>https://example.org/changes/{index}</guid>
+      <title>Change {index}</title>
+      <link>https://example.org/changes/{index}</link>
+      <description>{"Something changed. " * 20}</description>
+      <pubDate>{format_datetime(newest - timedelta(hours=index))}</pubDate>
+    </item>"""
+        for index in range(items)
+    )
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0">
+  <channel>
+    <title>Changelog</title>
+    <link>https://example.org</link>
+    <description>Changes</description>{entries}
+  </channel>
+</rss>
+""".encode()
+
+
+_FEED = _build_feed(_ITEMS)
+
+
+def _create_reader(
+    parser: RssParserType,
+    served: list[int],
+) -> HttpFeedRssReader:
+    async def _chunks() -> AsyncIterator[bytes]:
+        for start in range(0, len(_FEED), _CHUNK_SIZE):
+            chunk = _FEED[start : start + _CHUNK_SIZE]
+            served.append(len(chunk))
+            yield chunk
+
+    def _serve(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=_chunks())
+
+    return _READERS[parser](
+        "https://example.org/feed.xml",
+        httpx.AsyncClient(transport=httpx.MockTransport(_serve)),
+    )
+
+
+def _measure(parser: RssParserType, limit: int | None) -> tuple[int, float, int, int]:
+    """
+    :return: the number of items read, the seconds and peak bytes it took, and the
+      number of bytes served
+    """
+    served: list[int] = []
+    reader = _create_reader(parser, served)
+
+    async def _read() -> int:
+        count = 0
+        async with reader.list_items(None) as listing:
+            async for _ in listing.items:
+                count += 1
+                if count == limit:
+                    break
+        return count
+
+    tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        count = asyncio.run(_read())
+        seconds = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return count, seconds, peak, sum(served)
+
+
+@pytest.mark.parametrize("limit", [None, 1])
+def test_parse_benchmark(limit, report):
+    results = {parser: _measure(parser, limit) for parser in RssParserType}
+
+    report(
+        f"Reading {limit or 'all'} of {_ITEMS} items ({len(_FEED)} bytes):",
+        *(
+            f"{parser.value:>12}: {seconds * 1000:.0f} ms,"
+            f" peak {peak / 2**20:.1f} MB, {served} bytes read"
+            for parser, (_, seconds, peak, served) in results.items()
+        ),
+    )
+
+    element_tree = results[RssParserType.ELEMENT_TREE]
+    rss_parser = results[RssParserType.RSS_PARSER]
+    assert element_tree[0] == rss_parser[0] == (limit or _ITEMS)
+    assert element_tree[2] < rss_parser[2]
+    if limit:
+        # Only the first chunks have to be read to find the first item
+        assert element_tree[3] < len(_FEED)
@@ -0,0 +1,154 @@
+import asyncio
+from datetime import UTC, datetime
+
+import httpx
+import pytest
+
+from twittergram.application.exceptions.io import IoException
+from twittergram.application.model import CacheValidators, RssItem
+from twittergram.config import RssParserType
+from twittergram.infrastructure.adapters.rss_reader import (
+    ElementTreeRssReader,
+    RssParserRssReader,
+)
+from twittergram.infrastructure.adapters.rss_reader.feed import HttpFeedRssReader
+
+_FEED = b"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0">
+  <channel>
+    <title>Changelog</title>
+    <link>https://example.org</link>
+    <description>Changes</description>
+    <item>
+      <guid>https://example.org/changes/1</guid>
+      <title>First change</title>
+      <link>https://example.org/changes/1</link>
+      <description>Something changed</description>
+      <pubDate>Wed, 01 Jan 2025 12:00:00 GMT</pubDate>
+    </item>
+  </channel>
+</rss>
+"""
+
+_ATOM_FEED = b"""<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <id>tag:example.org,2025:changes</id>
+  <title>Changelog</title>
+  <updated>2025-01-02T12:00:00Z</updated>
+  <link rel="self" href="https://example.org/feed.atom"/>
+  <entry>
+    <id>tag:example.org,2025:changes/1</id>
+    <title type="xhtml">
+      <div xmlns="http://www.w3.org/1999/xhtml">First <b>change</b></div>
+    </title>
+    <link rel="alternate" href="https://example.org/changes/1"/>
+    <link rel="edit" href="https://example.org/changes/1/edit"/>
+    <published>2025-01-01T12:00:00Z</published>
+    <updated>2025-01-02T12:00:00Z</updated>
+    <content type="html">&lt;p&gt;Something changed&lt;/p&gt;</content>
+  </entry>
+</feed>
+"""
+
+_ETAG = '"v1"'
+
+_READERS: dict[RssParserType, type[HttpFeedRssReader]] = {
+    RssParserType.ELEMENT_TREE: ElementTreeRssReader,
+    RssParserType.RSS_PARSER: RssParserRssReader,
+}
+
+
+def _create_reader(
+    parser: RssParserType,
+    requests: list[httpx.Request],
+) -> HttpFeedRssReader:
+    def _serve(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if request.headers.get("If-None-Match") == _ETAG:
+            return httpx.Response(304)
+        return httpx.Response(200, headers={"ETag": _ETAG}, content=_FEED)
+
+    return _READERS[parser](
+        "https://example.org/feed.xml",
+        httpx.AsyncClient(transport=httpx.MockTransport(_serve)),
+    )
+
+
+async def _list(
+    reader: HttpFeedRssReader,
+    validators: CacheValidators | None = None,
+) -> tuple[list[RssItem], CacheValidators | None]:
+    async with reader.list_items(validators) as listing:
+        return [item async for item in listing.items], listing.validators
+
+
+@pytest.mark.parametrize("parser", list(RssParserType))
+def test_list_items(parser):
+    reader = _create_reader(parser, [])
+
+    items, _ = asyncio.run(_list(reader))
+
+    assert len(items) == 1
+    item = items[0]
+    assert item.id == "https://example.org/changes/1"
+    assert item.title == "First change"
+    assert item.synopsis == "Something changed"
+    assert item.published_at == datetime(2025, 1, 1, 12, tzinfo=UTC)
+    assert [str(link) for link in item.links] == ["https://example.org/changes/1"]
+
+
+@pytest.mark.parametrize("parser", list(RssParserType))
+def test_conditional_get(parser):
+    requests: list[httpx.Request] = []
+    reader = _create_reader(parser, requests)
+
+    items, validators = asyncio.run(_list(reader))
+
+    assert len(items) == 1
+    assert validators == CacheValidators(etag=_ETAG, last_modified=None)
+
+    # The next run passes the validators from the state
+    assert asyncio.run(_list(reader, validators)) == ([], validators)
+    assert requests[-1].headers["If-None-Match"] == _ETAG
+
+    # Without validators in the state, the feed is read in full again
+    items, _ = asyncio.run(_list(reader))
+
+    assert len(items) == 1
+    assert "If-None-Match" not in requests[-1].headers
+
+
+def test_list_atom_entries():
+    reader = ElementTreeRssReader(
+        "https://example.org/feed.atom",
+        httpx.AsyncClient(
+            transport=httpx.MockTransport(
+                lambda request: httpx.Response(200, content=_ATOM_FEED)
+            )
+        ),
+    )
+
+    items, _ = asyncio.run(_list(reader))
+
+    assert len(items) == 1
+    item = items[0]
+    assert item.id == "tag:example.org,2025:changes/1"
+    assert item.title == "First change"
+    assert item.synopsis == "<p>Something changed</p>"
+    assert item.published_at == datetime(2025, 1, 1, 12, tzinfo=UTC)
+    assert [str(link) for link in item.links] == ["https://example.org/changes/1"]
+
+
+@pytest.mark.parametrize("parser", list(RssParserType))
+def test_invalid_feed(parser):
+    reader = _READERS[parser](
+        "https://example.org/feed.xml",
+        httpx.AsyncClient(
+            transport=httpx.MockTransport(
+                lambda request: httpx.Response(200, content=b"<rss><channel")
+            )
+        ),
+    )
+
+    with pytest.raises(IoException):
+        asyncio.run(_list(reader))
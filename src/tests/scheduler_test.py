@@ -0,0 +1,40 @@
+import asyncio
+from datetime import UTC
+
+from twittergram.interface.scheduler import Scheduler, Service
+from twittergram.interface.scheduler import scheduler as scheduler_module
+
+
+def test_service_is_restarted_and_stopped(monkeypatch):
+    monkeypatch.setattr(scheduler_module, "_SERVICE_RESTART_DELAY", 0.01)
+    runs: list[str] = []
+    cancelled = asyncio.Event()
+
+    async def _serve() -> None:
+        runs.append("run")
+        if len(runs) == 1:
+            raise RuntimeError("Connection lost")
+
+        try:
+            await asyncio.Future()
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    async def _run() -> None:
+        scheduler = Scheduler(
+            [],
+            timezone=UTC,
+            services=[Service(name="serve", run=_serve)],
+        )
+        task = asyncio.create_task(scheduler.run())
+        while len(runs) < 2:
+            await asyncio.sleep(0.01)
+
+        scheduler.stop()
+        await asyncio.wait_for(task, timeout=1)
+
+    asyncio.run(_run())
+
+    assert runs == ["run", "run"]
+    assert cancelled.is_set()
@@ -0,0 +1,63 @@
+import asyncio
+from typing import Any, cast
+
+from bs_state import StateStorage
+
+from twittergram.application.model import MastodonState, RssState, State
+from twittergram.config import StateConfig
+from twittergram.infrastructure.repos.state_repo import BsStateBackend, BsStateRepo
+
+
+class _FakeStorage:
+    def __init__(self, state: State) -> None:
+        self.state = state
+        self.closed = False
+
+    async def load(self) -> State:
+        return self.state
+
+    async def store(self, state: State) -> None:
+        self.state = state
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+def test_instances_share_backend():
+    storages: list[tuple[StateConfig, _FakeStorage]] = []
+
+    async def _load_storage(
+        initial_state: State,
+        config: StateConfig,
+    ) -> StateStorage[Any]:
+        storage = _FakeStorage(initial_state)
+        storages.append((config, storage))
+        return cast(StateStorage[Any], storage)
+
+    config = StateConfig(type="file", config_map=None, state_file="state.json")
+    backend = BsStateBackend(_load_storage)
+    first = BsStateRepo(backend, config.for_instance("first"))
+    second = BsStateRepo(backend, config.for_instance("second"))
+
+    async def _run() -> None:
+        await first.store_state(MastodonState(last_toot_id=1))
+        await second.store_state(MastodonState(last_toot_id=2))
+        await first.load_state(RssState)
+
+        assert (await first.load_state(MastodonState)).last_toot_id == 1
+        assert (await second.load_state(MastodonState)).last_toot_id == 2
+
+        # Instances don't close the storages they share the backend with
+        await first.close()
+        assert not any(storage.closed for _, storage in storages)
+
+        await backend.close()
+
+    asyncio.run(_run())
+
+    assert [config.state_file for config, _ in storages] == [
+        "state-first.json",
+        "state-second.json",
+        "state-first.json",
+    ]
+    assert all(storage.closed for _, storage in storages)
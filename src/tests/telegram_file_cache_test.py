@@ -0,0 +1,23 @@
+from twittergram.infrastructure.adapters.telegram_uploader import TelegramFileCache
+
+
+def test_evicts_least_recently_used():
+    cache = TelegramFileCache(max_size=2)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    assert cache.get("a") == "1"
+
+    cache.put("c", "3")
+
+    assert cache.get("b") is None
+    assert cache.entries() == {"a": "1", "c": "3"}
+
+
+def test_merge_keeps_present_entries():
+    cache = TelegramFileCache(max_size=2)
+    cache.put("a", "new")
+
+    cache.merge({"a": "old", "b": "2", "c": "3"})
+
+    # Merged entries are older than present ones, so they're evicted first
+    assert cache.entries() == {"c": "3", "a": "new"}
@@ -0,0 +1,65 @@
+import pytest
+
+from twittergram.infrastructure.adapters.telegram_uploader import TelegramRateLimiter
+
+
+class _FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return _FakeClock()
+
+
+@pytest.fixture
+def limiter(clock):
+    return TelegramRateLimiter(clock=clock)
+
+
+def test_first_send_is_immediate(limiter):
+    assert limiter.reserve(1) == 0
+
+
+def test_chat_limit(limiter):
+    delays = [limiter.reserve(1) for _ in range(3)]
+    assert delays == pytest.approx([0, 1, 2])
+
+
+def test_chat_limit_elapsed(limiter, clock):
+    limiter.reserve(1)
+    clock.now = 5
+    assert limiter.reserve(1) == 0
+
+
+def test_group_limit(limiter):
+    delays = [limiter.reserve(-100) for _ in range(3)]
+    assert delays == pytest.approx([0, 3, 6])
+
+
+def test_global_limit(limiter):
+    delays = [limiter.reserve(chat_id) for chat_id in range(1, 62)]
+    assert delays[29] == pytest.approx(29 / 30)
+    assert delays[60] == pytest.approx(2)
+
+
+def test_idle_chat_not_blocked(limiter):
+    for _ in range(5):
+        limiter.reserve(1)
+
+    # Chat 1 is booked for the next five seconds, but the global limit is not
+    assert limiter.reserve(2) == pytest.approx(1 / 30)
+
+
+def test_multiple_messages(limiter):
+    assert limiter.reserve(1, messages=3) == 0
+    assert limiter.reserve(1) == pytest.approx(3)
+
+
+def test_invalid_message_count(limiter):
+    with pytest.raises(ValueError):
+        limiter.reserve(1, messages=0)
@@ -0,0 +1,221 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from twittergram.application.model import (
+    MediaFile,
+    MediaType,
+    Medium,
+    TelegramFileState,
+)
+from twittergram.application.repos import StateRepo
+from twittergram.config import TelegramBotConfig, TelegramConfig
+from twittergram.infrastructure.adapters.telegram_uploader import (
+    PtbTelegramUploader,
+    TelegramBotSession,
+    TelegramFileCache,
+    TelegramFileStore,
+    TelegramRateLimiter,
+)
+
+from .conftest import MemoryStateRepo
+
+_ITEMS = 10
+
+
+async def _skip_sleep(seconds: float) -> None:
+    pass
+
+
+def _create_session(api_url: str) -> TelegramBotSession:
+    return TelegramBotSession(TelegramBotConfig(api_url=api_url, token="123:token"))
+
+
+def _create_file_store(state_repo: StateRepo | None = None) -> TelegramFileStore:
+    return TelegramFileStore(TelegramFileCache(), state_repo or MemoryStateRepo())
+
+
+def _create_uploader(
+    session: TelegramBotSession,
+    file_store: TelegramFileStore | None = None,
+    target_chat: int = 1,
+) -> PtbTelegramUploader:
+    return PtbTelegramUploader(
+        TelegramConfig(
+            send_by_url=False,
+            target_chat=target_chat,
+            upload_chat=2,
+        ),
+        session,
+        TelegramRateLimiter(sleep=_skip_sleep),
+        file_store or _create_file_store(),
+    )
+
+
+def _create_image(path: Path, content: bytes) -> MediaFile:
+    path.write_bytes(content)
+    return MediaFile(
+        medium=Medium(type=MediaType.PHOTO, id=path.name, url="https://example.org"),
+        path=path,
+        mime_type="image/jpeg",
+    )
+
+
+@pytest.fixture
+def image_file(tmp_path):
+    return _create_image(tmp_path / "image.jpg", b"\xff" * 1024)
+
+
+def test_send_reuses_connection(fake_bot_api, image_file, report):
+    async def _forward() -> None:
+        session = _create_session(fake_bot_api.url)
+        uploader = _create_uploader(session)
+        try:
+            for index in range(_ITEMS):
+                if index % 2:
+                    await uploader.send_text_message(f"Item {index}")
+                else:
+                    await uploader.send_image_message([image_file], caption=None)
+        finally:
+            await uploader.close()
+            await session.close()
+
+    asyncio.run(_forward())
+
+    requests = fake_bot_api.requests.total()
+    report(
+        f"{_ITEMS} items: {fake_bot_api.connections} connection(s),"
+        f" {requests} requests ({requests / _ITEMS:.1f} per item)"
+    )
+
+    assert fake_bot_api.connections == 1
+    assert fake_bot_api.requests["getMe"] == 1
+    assert requests == _ITEMS + 1
+
+
+def test_send_cached_files(fake_bot_api, tmp_path, state_repo):
+    images = [
+        _create_image(tmp_path / "first.jpg", b"\x01" * 1024),
+        _create_image(tmp_path / "second.jpg", b"\x02" * 1024),
+    ]
+
+    async def _forward() -> None:
+        session = _create_session(fake_bot_api.url)
+        file_store = _create_file_store(state_repo)
+        uploader = _create_uploader(session, file_store)
+        try:
+            await uploader.send_image_message(images, caption=None)
+        finally:
+            await uploader.close()
+            await file_store.close()
+            await session.close()
+
+    asyncio.run(_forward())
+    assert fake_bot_api.uploads == 2
+
+    # A new file store with an empty in-memory cache loads the stored file IDs
+    asyncio.run(_forward())
+    assert fake_bot_api.uploads == 2
+    assert fake_bot_api.requests["sendPhoto"] == 2
+    assert fake_bot_api.requests["sendMediaGroup"] == 2
+
+
+def test_send_image_urls(fake_bot_api):
+    images = [
+        Medium(type=MediaType.PHOTO, id=str(index), url=f"https://example.org/{index}")
+        for index in range(2)
+    ]
+
+    async def _forward() -> list[bool]:
+        session = _create_session(fake_bot_api.url)
+        uploader = _create_uploader(session)
+        try:
+            return [
+                await uploader.send_image_urls_message(images[:1], caption="Single"),
+                await uploader.send_image_urls_message(images, caption="Group"),
+                await uploader.send_image_urls_message(images, caption="x" * 2000),
+            ]
+        finally:
+            await uploader.close()
+            await session.close()
+
+    assert asyncio.run(_forward()) == [True, True, False]
+    assert fake_bot_api.uploads == 0
+    assert fake_bot_api.requests["sendPhoto"] == 1
+    assert fake_bot_api.requests["sendMediaGroup"] == 1
+    assert fake_bot_api.requests["sendMessage"] == 0
+
+
+def test_instances_share_bot(fake_bot_api):
+    async def _forward() -> None:
+        session = _create_session(fake_bot_api.url)
+        uploaders = [
+            _create_uploader(session, target_chat=chat) for chat in range(1, 4)
+        ]
+        try:
+            for uploader in uploaders:
+                await uploader.send_text_message("Item")
+        finally:
+            for uploader in uploaders:
+                await uploader.close()
+            await session.close()
+
+    asyncio.run(_forward())
+
+    assert fake_bot_api.connections == 1
+    assert fake_bot_api.requests["getMe"] == 1
+    assert fake_bot_api.requests["sendMessage"] == 3
+
+
+def test_instances_share_file_cache(fake_bot_api, tmp_path, state_repo):
+    images = [
+        _create_image(tmp_path / f"{index}.jpg", bytes([index]) * 1024)
+        for index in range(3)
+    ]
+
+    async def _forward() -> None:
+        session = _create_session(fake_bot_api.url)
+        file_store = _create_file_store(state_repo)
+        uploaders = [
+            _create_uploader(session, file_store, target_chat=chat)
+            for chat in range(1, 4)
+        ]
+        try:
+            # Every instance sends every image, so each is uploaded only once
+            for uploader in uploaders:
+                for image in images:
+                    await uploader.send_image_message([image], caption=None)
+        finally:
+            for uploader in uploaders:
+                await uploader.close()
+            await file_store.close()
+            await session.close()
+
+    asyncio.run(_forward())
+
+    assert fake_bot_api.uploads == 3
+    assert fake_bot_api.requests["sendPhoto"] == 9
+    state = state_repo.states[TelegramFileState]
+    assert len(state.file_ids) == 3
+
+
+def test_flush_stores_new_file_ids(fake_bot_api, image_file, state_repo):
+    async def _forward() -> None:
+        session = _create_session(fake_bot_api.url)
+        uploader = _create_uploader(session, _create_file_store(state_repo))
+        try:
+            await uploader.send_image_message([image_file], caption=None)
+            await uploader.flush()
+            stored = state_repo.states[TelegramFileState]
+            assert len(stored.file_ids) == 1
+
+            # Sending the file again adds no new file ID
+            await uploader.send_image_message([image_file], caption=None)
+            await uploader.flush()
+            assert state_repo.states[TelegramFileState] is stored
+        finally:
+            await uploader.close()
+            await session.close()
+
+    asyncio.run(_forward())
@@ -0,0 +1,224 @@
+import asyncio
+import time
+from collections.abc import AsyncGenerator
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+import httpx
+import pytest
+
+from twittergram.application.model import (
+    MastodonState,
+    MediaFile,
+    MediaType,
+    Medium,
+    Toot,
+)
+from twittergram.application.ports import MastodonReader, TelegramUploader
+from twittergram.application.repos import StateRepo
+from twittergram.application.use_cases import ForwardToots
+from twittergram.infrastructure.adapters.html_sanitizer import NaiveHtmlSanitizer
+from twittergram.infrastructure.adapters.media_downloader import (
+    DownloadCache,
+    DownloaderRegistry,
+    DownloadLimits,
+    DownloadWorkspace,
+    HttpMediaDownloader,
+    LimitedDownloadScheduler,
+)
+
+_TOOTS = 8
+_MEDIA_PER_TOOT = 2
+# Latency of a single request to the fake CDN and of a single Telegram send
+_DOWNLOAD_SECONDS = 0.1
+_SEND_SECONDS = 0.05
+_HOST_CONCURRENCY = 4
+
+
+class _FakeMastodonReader(MastodonReader):
+    def __init__(self) -> None:
+        self.lookups = 0
+
+    @property
+    def source_account(self) -> str:
+        return "user@mastodon.example"
+
+    async def lookup_user_id(self) -> int:
+        self.lookups += 1
+        return 1
+
+    async def list_toots(
+        self,
+        user_id: int,
+        until_id: int | None = None,
+    ) -> AsyncGenerator[Toot]:
+        # Reverse chronological, like the API
+        for toot_id in range(_TOOTS, until_id or 0, -1):
+            yield Toot(
+                id=toot_id,
+                url=f"https://mastodon.example/@user/{toot_id}",
+                content=f"<p>Toot {toot_id}</p>",
+                created_at=datetime(2025, 1, 1, tzinfo=UTC),
+                media_attachments=[
+                    Medium(
+                        type=MediaType.PHOTO,
+                        id=f"{toot_id}-{index}",
+                        url=f"https://cdn.mastodon.example/{toot_id}/{index}.jpg",
+                    )
+                    for index in range(_MEDIA_PER_TOOT)
+                ],
+            )
+
+
+class _FakeUploader(TelegramUploader):
+    def __init__(self, accept_urls: bool | None = None) -> None:
+        self.accept_urls = accept_urls
+        self.sent_at: list[float] = []
+        self.captions: list[str | None] = []
+        self.flushes = 0
+
+    async def _send(self, caption: str | None) -> None:
+        await asyncio.sleep(_SEND_SECONDS)
+        self.sent_at.append(time.monotonic())
+        self.captions.append(caption)
+
+    async def send_text_message(self, text: str, use_html: bool = False) -> None:
+        await self._send(text)
+
+    async def send_documents_message(
+        self,
+        documents: list[MediaFile],
+        *,
+        caption: str | None,
+        use_html: bool = False,
+        disable_notification: bool = False,
+    ) -> None:
+        await self._send(caption)
+
+    async def send_image_message(
+        self,
+        image_files: list[MediaFile],
+        caption: str | None,
+        use_html: bool = False,
+    ) -> None:
+        assert all(image_file.path.is_file() for image_file in image_files)
+        await self._send(caption)
+
+    @property
+    def sends_by_url(self) -> bool:
+        return self.accept_urls is not None
+
+    async def send_image_urls_message(
+        self,
+        images: list[Medium],
+        caption: str | None,
+        use_html: bool = False,
+    ) -> bool:
+        if self.accept_urls:
+            await self._send(caption)
+        return bool(self.accept_urls)
+
+    async def flush(self) -> None:
+        self.flushes += 1
+
+    async def close(self) -> None:
+        pass
+
+
+def _create_use_case(
+    tmp_path: Path,
+    uploader: TelegramUploader,
+    state_repo: StateRepo,
+    requests: list[httpx.Request],
+    reader: MastodonReader | None = None,
+) -> ForwardToots:
+    async def _serve_cdn(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        await asyncio.sleep(_DOWNLOAD_SECONDS)
+        return httpx.Response(
+            200,
+            headers={"Content-Type": "image/jpeg"},
+            content=b"\xff" * 1024,
+        )
+
+    workspace = DownloadWorkspace(tmp_path / "work", quota=0, max_age=timedelta())
+    downloader = HttpMediaDownloader(
+        workspace,
+        max_file_size=4096,
+        cache=DownloadCache(tmp_path / "cache", max_size=0),
+        client=httpx.AsyncClient(transport=httpx.MockTransport(_serve_cdn)),
+    )
+    return ForwardToots(
+        download_scheduler=LimitedDownloadScheduler(
+            DownloaderRegistry([downloader]),
+            DownloadLimits(concurrency=8, host_concurrency=_HOST_CONCURRENCY),
+            workspace,
+        ),
+        media_workspace=workspace,
+        sanitizer=NaiveHtmlSanitizer(),
+        reader=reader or _FakeMastodonReader(),
+        state_repo=state_repo,
+        uploader=uploader,
+    )
+
+
+def test_forward_toots_pipeline(tmp_path, report, state_repo):
+    uploader = _FakeUploader()
+    requests: list[httpx.Request] = []
+    forward_toots = _create_use_case(tmp_path, uploader, state_repo, requests)
+
+    start = time.monotonic()
+    asyncio.run(forward_toots())
+    first_message = uploader.sent_at[0] - start
+    total = uploader.sent_at[-1] - start
+
+    report(
+        f"Forwarded {_TOOTS} toots: first message after {first_message:.2f} s,"
+        f" all after {total:.2f} s"
+    )
+
+    assert uploader.captions == [f"Toot {index}" for index in range(1, _TOOTS + 1)]
+    assert state_repo.states[MastodonState].last_toot_id == _TOOTS
+    assert uploader.flushes == 1
+    assert not list((tmp_path / "work").iterdir())
+    # Downloading everything first would take all downloads before the first send
+    all_downloads = _TOOTS * _MEDIA_PER_TOOT * _DOWNLOAD_SECONDS / _HOST_CONCURRENCY
+    assert first_message < all_downloads
+    # Downloads overlap with sends, so only the sends add up
+    assert total < _TOOTS * (_DOWNLOAD_SECONDS + _SEND_SECONDS)
+
+
+@pytest.mark.parametrize("accept_urls", [True, False])
+def test_forward_toots_by_url(tmp_path, accept_urls, state_repo):
+    uploader = _FakeUploader(accept_urls=accept_urls)
+    requests: list[httpx.Request] = []
+    forward_toots = _create_use_case(tmp_path, uploader, state_repo, requests)
+
+    asyncio.run(forward_toots())
+
+    assert len(uploader.captions) == _TOOTS
+    # Media are only downloaded if Telegram can't fetch them itself
+    assert len(requests) == (0 if accept_urls else _TOOTS * _MEDIA_PER_TOOT)
+
+
+def test_forward_toots_caches_user_id(tmp_path, state_repo):
+    reader = _FakeMastodonReader()
+    requests: list[httpx.Request] = []
+    forward_toots = _create_use_case(
+        tmp_path, _FakeUploader(), state_repo, requests, reader
+    )
+
+    asyncio.run(forward_toots())
+    asyncio.run(forward_toots())
+
+    assert reader.lookups == 1
+    state = state_repo.states[MastodonState]
+    assert state.source_account == reader.source_account
+    assert state.user_id == 1
+
+    # A different source account must be looked up again
+    state.source_account = "other@mastodon.example"
+    asyncio.run(forward_toots())
+
+    assert reader.lookups == 2
+    assert state_repo.states[MastodonState].source_account == reader.source_account
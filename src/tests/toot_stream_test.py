@@ -0,0 +1,171 @@
+import asyncio
+import time
+from collections.abc import Callable
+from datetime import timedelta
+
+from twittergram.application.model import MastodonState, MediaFile, Medium
+from twittergram.application.ports import TelegramUploader
+from twittergram.application.use_cases import StreamToots
+from twittergram.config import MastodonConfig, MastodonReaderType, MastodonStreamType
+from twittergram.infrastructure.adapters.html_sanitizer import NaiveHtmlSanitizer
+from twittergram.infrastructure.adapters.mastodon_reader import (
+    RestApiMastodonReader,
+    SseMastodonStream,
+)
+from twittergram.infrastructure.adapters.media_downloader import (
+    DownloaderRegistry,
+    DownloadLimits,
+    DownloadWorkspace,
+    LimitedDownloadScheduler,
+)
+
+from .conftest import FakeMastodonApi
+
+_TIMEOUT = 5.0
+
+
+class _FakeUploader(TelegramUploader):
+    def __init__(self) -> None:
+        self.captions: list[str | None] = []
+        self.sent_at: list[float] = []
+
+    def _send(self, caption: str | None) -> None:
+        self.captions.append(caption)
+        self.sent_at.append(time.monotonic())
+
+    async def send_text_message(self, text: str, use_html: bool = False) -> None:
+        self._send(text)
+
+    async def send_documents_message(
+        self,
+        documents: list[MediaFile],
+        *,
+        caption: str | None,
+        use_html: bool = False,
+        disable_notification: bool = False,
+    ) -> None:
+        self._send(caption)
+
+    async def send_image_message(
+        self,
+        image_files: list[MediaFile],
+        caption: str | None,
+        use_html: bool = False,
+    ) -> None:
+        self._send(caption)
+
+    @property
+    def sends_by_url(self) -> bool:
+        return True
+
+    async def send_image_urls_message(
+        self,
+        images: list[Medium],
+        caption: str | None,
+        use_html: bool = False,
+    ) -> bool:
+        self._send(caption)
+        return True
+
+    async def close(self) -> None:
+        pass
+
+
+def _create_config(poll_interval: timedelta) -> MastodonConfig:
+    return MastodonConfig(
+        access_token="token",
+        api_base_url="https://mastodon.example",
+        client_id="id",
+        client_secret="secret",
+        poll_interval=poll_interval,
+        reader=MastodonReaderType.REST_API,
+        source_account=FakeMastodonApi.account_name,
+        stream=MastodonStreamType.USER,
+    )
+
+
+def _create_stream(api: FakeMastodonApi) -> SseMastodonStream:
+    config = _create_config(timedelta(minutes=5))
+    return SseMastodonStream(config, MastodonStreamType.USER, api.client())
+
+
+async def _wait_for(condition: Callable[[], bool]) -> None:
+    async with asyncio.timeout(_TIMEOUT):
+        while not condition():
+            await asyncio.sleep(0.01)
+
+
+def test_stream_yields_public_toots_of_user():
+    api = FakeMastodonApi(toots=0)
+    stream = _create_stream(api)
+
+    async def _read() -> list[int]:
+        async with stream.open(api.user_id) as toots:
+            other = {**api.status(10), "account": {"id": "2"}}
+            reblog = {**api.status(11), "reblog": api.status(1)}
+            reply = {**api.status(12), "in_reply_to_account_id": "2"}
+            own_reply = {**api.status(13), "in_reply_to_account_id": "1"}
+            private = {**api.status(14), "visibility": "private"}
+            for status in [other, reblog, reply, own_reply, private]:
+                api.post(**status)
+            api.post()
+            api.close_streams()
+
+            return [toot.id async for toot in toots]
+
+    assert asyncio.run(_read()) == [13, 1]
+
+    request = api.stream_requests[0]
+    assert request.url.host == api.streaming_host
+    assert request.headers["Authorization"] == "Bearer token"
+
+
+def test_stream_toots_falls_back_to_polling(tmp_path, state_repo):
+    api = FakeMastodonApi(toots=3)
+    api.streaming = False
+    uploader = _FakeUploader()
+    state_repo.states[MastodonState] = MastodonState(last_toot_id=2)
+    workspace = DownloadWorkspace(tmp_path / "work", quota=0, max_age=timedelta())
+    client = api.client()
+    config = _create_config(timedelta(milliseconds=50))
+    stream_toots = StreamToots(
+        download_scheduler=LimitedDownloadScheduler(
+            DownloaderRegistry([]),
+            DownloadLimits(concurrency=1, host_concurrency=1),
+            workspace,
+        ),
+        media_workspace=workspace,
+        sanitizer=NaiveHtmlSanitizer(),
+        reader=RestApiMastodonReader(config, client),
+        state_repo=state_repo,
+        uploader=uploader,
+        config=config,
+        stream=SseMastodonStream(config, MastodonStreamType.USER, client),
+    )
+
+    async def _run() -> float:
+        task = asyncio.create_task(stream_toots())
+        try:
+            # The toot missed before is caught up on by polling
+            await _wait_for(lambda: uploader.captions == ["Toot 3"])
+            api.post()
+            await _wait_for(lambda: uploader.captions == ["Toot 3", "Toot 4"])
+
+            # Once the stream is back, toots are forwarded as they're posted
+            api.streaming = True
+            await _wait_for(lambda: api.streams > 0)
+            api.post(**api.status(4))
+            posted_at = time.monotonic()
+            api.post()
+            await _wait_for(lambda: len(uploader.captions) == 3)
+            return uploader.sent_at[-1] - posted_at
+        finally:
+            task.cancel()
+
+    latency = asyncio.run(_run())
+
+    assert uploader.captions == ["Toot 3", "Toot 4", "Toot 5"]
+    assert state_repo.states[MastodonState].last_toot_id == 5
+    assert api.lookups == 1
+    # Pushed toots don't wait for the next poll
+    assert latency < config.poll_interval.total_seconds()
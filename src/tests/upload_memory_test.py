@@ -0,0 +1,72 @@
+import os
+
+from .conftest import run_python
+
+_FILE_SIZE = 128 * 1024 * 1024
+# Peak RSS growth allowed while uploading, which must not scale with the file size
+_DEFAULT_CEILING_MB = 48
+_CEILING_ENV_KEY = "TWITTERGRAM_UPLOAD_RSS_CEILING_MB"
+
+_SCRIPT = """
+import asyncio
+import resource
+import sys
+from pathlib import Path
+
+from twittergram.application.model import MediaFile, MediaType, Medium
+from twittergram.config import TelegramBotConfig, TelegramConfig
+from twittergram.infrastructure.adapters.telegram_uploader import (
+    PtbTelegramUploader,
+    TelegramBotSession,
+    TelegramFileCache,
+    TelegramFileStore,
+    TelegramRateLimiter,
+)
+from tests.conftest import MemoryStateRepo
+
+
+def _max_rss_kb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+async def _send(api_url, path):
+    session = TelegramBotSession(TelegramBotConfig(api_url=api_url, token="1:t"))
+    uploader = PtbTelegramUploader(
+        TelegramConfig(send_by_url=False, target_chat=1, upload_chat=2),
+        session,
+        TelegramRateLimiter(),
+        TelegramFileStore(TelegramFileCache(), MemoryStateRepo()),
+    )
+    document = MediaFile(
+        medium=Medium(type=MediaType.VIDEO, id="1", url="https://example.org"),
+        path=path,
+        mime_type="video/mp4",
+    )
+    try:
+        # Warm up, so that the measurement doesn't include the client setup
+        await uploader.send_text_message("warm-up")
+        baseline = _max_rss_kb()
+        await uploader.send_documents_message([document], caption=None)
+        print(_max_rss_kb() - baseline)
+    finally:
+        await uploader.close()
+        await session.close()
+
+
+asyncio.run(_send(sys.argv[1], Path(sys.argv[2])))
+"""
+
+
+def test_upload_memory(fake_bot_api, tmp_path, report):
+    path = tmp_path / "large.mp4"
+    with path.open("wb") as f:
+        f.truncate(_FILE_SIZE)
+
+    result = run_python("-c", _SCRIPT, fake_bot_api.url, str(path))
+    growth_mb = int(result.stdout.splitlines()[-1]) / 1024
+
+    report(f"Uploading {_FILE_SIZE // 2**20} MB grew peak RSS by {growth_mb:.1f} MB")
+
+    assert fake_bot_api.received_bytes >= _FILE_SIZE
+    ceiling_mb = float(os.getenv(_CEILING_ENV_KEY, _DEFAULT_CEILING_MB))
+    assert growth_mb <= ceiling_mb
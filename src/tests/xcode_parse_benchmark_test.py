@@ -0,0 +1,113 @@
+import asyncio
+import json
+import time
+import tracemalloc
+from collections.abc import AsyncIterator, Callable, Coroutine
+from typing import Any
+
+import httpx
+
+from twittergram.infrastructure.adapters.xcode_release_reader import (
+    XcrXcodeReleaseReader,
+)
+
+_RELEASES = 4000
+_CHUNK_SIZE = 64 * 1024
+
+
+def _raw_release(index: int) -> dict[str, Any]:
+    # Shaped like the entries of data.json, including the fields we don't use
+    build = f"{index}A{index:03d}"
+    return {
+        "checksums": {"sha1": "0" * 40},
+        "compilers": {
+            "clang": [{"build": "1500.0.40.1", "number": "15.0.0", "release": {}}],
+            "swift": [{"build": "5.9.0.128.108", "number": "5.9", "release": {}}],
+        },
+        "date": {"day": 1, "month": 1, "year": 2025},
+        "links": {
+            "download": {"url": f"https://download.developer.apple.com/{build}.xip"},
+            "notes": {"url": f"https://developer.apple.com/notes/{build}"},
+        },
+        "name": "Xcode",
+        "requires": "14.0",
+        "sdks": {
+            platform: [{"build": build, "number": "17.0", "release": {}}]
+            for platform in ("iOS", "macOS", "tvOS", "watchOS", "visionOS")
+        },
+        "version": {
+            "build": build,
+            "number": f"16.{index}",
+            "release": {"release": True} if index % 3 else {"beta": 1},
+        },
+    }
+
+
+_DOCUMENT = json.dumps([_raw_release(index) for index in range(_RELEASES)]).encode()
+
+
+def _create_reader() -> XcrXcodeReleaseReader:
+    async def _chunks() -> AsyncIterator[bytes]:
+        for start in range(0, len(_DOCUMENT), _CHUNK_SIZE):
+            yield _DOCUMENT[start : start + _CHUNK_SIZE]
+
+    return XcrXcodeReleaseReader(
+        httpx.AsyncClient(
+            transport=httpx.MockTransport(
+                lambda request: httpx.Response(200, content=_chunks())
+            )
+        )
+    )
+
+
+async def _read_json() -> int:
+    # The previous path: decode the whole document, then build every release
+    response = httpx.Response(200, content=_DOCUMENT)
+    return sum(
+        1
+        for raw_release in response.json()
+        if XcrXcodeReleaseReader._build_release(raw_release)
+    )
+
+
+async def _read_all() -> int:
+    async with _create_reader().get_releases(None) as listing:
+        return len([release async for release in listing.items])
+
+
+async def _read_first() -> int:
+    async with _create_reader().get_releases(None) as listing:
+        return 1 if await anext(listing.items, None) else 0
+
+
+def _measure(read: Callable[[], Coroutine[Any, Any, int]]) -> tuple[float, int]:
+    tracemalloc.start()
+    try:
+        start = time.process_time()
+        asyncio.run(read())
+        seconds = time.process_time() - start
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return seconds, peak
+
+
+def test_xcode_parse_benchmark(report):
+    results = {
+        "json": _measure(_read_json),
+        "incremental, all": _measure(_read_all),
+        "incremental, first": _measure(_read_first),
+    }
+
+    report(
+        f"Reading {_RELEASES} releases ({len(_DOCUMENT)} bytes):",
+        *(
+            f"{name:>18}: {seconds * 1000:.0f} ms CPU, peak {peak / 2**20:.1f} MB"
+            for name, (seconds, peak) in results.items()
+        ),
+    )
+
+    assert results["incremental, all"][1] < results["json"][1]
+    assert results["incremental, first"][0] < results["json"][0]
+    assert results["incremental, first"][1] < results["json"][1]
@@ -0,0 +1,195 @@
+import asyncio
+import json
+from collections.abc import AsyncIterator
+
+import httpx
+import pytest
+
+from twittergram.application.exceptions.io import IoException
+from twittergram.application.model import (
+    CacheValidators,
+    MediaFile,
+    Medium,
+    XcodeRelease,
+    XcodeState,
+)
+from twittergram.application.ports import TelegramUploader
+from twittergram.application.use_cases import ForwardXcode
+from twittergram.infrastructure.adapters.xcode_release_reader import (
+    XcrXcodeReleaseReader,
+)
+from twittergram.infrastructure.adapters.xcode_release_reader.json_array import (
+    JsonArrayParser,
+)
+
+_ETAG = '"v1"'
+
+
+def _raw_release(build: str, beta: bool = False) -> dict[str, object]:
+    return {
+        "version": {
+            "number": "16.0",
+            "build": build,
+            "release": {"beta": 1} if beta else {"release": True},
+        },
+        "date": {"year": 2025, "month": 1, "day": 1},
+        "links": {"notes": {"url": f"https://developer.apple.com/{build}"}},
+    }
+
+
+_RELEASES = [_raw_release("C"), _raw_release("B", beta=True), _raw_release("A")]
+_DOCUMENT = json.dumps(_RELEASES, indent=2).encode()
+
+
+def test_json_array_parser():
+    document = '[1, 23, "a,]", {"b": [4, 5]}, [], -6.5e3 ]'
+    expected = json.loads(document)
+
+    # Every possible split between two parts
+    for split in range(len(document) + 1):
+        parser = JsonArrayParser()
+        elements = [
+            *parser.feed(document[:split]),
+            *parser.feed(document[split:]),
+        ]
+        parser.close()
+
+        assert elements == expected, split
+
+
+@pytest.mark.parametrize("document", ["[1, 2", "{}", "[1 2]"])
+def test_json_array_parser_invalid(document):
+    parser = JsonArrayParser()
+    with pytest.raises(ValueError):
+        list(parser.feed(document))
+        parser.close()
+
+
+def _create_reader(requests: list[httpx.Request]) -> XcrXcodeReleaseReader:
+    async def _chunks() -> AsyncIterator[bytes]:
+        for start in range(0, len(_DOCUMENT), 16):
+            requests[-1].extensions["served"] = start + 16
+            yield _DOCUMENT[start : start + 16]
+
+    def _serve(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if request.headers.get("If-None-Match") == _ETAG:
+            return httpx.Response(304)
+        return httpx.Response(200, headers={"ETag": _ETAG}, content=_chunks())
+
+    return XcrXcodeReleaseReader(
+        httpx.AsyncClient(transport=httpx.MockTransport(_serve))
+    )
+
+
+async def _list(
+    reader: XcrXcodeReleaseReader,
+    validators: CacheValidators | None = None,
+) -> tuple[list[XcodeRelease], CacheValidators | None]:
+    async with reader.get_releases(validators) as listing:
+        return [release async for release in listing.items], listing.validators
+
+
+def test_get_releases():
+    requests: list[httpx.Request] = []
+    reader = _create_reader(requests)
+
+    releases, validators = asyncio.run(_list(reader))
+
+    assert [release.version_build for release in releases] == ["C", "A"]
+    assert validators == CacheValidators(etag=_ETAG, last_modified=None)
+
+
+def test_get_first_release():
+    requests: list[httpx.Request] = []
+    reader = _create_reader(requests)
+
+    async def _first() -> XcodeRelease | None:
+        async with reader.get_releases(None) as listing:
+            return await anext(listing.items, None)
+
+    release = asyncio.run(_first())
+
+    assert release
+    assert release.version_build == "C"
+    # The rest of the releases isn't downloaded
+    assert requests[0].extensions["served"] < len(_DOCUMENT)
+
+
+def test_conditional_get():
+    requests: list[httpx.Request] = []
+    reader = _create_reader(requests)
+    validators = CacheValidators(etag=_ETAG, last_modified=None)
+
+    assert asyncio.run(_list(reader, validators)) == ([], validators)
+    assert requests[0].headers["If-None-Match"] == _ETAG
+
+
+class _FakeUploader(TelegramUploader):
+    def __init__(self, failing: bool = False) -> None:
+        self.messages: list[str] = []
+        self.failing = failing
+
+    async def send_text_message(self, text: str, use_html: bool = False) -> None:
+        if self.failing:
+            raise IoException("Sending failed")
+        self.messages.append(text)
+
+    async def send_documents_message(
+        self,
+        documents: list[MediaFile],
+        *,
+        caption: str | None,
+        use_html: bool = False,
+        disable_notification: bool = False,
+    ) -> None:
+        raise NotImplementedError
+
+    async def send_image_message(
+        self,
+        image_files: list[MediaFile],
+        caption: str | None,
+        use_html: bool = False,
+    ) -> None:
+        raise NotImplementedError
+
+    @property
+    def sends_by_url(self) -> bool:
+        return False
+
+    async def send_image_urls_message(
+        self,
+        images: list[Medium],
+        caption: str | None,
+        use_html: bool = False,
+    ) -> bool:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+
+def test_failed_release_is_retried_on_unchanged_releases(state_repo):
+    requests: list[httpx.Request] = []
+    reader = _create_reader(requests)
+    state_repo.states[XcodeState] = XcodeState(last_release_build="A")
+
+    def _forward(uploader: _FakeUploader) -> list[str]:
+        forward_xcode = ForwardXcode(
+            state_repo=state_repo,
+            telegram_uploader=uploader,
+            xcode_release_reader=reader,
+        )
+        asyncio.run(forward_xcode())
+        return uploader.messages
+
+    with pytest.raises(IoException):
+        _forward(_FakeUploader(failing=True))
+
+    # The releases haven't changed, but one of them wasn't forwarded yet
+    [message] = _forward(_FakeUploader())
+    assert "https://developer.apple.com/C" in message
+    assert "If-None-Match" not in requests[-1].headers
+
+    assert _forward(_FakeUploader()) == []
+    assert requests[-1].headers["If-None-Match"] == _ETAG
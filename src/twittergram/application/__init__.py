@@ -2,19 +2,42 @@ from dataclasses import dataclass
 
 from injector import Injector, inject
 
-from twittergram.application import repos, use_cases
+from twittergram.application import ports, repos, use_cases
+from twittergram.config import Config, ScheduleConfig
 
 
 @inject
 @dataclass
-class _StateAccess:
+class _Resources:
     repo: repos.StateRepo
+    telegram_uploader: ports.TelegramUploader
 
 
 class Application:
     def __init__(self, injector: Injector):
         self._injector = injector
 
+    @property
+    def schedule_config(self) -> ScheduleConfig:
+        return self._injector.get(ScheduleConfig)
+
+    @property
+    def streams_bluesky_posts(self) -> bool:
+        """
+        Whether posts are forwarded from a Jetstream subscription instead of on
+        schedule.
+        """
+        config = self._injector.get(Config).bluesky
+        return config is not None and config.jetstream_url is not None
+
+    @property
+    def streams_toots(self) -> bool:
+        """
+        Whether toots are forwarded from the streaming API instead of on schedule.
+        """
+        config = self._injector.get(Config).mastodon
+        return config is not None and config.stream is not None
+
     @property
     def forward_bluesky_posts(self) -> use_cases.ForwardBlueskyPosts:
         return self._injector.get(use_cases.ForwardBlueskyPosts)
@@ -39,6 +62,15 @@ class Application:
     def forward_xcode(self) -> use_cases.ForwardXcode:
         return self._injector.get(use_cases.ForwardXcode)
 
+    @property
+    def stream_bluesky_posts(self) -> use_cases.StreamBlueskyPosts:
+        return self._injector.get(use_cases.StreamBlueskyPosts)
+
+    @property
+    def stream_toots(self) -> use_cases.StreamToots:
+        return self._injector.get(use_cases.StreamToots)
+
     async def close(self) -> None:
-        state_access = self._injector.get(_StateAccess)
-        await state_access.repo.close()
+        resources = self._injector.get(_Resources)
+        await resources.telegram_uploader.close()
+        await resources.repo.close()
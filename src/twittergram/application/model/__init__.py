@@ -1,6 +1,6 @@
 # mypy: implicit-reexport
 
-from .bluesky import BlueskyPost, NamedUrl
+from .bluesky import BlueskyPost, BlueskyPostEvent, NamedUrl
 from .mail import Mail
 from .media import MediaFile, MediaType, Medium
 from .reddit import RedditPost
@@ -10,10 +10,13 @@ from .state import (
     MailState,
     MastodonState,
     RedditState,
+    RssFeedState,
     RssState,
     State,
+    TelegramFileState,
     XcodeState,
 )
 from .toot import Toot
 from .url import URL
+from .validators import CacheValidators, Listing
 from .xcode import XcodeRelease
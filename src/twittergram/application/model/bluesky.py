@@ -24,3 +24,12 @@ class BlueskyPost:
     text: str | None
     images: list[Medium]
     url: NamedUrl | None
+
+
+@dataclass(frozen=True, kw_only=True)
+class BlueskyPostEvent:
+    cursor: int
+    """
+    The position of the event in the stream, to resume the stream after it.
+    """
+    post: BlueskyPost
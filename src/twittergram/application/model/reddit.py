@@ -1,6 +1,7 @@
 from dataclasses import dataclass
 from datetime import datetime
 
+from .media import Medium
 from .url import URL
 
 
@@ -11,3 +12,7 @@ class RedditPost:
     title: str
     url: URL
     subreddit_name: str
+    media: list[Medium]
+    """
+    The media to forward. Galleries are resolved to their images if possible.
+    """
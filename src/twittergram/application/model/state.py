@@ -4,6 +4,8 @@ from typing import Self
 
 from pydantic import BaseModel
 
+from .validators import CacheValidators
+
 
 class State(BaseModel, abc.ABC):
     @classmethod
@@ -16,6 +18,10 @@ class BlueskyState(State):
     session: str | None
     last_post_id: str | None
     last_post_time: datetime | None = None
+    cursor: int | None = None
+    """
+    The stream position of the last forwarded post, if posts are streamed.
+    """
 
     @classmethod
     def initial(cls) -> Self:
@@ -23,6 +29,7 @@ class BlueskyState(State):
             session=None,
             last_post_id=None,
             last_post_time=None,
+            cursor=None,
         )
 
 
@@ -37,10 +44,19 @@ class MailState(State):
 
 class MastodonState(State):
     last_toot_id: int | None
+    source_account: str | None = None
+    user_id: int | None = None
+    """
+    The looked up ID of the source account, only valid for that account.
+    """
 
     @classmethod
     def initial(cls) -> Self:
-        return cls(last_toot_id=None)
+        return cls(
+            last_toot_id=None,
+            source_account=None,
+            user_id=None,
+        )
 
 
 class RedditState(State):
@@ -51,20 +67,53 @@ class RedditState(State):
         return cls(last_post_time=None)
 
 
+class RssFeedState(BaseModel):
+    seen_items: list[str]
+    """
+    Hashes of the IDs of recently seen items, ordered from least to most recently
+    seen.
+    """
+    validators: CacheValidators | None
+
+
 class RssState(State):
     last_item_id: str | None
     last_item_time: datetime | None = None
+    validators: CacheValidators | None = None
+    """
+    The validators of the feed, stored once all of its items have been forwarded.
+    """
+    feeds: dict[str, RssFeedState] = {}
+    """
+    The state of each feed by URL, if several feeds are forwarded.
+    """
+
+    @classmethod
+    def initial(cls) -> Self:
+        return cls(last_item_id=None, last_item_time=None, validators=None, feeds={})
+
+
+class TelegramFileState(State):
+    file_ids: dict[str, str]
+    """
+    Telegram file IDs by content hash, ordered from least to most recently used.
+    """
 
     @classmethod
     def initial(cls) -> Self:
-        return cls(last_item_id=None, last_item_time=None)
+        return cls(file_ids={})
 
 
 class XcodeState(State):
     last_release_build: str | None
+    validators: CacheValidators | None = None
+    """
+    The validators of the releases, stored once all new releases have been forwarded.
+    """
 
     @classmethod
     def initial(cls) -> Self:
         return cls(
             last_release_build=None,
+            validators=None,
         )
@@ -0,0 +1,42 @@
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from typing import Self
+
+
+@dataclass(frozen=True, kw_only=True)
+class CacheValidators:
+    """
+    The validators of an HTTP response, used to make the next request for the same
+    resource conditional.
+    """
+
+    etag: str | None
+    last_modified: str | None
+
+
+async def _no_items[T]() -> AsyncIterator[T]:
+    items: tuple[T, ...] = ()
+    for item in items:
+        yield item
+
+
+@dataclass(frozen=True, kw_only=True)
+class Listing[T]:
+    """
+    The items of a conditional request, which are read while the response is open.
+    """
+
+    validators: CacheValidators | None
+    """
+    The validators of the response, to be passed to the next request once the items
+    have been processed.
+    """
+    items: AsyncIterator[T]
+
+    @classmethod
+    def unchanged(cls, validators: CacheValidators | None) -> Self:
+        """
+        A listing without items, because nothing changed since the validators were
+        received.
+        """
+        return cls(validators=validators, items=_no_items())
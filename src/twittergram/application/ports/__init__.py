@@ -1,10 +1,14 @@
 # mypy: implicit-reexport
 
 from .bluesky_reader import BlueskyReader
+from .bluesky_stream import BlueskyStream
+from .download_scheduler import DownloadScheduler
 from .html_sanitizer import HtmlSanitizer
 from .mail_reader import MailReader
 from .mastodon_reader import MastodonReader
-from .media_downloader import MediaDownloader
+from .mastodon_stream import MastodonStream
+from .media_downloader import MediaDownloader, MediaRoute
+from .media_workspace import MediaScope, MediaWorkspace
 from .reddit_reader import RedditReader
 from .rss_reader import RssReader
 from .telegram_uploader import TelegramUploader
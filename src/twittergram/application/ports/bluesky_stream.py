@@ -0,0 +1,20 @@
+import abc
+from collections.abc import AsyncIterator
+from contextlib import AbstractAsyncContextManager
+
+from twittergram.application.model import BlueskyPostEvent
+
+
+class BlueskyStream(abc.ABC):
+    @abc.abstractmethod
+    def open(
+        self,
+        cursor: int | None,
+    ) -> AbstractAsyncContextManager[AsyncIterator[BlueskyPostEvent]]:
+        """
+        Subscribes to the posts of the author. Once subscribed, the posts since the
+        cursor, or from now on if there is none, are yielded as they are posted,
+        until the connection is lost. Replies and reposts are left out.
+
+        :raises IoException: if the subscription fails or is interrupted
+        """
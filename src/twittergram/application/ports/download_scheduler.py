@@ -0,0 +1,95 @@
+import abc
+import asyncio
+import itertools
+from collections import deque
+from collections.abc import AsyncGenerator, Callable, Iterable
+
+from twittergram.application.model import MediaFile, Medium
+
+
+class DownloadScheduler(abc.ABC):
+    @abc.abstractmethod
+    async def download(self, medium: Medium) -> list[MediaFile]:
+        """
+        Downloads the given medium using a downloader that supports it, as soon as
+        the download limits allow it. Unsupported media result in no files.
+        """
+
+    @abc.abstractmethod
+    async def discard(self, media_files: list[MediaFile]) -> None:
+        """
+        Releases downloaded files that are never handed out, because the download of
+        a sibling failed or the consumer stopped early.
+        """
+
+    async def _discard_results(
+        self,
+        results: Iterable[list[MediaFile] | BaseException],
+    ) -> None:
+        await self.discard(
+            [
+                media_file
+                for result in results
+                if not isinstance(result, BaseException)
+                for media_file in result
+            ]
+        )
+
+    async def download_all(self, media: Iterable[Medium]) -> list[MediaFile]:
+        tasks = []
+        try:
+            async with asyncio.TaskGroup() as tg:
+                for medium in media:
+                    tasks.append(tg.create_task(self.download(medium)))
+        except BaseException:
+            # The downloads that finished before the failure are dropped
+            await self._discard_results(
+                task.result()
+                for task in tasks
+                if task.done() and not task.cancelled() and not task.exception()
+            )
+            raise
+
+        return [media_file for task in tasks for media_file in task.result()]
+
+    async def prefetch[T](
+        self,
+        items: Iterable[T],
+        media_of: Callable[[T], Iterable[Medium]],
+        window: int,
+    ) -> AsyncGenerator[tuple[T, list[MediaFile]]]:
+        """
+        Yields the given items in order, together with the files of their media. The
+        media of up to `window` items are downloaded in the background, so the next
+        items are usually ready once the current one has been processed.
+
+        Use contextlib.aclosing to cancel the pending downloads if the loop is left
+        early. The files of downloads that were never yielded are discarded.
+        """
+        if window < 1:
+            raise ValueError(f"Invalid window: {window}")
+
+        pending: deque[tuple[T, asyncio.Task[list[MediaFile]]]] = deque()
+        remaining = iter(items)
+        try:
+            while True:
+                for item in itertools.islice(remaining, window - len(pending)):
+                    task = asyncio.create_task(self.download_all(media_of(item)))
+                    pending.append((item, task))
+
+                if not pending:
+                    return
+
+                # The task stays pending until it's yielded, so its files are
+                # discarded if the consumer is cancelled while waiting for it
+                item, task = pending[0]
+                media_files = await task
+                pending.popleft()
+                yield item, media_files
+        finally:
+            tasks = [task for _, task in pending]
+            for task in tasks:
+                task.cancel()
+            await self._discard_results(
+                await asyncio.gather(*tasks, return_exceptions=True)
+            )
@@ -1,10 +1,17 @@
 import abc
-from collections.abc import AsyncIterable
+from collections.abc import AsyncGenerator
 
 from twittergram.application.model import Toot
 
 
 class MastodonReader(abc.ABC):
+    @property
+    @abc.abstractmethod
+    def source_account(self) -> str:
+        """
+        The name of the account whose toots are read.
+        """
+
     @abc.abstractmethod
     async def lookup_user_id(self) -> int:
         pass
@@ -14,5 +21,8 @@ class MastodonReader(abc.ABC):
         self,
         user_id: int,
         until_id: int | None = None,
-    ) -> AsyncIterable[Toot]:
-        pass
+    ) -> AsyncGenerator[Toot]:
+        """
+        Yields the toots newer than until_id, newest first. Closing the generator
+        early may save reading the remaining toots.
+        """
@@ -0,0 +1,16 @@
+import abc
+from collections.abc import AsyncIterator
+from contextlib import AbstractAsyncContextManager
+
+from twittergram.application.model import Toot
+
+
+class MastodonStream(abc.ABC):
+    @abc.abstractmethod
+    def open(self, user_id: int) -> AbstractAsyncContextManager[AsyncIterator[Toot]]:
+        """
+        Connects to the streaming API. Once connected, the public toots of the user
+        are yielded as they are posted, until the connection is lost.
+
+        :raises IoException: if the stream can't be opened or is interrupted
+        """
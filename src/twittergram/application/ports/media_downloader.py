@@ -1,15 +1,32 @@
 import abc
 import logging
+from collections.abc import Sequence
+from dataclasses import dataclass
 
-from twittergram.application.model import MediaFile, Medium
+from twittergram.application.model import MediaFile, MediaType, Medium
 
 _LOG = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True, kw_only=True)
+class MediaRoute:
+    media_type: MediaType
+    host: str | None = None
+    """
+    The host of the media URLs, or None to match any host.
+    """
+    path_prefix: str = ""
+
+
 class MediaDownloader(abc.ABC):
+    @property
     @abc.abstractmethod
-    async def is_supported(self, medium: Medium) -> bool:
-        pass
+    def routes(self) -> Sequence[MediaRoute]:
+        """
+        The media this downloader is responsible for. If routes of several
+        downloaders match a medium, the most specific one wins: a route for a host
+        beats a route for any host, and a longer path prefix beats a shorter one.
+        """
 
     @abc.abstractmethod
     async def download(self, medium: Medium) -> list[MediaFile]:
@@ -0,0 +1,49 @@
+import abc
+from collections.abc import AsyncIterator, Iterable
+from contextlib import asynccontextmanager
+
+from twittergram.application.model import MediaFile
+
+
+class MediaScope:
+    """
+    Keeps track of the media files a use case holds while forwarding. Files that are
+    still held when the scope ends are released as well.
+    """
+
+    def __init__(self, workspace: "MediaWorkspace") -> None:
+        self._workspace = workspace
+        self._media_files: list[MediaFile] = []
+
+    def hold(self, media_files: list[MediaFile]) -> list[MediaFile]:
+        self._media_files.extend(media_files)
+        return media_files
+
+    async def release(self, media_files: list[MediaFile]) -> None:
+        self._media_files = [
+            media_file
+            for media_file in self._media_files
+            if media_file not in media_files
+        ]
+        await self._workspace.release(media_files)
+
+    async def close(self) -> None:
+        media_files = self._media_files
+        self._media_files = []
+        await self._workspace.release(media_files)
+
+
+class MediaWorkspace(abc.ABC):
+    @abc.abstractmethod
+    async def release(self, media_files: Iterable[MediaFile]) -> None:
+        """
+        Removes the given files from the workspace once they are no longer needed.
+        """
+
+    @asynccontextmanager
+    async def scope(self) -> AsyncIterator[MediaScope]:
+        scope = MediaScope(self)
+        try:
+            yield scope
+        finally:
+            await scope.close()
@@ -1,10 +1,22 @@
 import abc
-from collections.abc import AsyncIterable
+from contextlib import AbstractAsyncContextManager
 
-from twittergram.application.model import RssItem
+from twittergram.application.model import CacheValidators, Listing, RssItem
 
 
 class RssReader(abc.ABC):
+    @property
     @abc.abstractmethod
-    def list_items(self) -> AsyncIterable[RssItem]:
+    def feed_url(self) -> str:
         pass
+
+    @abc.abstractmethod
+    def list_items(
+        self,
+        validators: CacheValidators | None,
+    ) -> AbstractAsyncContextManager[Listing[RssItem]]:
+        """
+        Reads the items in feed order. With validators, the feed is only read if it
+        has changed since they were received, and the listing has no items
+        otherwise. Leaving the context early may save reading the rest of the feed.
+        """
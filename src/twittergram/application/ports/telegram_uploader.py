@@ -1,6 +1,6 @@
 import abc
 
-from twittergram.application.model import MediaFile
+from twittergram.application.model import MediaFile, Medium
 
 
 class TelegramUploader(abc.ABC):
@@ -31,3 +31,34 @@ class TelegramUploader(abc.ABC):
         use_html: bool = False,
     ) -> None:
         pass
+
+    @property
+    @abc.abstractmethod
+    def sends_by_url(self) -> bool:
+        """
+        Whether images should be sent by their URLs before downloading them.
+        """
+
+    @abc.abstractmethod
+    async def send_image_urls_message(
+        self,
+        images: list[Medium],
+        caption: str | None,
+        use_html: bool = False,
+    ) -> bool:
+        """
+        Sends the given images by their URLs, so Telegram fetches them itself.
+
+        :return: whether the message has been sent. If Telegram can't use the URLs,
+        nothing has been sent and the images have to be downloaded and uploaded.
+        """
+
+    async def flush(self) -> None:
+        """
+        Stores what has been learned while sending, like the IDs of uploaded files,
+        so it survives a crash. Called along with storing the state of a use case.
+        """
+
+    @abc.abstractmethod
+    async def close(self) -> None:
+        pass
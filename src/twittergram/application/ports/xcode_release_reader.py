@@ -1,10 +1,18 @@
 import abc
-from collections.abc import AsyncIterable
+from contextlib import AbstractAsyncContextManager
 
-from twittergram.application.model import XcodeRelease
+from twittergram.application.model import CacheValidators, Listing, XcodeRelease
 
 
 class XcodeReleaseReader(abc.ABC):
     @abc.abstractmethod
-    def get_releases(self) -> AsyncIterable[XcodeRelease]:
-        pass
+    def get_releases(
+        self,
+        validators: CacheValidators | None,
+    ) -> AbstractAsyncContextManager[Listing[XcodeRelease]]:
+        """
+        Reads the releases, newest first. With validators, the releases are only
+        read if something changed since they were received, and the listing has no
+        releases otherwise. Leaving the context early may save reading the remaining
+        releases.
+        """
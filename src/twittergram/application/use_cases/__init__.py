@@ -6,3 +6,5 @@ from .forward_reddit_posts import ForwardRedditPosts
 from .forward_rss_feed import ForwardRssFeed
 from .forward_toots import ForwardToots
 from .forward_xcode import ForwardXcode
+from .stream_bluesky_posts import StreamBlueskyPosts
+from .stream_toots import StreamToots
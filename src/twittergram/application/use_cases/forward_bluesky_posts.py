@@ -1,13 +1,11 @@
-import asyncio
 import logging
-from collections.abc import Iterable
 from dataclasses import dataclass
 from datetime import datetime
 
 from injector import inject
 
 from twittergram.application import ports, repos
-from twittergram.application.model import BlueskyPost, BlueskyState, MediaFile, Medium
+from twittergram.application.model import BlueskyPost, BlueskyState
 
 _LOG = logging.getLogger(__name__)
 
@@ -15,7 +13,8 @@ _LOG = logging.getLogger(__name__)
 @inject
 @dataclass
 class ForwardBlueskyPosts:
-    downloader: list[ports.MediaDownloader]
+    download_scheduler: ports.DownloadScheduler
+    media_workspace: ports.MediaWorkspace
     sanitizer: ports.HtmlSanitizer
     reader: ports.BlueskyReader
     state_repo: repos.StateRepo
@@ -46,6 +45,7 @@ class ForwardBlueskyPosts:
             state.session = self.reader.save_session()
             _LOG.info("Storing state")
             await self.state_repo.store_state(state)
+            await self.uploader.flush()
 
     async def _forward_post(self, post: BlueskyPost, state: BlueskyState) -> None:
         _LOG.info(
@@ -53,13 +53,13 @@ class ForwardBlueskyPosts:
             post.created_at,
             post.id,
         )
-        if post.images:
-            _LOG.info("Downloading images")
-            media_files = await self._download_images(post.images)
-        else:
-            media_files = []
-        _LOG.info("Sending message")
+        async with self.media_workspace.scope() as scope:
+            await self._send_post(post, scope)
 
+        state.last_post_id = post.id
+        state.last_post_time = post.created_at
+
+    async def _send_post(self, post: BlueskyPost, scope: ports.MediaScope) -> None:
         is_html = False
         text = post.text
 
@@ -67,6 +67,23 @@ class ForwardBlueskyPosts:
             is_html = True
             text = f"{text}\n\n{url.html_formatted()}"
 
+        if post.images and self.uploader.sends_by_url:
+            _LOG.info("Sending message with image URLs")
+            if await self.uploader.send_image_urls_message(
+                post.images,
+                text,
+                use_html=is_html,
+            ):
+                return
+
+        if post.images:
+            _LOG.info("Downloading images")
+            media_files = await self.download_scheduler.download_all(post.images)
+            scope.hold(media_files)
+        else:
+            media_files = []
+        _LOG.info("Sending message")
+
         if media_files:
             await self.uploader.send_image_message(
                 media_files,
@@ -80,8 +97,6 @@ class ForwardBlueskyPosts:
             )
         else:
             _LOG.warning("Dropping post with neither image nor text")
-        state.last_post_id = post.id
-        state.last_post_time = post.created_at
 
     async def _read_posts(
         self,
@@ -105,24 +120,3 @@ class ForwardBlueskyPosts:
                 break
 
         return posts
-
-    async def _download_images(self, images: Iterable[Medium]) -> list[MediaFile]:
-        tasks = []
-        async with asyncio.TaskGroup() as tg:
-            for image in images:
-                for downloader in self.downloader:
-                    if not await downloader.is_supported(image):
-                        continue
-
-                    task = tg.create_task(downloader.download(image))
-                    tasks.append(task)
-                    break
-                else:
-                    _LOG.warning("No downloader supports %s", image)
-
-        result = []
-
-        for task in tasks:
-            result.extend(task.result())
-
-        return result
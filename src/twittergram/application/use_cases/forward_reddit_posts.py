@@ -1,26 +1,25 @@
 import logging
+from contextlib import aclosing
 from dataclasses import dataclass
 
 from injector import inject
 
 from twittergram.application import ports, repos
-from twittergram.application.model import (
-    MediaFile,
-    MediaType,
-    Medium,
-    RedditPost,
-    RedditState,
-)
+from twittergram.application.model import RedditPost, RedditState
 from twittergram.config import RedditConfig
 
 _LOG = logging.getLogger(__name__)
 
+# The number of posts whose media are downloaded while earlier ones are being sent
+_DOWNLOAD_WINDOW = 3
+
 
 @inject
 @dataclass
 class ForwardRedditPosts:
     config: RedditConfig
-    media_downloader: list[ports.MediaDownloader]
+    download_scheduler: ports.DownloadScheduler
+    media_workspace: ports.MediaWorkspace
     reddit_reader: ports.RedditReader
     state_repo: repos.StateRepo
     telegram_uploader: ports.TelegramUploader
@@ -50,31 +49,33 @@ class ForwardRedditPosts:
         # We want to forward post them in reverse order
         posts.reverse()
 
-        _LOG.info("Downloading media")
-        media_files_by_post_id: dict[str, list[MediaFile]] = {}
-        for post in posts:
-            medium = Medium(type=MediaType.PHOTO, id=post.id, url=str(post.url))
-            for downloader in self.media_downloader:
-                if not await downloader.is_supported(medium):
-                    continue
-
-                media_files = await downloader.download(medium)
-                media_files_by_post_id[post.id] = media_files
-                break
-            else:
-                _LOG.warning("No downloader supports %s", medium)
-                media_files_by_post_id[post.id] = []
+        async with self.media_workspace.scope() as scope:
+            await self._forward_posts(posts, state, scope)
 
+    async def _forward_posts(
+        self,
+        posts: list[RedditPost],
+        state: RedditState,
+        scope: ports.MediaScope,
+    ) -> None:
         _LOG.info("Forwarding %d posts", len(posts))
+        downloads = self.download_scheduler.prefetch(
+            posts,
+            lambda post: post.media,
+            window=_DOWNLOAD_WINDOW,
+        )
         try:
-            for post in posts:
-                media_files = media_files_by_post_id[post.id]
-                if media_files:
-                    await self.telegram_uploader.send_documents_message(
-                        documents=media_files,
-                        caption=post.title,
-                    )
-                state.last_post_time = post.created_at
+            async with aclosing(downloads):
+                async for post, media_files in downloads:
+                    scope.hold(media_files)
+                    if media_files:
+                        await self.telegram_uploader.send_documents_message(
+                            documents=media_files,
+                            caption=post.title,
+                        )
+                        await scope.release(media_files)
+                    state.last_post_time = post.created_at
         finally:
             _LOG.debug("Storing state")
             await self.state_repo.store_state(state)
+            await self.telegram_uploader.flush()
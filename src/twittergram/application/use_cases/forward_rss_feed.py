@@ -1,92 +1,188 @@
+import asyncio
+import hashlib
 import logging
-from collections.abc import Sequence
+from collections.abc import AsyncIterable, Iterable
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import UTC, datetime
 from io import StringIO
 
 from injector import inject
 
 from twittergram.application import ports, repos
-from twittergram.application.model import RssItem, RssState
+from twittergram.application.exceptions.io import IoException
+from twittergram.application.model import (
+    CacheValidators,
+    RssFeedState,
+    RssItem,
+    RssState,
+)
 from twittergram.config import RssConfig, RssOrder
 
 _LOG = logging.getLogger(__name__)
 
+# The number of items to forward from a feed that has never been read before
+_INITIAL_ITEMS = 10
+# The number of seen items remembered per feed, unless the feed itself is longer
+_SEEN_ITEMS = 1024
+
+
+async def _iterate[T](items: Iterable[T]) -> AsyncIterable[T]:
+    for item in items:
+        yield item
+
+
+def _aware(moment: datetime) -> datetime:
+    # Feeds without time zones can't be compared with others otherwise
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=UTC)
+    return moment
+
+
+def _published_at(item: RssItem) -> datetime:
+    return _aware(item.published_at)
+
+
+class _SeenIndex:
+    """
+    The recently seen items of a feed. Item IDs are kept as short hashes, and the
+    least recently seen ones are dropped once the index is full.
+    """
+
+    def __init__(self, hashes: Iterable[str]) -> None:
+        # Dicts keep their insertion order, which is the order items were seen in
+        self._hashes = dict.fromkeys(hashes)
+
+    @staticmethod
+    def _hash(item_id: str) -> str:
+        return hashlib.blake2b(item_id.encode(), digest_size=8).hexdigest()
+
+    def touch(self, item_id: str) -> bool:
+        """
+        Marks a known item as recently seen.
+
+        :return: whether the item has been seen before
+        """
+        key = self._hash(item_id)
+        if key not in self._hashes:
+            return False
+
+        del self._hashes[key]
+        self._hashes[key] = None
+        return True
+
+    def add(self, item_id: str) -> None:
+        self._hashes[self._hash(item_id)] = None
+
+    def hashes(self, size: int | None = None) -> list[str]:
+        """
+        :param size: the number of most recently seen items to return, or None for all
+        """
+        hashes = list(self._hashes)
+        return hashes if size is None else hashes[-size:]
+
+
+@dataclass
+class _Feed:
+    reader: ports.RssReader
+    validators: CacheValidators | None
+    index: _SeenIndex
+    new_items: list[RssItem]
+    size: int
+
 
 @inject
 @dataclass
 class ForwardRssFeed:
     config: RssConfig
-    reader: ports.RssReader
+    readers: list[ports.RssReader]
     sanitizer: ports.HtmlSanitizer
     state_repo: repos.StateRepo
     uploader: ports.TelegramUploader
 
     async def __call__(self) -> None:
         state = await self.state_repo.load_state(RssState)
+
+        if len(self.readers) == 1:
+            await self._forward_feed(self.readers[0], state)
+        else:
+            await self._forward_feeds(state)
+
+    async def _send_item(self, item: RssItem) -> None:
+        with StringIO() as sanitized_text:
+            sanitized_text.write(await self.sanitizer.sanitize(item.title))
+            sanitized_text.write("\n\n")
+
+            if synopsis := item.synopsis:
+                sanitized_text.write(await self.sanitizer.sanitize(synopsis))
+                sanitized_text.write("\n")
+
+            if item.links:
+                sanitized_text.writelines([str(u) for u in item.links])
+
+            await self.uploader.send_text_message(
+                sanitized_text.getvalue(),
+                use_html=True,
+            )
+
+    async def _forward_feed(self, reader: ports.RssReader, state: RssState) -> None:
         last_item_id = state.last_item_id
         last_item_time = state.last_item_time
 
         _LOG.info("Reading RSS items")
-        items: list[RssItem] = []
-        async for item in self.reader.list_items():
-            items.append(item)
-
-        match self.config.order:
-            case RssOrder.CHRONOLOGICAL:
-                # Nothing to do
-                pass
-            case RssOrder.REVERSE_CHRONOLOGICAL:
-                # Reverse reverse chronological
-                items.reverse()
-            case None:
-                items.sort(key=lambda i: i.published_at)
-
-        items = self._filter_items(
-            items,
-            last_item_id=last_item_id,
-            last_item_time=last_item_time,
-        )
+        async with reader.list_items(state.validators) as listing:
+            feed = listing.items
+            newest_first: AsyncIterable[RssItem]
+            match self.config.order:
+                case RssOrder.CHRONOLOGICAL:
+                    items = [item async for item in feed]
+                    newest_first = _iterate(reversed(items))
+                case RssOrder.REVERSE_CHRONOLOGICAL:
+                    # Reading stops at the first known item
+                    newest_first = feed
+                case None:
+                    items = [item async for item in feed]
+                    items.sort(key=lambda i: i.published_at)
+                    newest_first = _iterate(reversed(items))
+
+            items = await self._filter_items(
+                newest_first,
+                last_item_id=last_item_id,
+                last_item_time=last_item_time,
+            )
 
         if not items:
             _LOG.info("No items found")
+            if listing.validators != state.validators:
+                state.validators = listing.validators
+                await self.state_repo.store_state(state)
             return
 
         _LOG.info("Forwarding items")
         try:
             for item in items:
-                with StringIO() as sanitized_text:
-                    sanitized_text.write(await self.sanitizer.sanitize(item.title))
-                    sanitized_text.write("\n\n")
-
-                    if synopsis := item.synopsis:
-                        sanitized_text.write(await self.sanitizer.sanitize(synopsis))
-                        sanitized_text.write("\n")
-
-                    if item.links:
-                        sanitized_text.writelines([str(u) for u in item.links])
-
-                    await self.uploader.send_text_message(
-                        sanitized_text.getvalue(),
-                        use_html=True,
-                    )
-
+                await self._send_item(item)
                 state.last_item_id = item.id
                 state.last_item_time = item.published_at
+
+            # Only now the feed doesn't have to be read again if it's unchanged
+            state.validators = listing.validators
         finally:
             _LOG.debug("Storing state")
             await self.state_repo.store_state(state)
 
     @staticmethod
-    def _filter_items(
-        items: Sequence[RssItem],
+    async def _filter_items(
+        newest_first: AsyncIterable[RssItem],
         *,
         last_item_id: str | None,
         last_item_time: datetime | None,
     ) -> list[RssItem]:
+        """
+        Collects the new items, oldest first.
+        """
         result = []
 
-        for item in reversed(items):
+        async for item in newest_first:
             if item.id == last_item_id:
                 break
 
@@ -95,9 +191,146 @@ class ForwardRssFeed:
                 break
 
             result.append(item)
-            if not last_item_time and len(result) == 10:
+            if not last_item_time and len(result) == _INITIAL_ITEMS:
                 _LOG.info("Stopping item collection due to missing stop ID")
                 break
 
         result.reverse()
         return result
+
+    @staticmethod
+    async def _read_feed(
+        reader: ports.RssReader,
+        feed_state: RssFeedState | None,
+        legacy_state: RssState | None = None,
+    ) -> _Feed | None:
+        """
+        Reads the items of a feed that haven't been seen yet. A feed without a state
+        of its own may continue from the legacy state of a single feed.
+
+        :return: the feed, or None if it couldn't be read
+        """
+        index = _SeenIndex(feed_state.seen_items if feed_state else [])
+        validators = feed_state.validators if feed_state else None
+
+        last_item_id: str | None = None
+        last_item_time: datetime | None = None
+        if feed_state is None and legacy_state is not None:
+            # The feed is read in full, ignoring the legacy validators, so the index
+            # is seeded with the items that have been forwarded already
+            last_item_id = legacy_state.last_item_id
+            if legacy_state.last_item_time:
+                last_item_time = _aware(legacy_state.last_item_time)
+
+        def _forwarded_before(item: RssItem) -> bool:
+            if item.id == last_item_id:
+                return True
+            return last_item_time is not None and _published_at(item) <= last_item_time
+
+        new_items = []
+        size = 0
+        try:
+            async with reader.list_items(validators) as listing:
+                async for item in listing.items:
+                    size += 1
+                    if index.touch(item.id):
+                        continue
+
+                    if _forwarded_before(item):
+                        index.add(item.id)
+                    else:
+                        new_items.append(item)
+        except IoException as e:
+            _LOG.error("Could not read feed %s", reader.feed_url, exc_info=e)
+            return None
+
+        seeded = last_item_id is not None or last_item_time is not None
+        if feed_state is None and not seeded and len(new_items) > _INITIAL_ITEMS:
+            _LOG.info("Forwarding the newest items of new feed %s", reader.feed_url)
+            new_items.sort(key=_published_at)
+            for item in new_items[:-_INITIAL_ITEMS]:
+                index.add(item.id)
+            new_items = new_items[-_INITIAL_ITEMS:]
+
+        return _Feed(
+            reader=reader,
+            validators=listing.validators,
+            index=index,
+            new_items=new_items,
+            size=size,
+        )
+
+    @staticmethod
+    def _feed_state(
+        feed: _Feed,
+        previous: RssFeedState | None,
+        *,
+        complete: bool,
+    ) -> RssFeedState:
+        validators = feed.validators
+        if not complete:
+            # The feed must be read in full again to find the items left
+            validators = previous.validators if previous else None
+
+        # Unchanged feeds aren't read, so their index stays as it is
+        size = max(_SEEN_ITEMS, feed.size) if feed.size else None
+        return RssFeedState(
+            seen_items=feed.index.hashes(size),
+            validators=validators,
+        )
+
+    async def _forward_feeds(self, state: RssState) -> None:
+        _LOG.info("Reading %d RSS feeds", len(self.readers))
+        legacy_state: RssState | None = None
+        if not state.feeds and (state.last_item_id or state.last_item_time):
+            # Feeds were added to a single feed, which is the first one and continues
+            # where it stopped
+            legacy_state = state
+
+        async with asyncio.TaskGroup() as tg:
+            tasks = [
+                tg.create_task(
+                    self._read_feed(
+                        reader,
+                        state.feeds.get(reader.feed_url),
+                        legacy_state if index == 0 else None,
+                    )
+                )
+                for index, reader in enumerate(self.readers)
+            ]
+
+        feeds = []
+        # Feeds that couldn't be read keep their state until the next run
+        feed_states: dict[str, RssFeedState] = {}
+        for reader, task in zip(self.readers, tasks, strict=True):
+            if (feed := task.result()) is not None:
+                feeds.append(feed)
+            elif previous := state.feeds.get(reader.feed_url):
+                feed_states[reader.feed_url] = previous
+
+        items = sorted(
+            ((item, feed) for feed in feeds for item in feed.new_items),
+            key=lambda it: _published_at(it[0]),
+        )
+
+        if not items:
+            _LOG.info("No items found")
+
+        forwarded = 0
+        try:
+            for item, feed in items:
+                await self._send_item(item)
+                feed.index.add(item.id)
+                forwarded += 1
+        finally:
+            complete = forwarded == len(items)
+            for feed in feeds:
+                feed_states[feed.reader.feed_url] = self._feed_state(
+                    feed,
+                    state.feeds.get(feed.reader.feed_url),
+                    complete=complete,
+                )
+            if feed_states != state.feeds:
+                _LOG.debug("Storing state")
+                state.feeds = feed_states
+                await self.state_repo.store_state(state)
@@ -1,5 +1,5 @@
-import asyncio
 import logging
+from contextlib import aclosing
 from dataclasses import dataclass
 
 from injector import inject
@@ -9,54 +9,35 @@ from twittergram.application.model import MastodonState, MediaFile, Medium, Toot
 
 _LOG = logging.getLogger(__name__)
 
+# The number of toots whose media are downloaded while earlier ones are being sent
+_DOWNLOAD_WINDOW = 4
+
 
 @inject
 @dataclass
 class ForwardToots:
-    downloader: list[ports.MediaDownloader]
+    download_scheduler: ports.DownloadScheduler
+    media_workspace: ports.MediaWorkspace
     sanitizer: ports.HtmlSanitizer
     reader: ports.MastodonReader
     state_repo: repos.StateRepo
     uploader: ports.TelegramUploader
 
-    async def _download_media(self, media: list[Medium]) -> list[MediaFile]:
-        tasks = []
-        async with asyncio.TaskGroup() as tg:
-            for medium in media:
-                for downloader in self.downloader:
-                    if not await downloader.is_supported(medium):
-                        continue
-
-                    task = tg.create_task(downloader.download(medium))
-                    tasks.append(task)
-                    break
-                else:
-                    _LOG.warning("No downloader supports %s", medium)
-
-        result = []
-
-        for task in tasks:
-            result.extend(task.result())
-
-        return result
-
     async def __call__(self) -> None:
-        _LOG.debug("Looking up user ID for Mastodon source account")
-        user_id = await self.reader.lookup_user_id()
-
         state = await self.state_repo.load_state(MastodonState)
+        user_id = await self._user_id(state)
         until_id = state.last_toot_id
 
         _LOG.info("Reading toots for account %s", user_id)
         toots: list[Toot] = []
-        async for toot in self.reader.list_toots(
-            user_id,
-            until_id=until_id,
-        ):
-            toots.append(toot)
-            if not until_id and len(toots) == 10:
-                _LOG.debug("Stopping toot collection due to missing until_id")
-                break
+        async with aclosing(
+            self.reader.list_toots(user_id, until_id=until_id)
+        ) as new_toots:
+            async for toot in new_toots:
+                toots.append(toot)
+                if not until_id and len(toots) == 10:
+                    _LOG.debug("Stopping toot collection due to missing until_id")
+                    break
 
         if not toots:
             _LOG.info("No toots found")
@@ -65,42 +46,87 @@ class ForwardToots:
         # Reverse reverse chronological
         toots.reverse()
 
-        media_by_toot_id: dict[int, list[MediaFile]] = {}
-
-        _LOG.info("Found %d new toots, downloading media now", len(toots))
-
-        for toot in toots:
-            media = toot.media_attachments
-            media_files = await self._download_media(media)
-            media_by_toot_id[toot.id] = media_files
+        async with self.media_workspace.scope() as scope:
+            await self._forward_toots(toots, state, scope)
+
+    async def _user_id(self, state: MastodonState) -> int:
+        source_account = self.reader.source_account
+        user_id = state.user_id
+        if user_id is None or state.source_account != source_account:
+            _LOG.debug("Looking up user ID for Mastodon source account")
+            user_id = await self.reader.lookup_user_id()
+            state.source_account = source_account
+            state.user_id = user_id
+            await self.state_repo.store_state(state)
 
-        _LOG.info("Forwarding toots")
+        return user_id
+
+    async def _forward_toots(
+        self,
+        toots: list[Toot],
+        state: MastodonState,
+        scope: ports.MediaScope,
+    ) -> None:
+        _LOG.info("Found %d new toots, forwarding them", len(toots))
+        downloads = self.download_scheduler.prefetch(
+            toots,
+            self._prefetched_media,
+            window=_DOWNLOAD_WINDOW,
+        )
         try:
-            for toot in toots:
-                sanitized_text: str | None = None
-                if toot.content:
-                    sanitized_text = await self.sanitizer.sanitize(toot.content)
-
-                if toot.media_attachments:
-                    media_files = media_by_toot_id[toot.id]
-
-                    if media_files:
-                        await self.uploader.send_image_message(
-                            media_files,
-                            sanitized_text,
-                            use_html=True,
-                        )
-                    else:
-                        _LOG.info("Dropping toot %d with no media files", toot.id)
-                elif sanitized_text:
-                    await self.uploader.send_text_message(
-                        sanitized_text,
-                        use_html=True,
-                    )
-                else:
-                    _LOG.info("Got toot without media or text")
-
-                state.last_toot_id = toot.id
+            async with aclosing(downloads):
+                async for toot, media_files in downloads:
+                    await self._forward_toot(toot, scope.hold(media_files), scope)
+                    state.last_toot_id = toot.id
         finally:
             _LOG.debug("Storing state")
             await self.state_repo.store_state(state)
+            await self.uploader.flush()
+
+    def _prefetched_media(self, toot: Toot) -> list[Medium]:
+        # Media that can be sent by URL are only downloaded if that fails
+        if self.uploader.sends_by_url:
+            return []
+
+        return toot.media_attachments
+
+    async def _forward_toot(
+        self,
+        toot: Toot,
+        media_files: list[MediaFile],
+        scope: ports.MediaScope,
+    ) -> None:
+        sanitized_text: str | None = None
+        if toot.content:
+            sanitized_text = await self.sanitizer.sanitize(toot.content)
+
+        if toot.media_attachments:
+            if self.uploader.sends_by_url:
+                if await self.uploader.send_image_urls_message(
+                    toot.media_attachments,
+                    sanitized_text,
+                    use_html=True,
+                ):
+                    return
+
+                _LOG.info("Downloading media of toot %d", toot.id)
+                media_files = scope.hold(
+                    await self.download_scheduler.download_all(toot.media_attachments)
+                )
+
+            if media_files:
+                await self.uploader.send_image_message(
+                    media_files,
+                    sanitized_text,
+                    use_html=True,
+                )
+                await scope.release(media_files)
+            else:
+                _LOG.info("Dropping toot %d with no media files", toot.id)
+        elif sanitized_text:
+            await self.uploader.send_text_message(
+                sanitized_text,
+                use_html=True,
+            )
+        else:
+            _LOG.info("Got toot without media or text")
@@ -19,23 +19,28 @@ class ForwardXcode:
     async def __call__(self) -> None:
         state = await self.state_repo.load_state(XcodeState)
 
-        releases = self.xcode_release_reader.get_releases()
-        releases_to_forward: list[model.XcodeRelease]
+        releases_to_forward: list[model.XcodeRelease] = []
 
         last_release_build = state.last_release_build
-        if not last_release_build:
-            _LOG.warning("Running for the first time. Will use the first release.")
-            releases_to_forward = [await anext(releases)]  # type: ignore[call-overload]
-        else:
-            releases_to_forward = []
-            async for release in releases:
-                if release.version_build == last_release_build:
-                    break
+        reader = self.xcode_release_reader
+        async with reader.get_releases(state.validators) as listing:
+            releases = listing.items
+            if not last_release_build:
+                _LOG.warning("Running for the first time. Will use the first release.")
+                if first_release := await anext(releases, None):
+                    releases_to_forward.append(first_release)
+            else:
+                async for release in releases:
+                    if release.version_build == last_release_build:
+                        break
 
-                releases_to_forward.append(release)
+                    releases_to_forward.append(release)
 
         if not releases_to_forward:
             _LOG.info("Found no new releases")
+            if listing.validators != state.validators:
+                state.validators = listing.validators
+                await self.state_repo.store_state(state)
             return
 
         # We want to receive them in order of release date
@@ -51,6 +56,9 @@ class ForwardXcode:
                     use_html=True,
                 )
                 state.last_release_build = release.version_build
+
+            # Only now the releases don't have to be read again if they're unchanged
+            state.validators = listing.validators
         finally:
             _LOG.info("Storing updated state")
             await self.state_repo.store_state(state)
@@ -0,0 +1,92 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+
+from injector import inject
+
+from twittergram.application import ports
+from twittergram.application.exceptions.io import IoException
+from twittergram.application.model import BlueskyPostEvent, BlueskyState
+
+from .forward_bluesky_posts import ForwardBlueskyPosts
+
+_LOG = logging.getLogger(__name__)
+
+# The first delay before reconnecting, doubled after each failure up to the maximum
+_RECONNECT_DELAY = 1.0
+_MAX_RECONNECT_DELAY = 300.0
+# Streams only keep recent events, older posts are read from the author feed
+_REPLAY_WINDOW = timedelta(hours=24)
+
+
+def _now_cursor() -> int:
+    # Stream positions are the times of the events in microseconds
+    return time.time_ns() // 1000
+
+
+@inject
+@dataclass
+class StreamBlueskyPosts(ForwardBlueskyPosts):
+    """
+    Forwards posts as soon as they are posted. After a disconnection, the stream is
+    resumed after the last forwarded post.
+    """
+
+    stream: ports.BlueskyStream
+
+    async def __call__(self) -> None:
+        failures = 0
+        while True:
+            try:
+                await self._stream_posts()
+                _LOG.info("Stream was closed, reconnecting")
+                failures = 0
+            except IoException as e:
+                _LOG.warning("Streaming posts failed", exc_info=e)
+                failures += 1
+
+            await asyncio.sleep(
+                min(_MAX_RECONNECT_DELAY, _RECONNECT_DELAY * 2**failures)
+            )
+
+    async def _stream_posts(self) -> None:
+        state = await self.state_repo.load_state(BlueskyState)
+        cursor = state.cursor
+        replay_start = _now_cursor() - _REPLAY_WINDOW // timedelta(microseconds=1)
+        catch_up = cursor is None or cursor < replay_start
+        if catch_up:
+            cursor = _now_cursor()
+
+        async with self.stream.open(cursor) as events:
+            if catch_up:
+                # Posts from now on are received after the ones read here
+                _LOG.info("Catching up on posts")
+                await super().__call__()
+                state = await self.state_repo.load_state(BlueskyState)
+                state.cursor = cursor
+                await self.state_repo.store_state(state)
+
+            async for event in events:
+                await self._forward_new_post(event, state)
+
+    async def _forward_new_post(
+        self,
+        event: BlueskyPostEvent,
+        state: BlueskyState,
+    ) -> None:
+        post = event.post
+        last_post_time = state.last_post_time
+        if (
+            post.id == state.last_post_id
+            or (state.cursor is not None and event.cursor <= state.cursor)
+            or (last_post_time is not None and post.created_at <= last_post_time)
+        ):
+            _LOG.debug("Skipping post %s, which has already been forwarded", post.id)
+            return
+
+        await self._forward_post(post, state)
+        state.cursor = event.cursor
+        await self.state_repo.store_state(state)
+        await self.uploader.flush()
@@ -0,0 +1,72 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+
+from injector import inject
+
+from twittergram.application import ports
+from twittergram.application.exceptions.io import IoException
+from twittergram.application.model import MastodonState, Toot
+from twittergram.config import MastodonConfig
+
+from .forward_toots import ForwardToots
+
+_LOG = logging.getLogger(__name__)
+
+# The first delay before reconnecting, doubled after each failure up to the poll
+# interval
+_RECONNECT_DELAY = 1.0
+
+
+@inject
+@dataclass
+class StreamToots(ForwardToots):
+    """
+    Forwards toots as soon as they are posted. Toots posted while the stream wasn't
+    connected are caught up on through the REST API, which is also polled while
+    the stream is unavailable.
+    """
+
+    config: MastodonConfig
+    stream: ports.MastodonStream
+
+    async def __call__(self) -> None:
+        state = await self.state_repo.load_state(MastodonState)
+        user_id = await self._user_id(state)
+        poll_interval = self.config.poll_interval.total_seconds()
+
+        failures = 0
+        while True:
+            try:
+                await self._stream_toots(user_id)
+                _LOG.info("Stream was closed, reconnecting")
+                failures = 0
+            except IoException as e:
+                _LOG.warning("Streaming failed, polling instead", exc_info=e)
+                failures += 1
+                try:
+                    await super().__call__()
+                except IoException as poll_error:
+                    _LOG.error("Polling failed", exc_info=poll_error)
+
+            await asyncio.sleep(min(poll_interval, _RECONNECT_DELAY * 2**failures))
+
+    async def _stream_toots(self, user_id: int) -> None:
+        async with self.stream.open(user_id) as toots:
+            # Toots posted from now on are received after the ones read here
+            _LOG.info("Catching up on toots")
+            await super().__call__()
+
+            state = await self.state_repo.load_state(MastodonState)
+            async for toot in toots:
+                await self._forward_new_toot(toot, state)
+
+    async def _forward_new_toot(self, toot: Toot, state: MastodonState) -> None:
+        last_toot_id = state.last_toot_id
+        if last_toot_id is not None and toot.id <= last_toot_id:
+            _LOG.debug("Skipping toot %d, which has already been forwarded", toot.id)
+            return
+
+        _LOG.info("Received toot %d", toot.id)
+        async with self.media_workspace.scope() as scope:
+            await self._forward_toots([toot], state, scope)
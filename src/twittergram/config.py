@@ -1,13 +1,18 @@
 import logging
-from dataclasses import dataclass
+from collections.abc import Mapping
+from dataclasses import dataclass, replace
+from datetime import timedelta
 from enum import Enum
 from pathlib import Path
+from types import MappingProxyType
 from typing import Self
 
 from bs_config import Env
 
 _LOG = logging.getLogger(__name__)
 
+_NO_OPTIONS: Mapping[str, str] = MappingProxyType({})
+
 
 @dataclass(frozen=True, kw_only=True)
 class SentryConfig:
@@ -27,13 +32,23 @@ class BlueskyConfig:
     user: str
     password: str
     author_id: str
+    jetstream_url: str | None
+    """
+    The Jetstream subscription endpoint new posts are forwarded from when serving,
+    or None to forward them on schedule. A file URL replays recorded events.
+    """
 
     @classmethod
-    def from_env(cls, env: Env) -> Self | None:
+    def from_env(
+        cls, env: Env, options: Mapping[str, str] = _NO_OPTIONS
+    ) -> Self | None:
         try:
             user = env.get_string("username", required=True)
             password = env.get_string("password", required=True)
-            author_id = env.get_string("author-id", required=True)
+            author_id = options.get("author-id") or env.get_string(
+                "author-id",
+                required=True,
+            )
         except ValueError:
             return None
 
@@ -41,17 +56,57 @@ class BlueskyConfig:
             user=user,
             password=password,
             author_id=author_id,
+            jetstream_url=env.get_string("jetstream-url"),
         )
 
 
 @dataclass(frozen=True, kw_only=True)
 class DownloadConfig:
+    cache_size: int
+    concurrency: int
     download_directory: Path | None
+    host_concurrency: int
+    max_age: timedelta
+    max_file_size: int
+    quota: int
 
     @classmethod
     def from_env(cls, env: Env) -> Self:
         return cls(
+            cache_size=env.get_int("download-cache-size", default=256 * 1024 * 1024),
+            concurrency=env.get_int("download-concurrency", default=8),
             download_directory=env.get_string("download-dir", transform=Path),
+            host_concurrency=env.get_int("download-host-concurrency", default=2),
+            max_age=timedelta(seconds=env.get_int("download-max-age", default=3600)),
+            max_file_size=env.get_int(
+                "download-max-file-size",
+                # Bots can't upload larger files
+                default=50 * 1024 * 1024,
+            ),
+            quota=env.get_int("download-quota", default=1024 * 1024 * 1024),
+        )
+
+
+@dataclass(frozen=True, kw_only=True)
+class HttpConfig:
+    connect_timeout: timedelta
+    host_connections: int
+    keepalive_expiry: timedelta
+    read_timeout: timedelta
+
+    @classmethod
+    def from_env(cls, env: Env) -> Self:
+        return cls(
+            connect_timeout=timedelta(
+                seconds=env.get_int("http-connect-timeout", default=10)
+            ),
+            host_connections=env.get_int("http-host-connections", default=6),
+            keepalive_expiry=timedelta(
+                seconds=env.get_int("http-keepalive-expiry", default=30)
+            ),
+            read_timeout=timedelta(
+                seconds=env.get_int("http-read-timeout", default=60)
+            ),
         )
 
 
@@ -62,8 +117,10 @@ class MailConfig:
     token: str
 
     @classmethod
-    def from_env(cls, env: Env) -> Self | None:
-        mailbox_name = env.get_string("mailbox-name")
+    def from_env(
+        cls, env: Env, options: Mapping[str, str] = _NO_OPTIONS
+    ) -> Self | None:
+        mailbox_name = options.get("mailbox-name") or env.get_string("mailbox-name")
         token = env.get_string("token")
 
         if not (mailbox_name and token):
@@ -93,29 +150,66 @@ class HtmlSanitizerConfig:
         )
 
 
+class MastodonReaderType(str, Enum):
+    MASTODON_PY = "mastodon_py"
+    REST_API = "rest_api"
+
+
+class MastodonStreamType(str, Enum):
+    PUBLIC = "public"
+    PUBLIC_LOCAL = "public:local"
+    USER = "user"
+
+
 @dataclass(frozen=True, kw_only=True)
 class MastodonConfig:
+    access_token: str | None
+    """
+    A token for the streaming API. The user stream needs the token of an account
+    following the source account.
+    """
     api_base_url: str
     client_id: str
     client_secret: str
+    poll_interval: timedelta
+    """
+    The longest time between two polls while the stream is unavailable.
+    """
+    reader: MastodonReaderType
     source_account: str
+    stream: MastodonStreamType | None
+    """
+    The streaming timeline new toots are forwarded from when serving, or None to
+    forward them on schedule.
+    """
 
     @classmethod
-    def from_env(cls, env: Env) -> Self | None:
+    def from_env(
+        cls, env: Env, options: Mapping[str, str] = _NO_OPTIONS
+    ) -> Self | None:
         client_id = env.get_string("client-id")
         client_secret = env.get_string("client-secret")
-        source_account = env.get_string("source-account")
+        source_account = options.get("source-account") or env.get_string(
+            "source-account"
+        )
         if not (client_id and client_secret and source_account):
             return None
 
+        reader = env.get_string("reader", transform=MastodonReaderType)
+        stream = env.get_string("stream", transform=MastodonStreamType)
+
         return cls(
+            access_token=env.get_string("access-token"),
             api_base_url=env.get_string(
                 "api-base-url",
                 default="https://mastodon.social",
             ),
             client_id=client_id,
             client_secret=client_secret,
+            poll_interval=timedelta(seconds=env.get_int("poll-interval", default=300)),
+            reader=reader or MastodonReaderType.REST_API,
             source_account=source_account,
+            stream=stream,
         )
 
 
@@ -128,7 +222,9 @@ class RedditConfig:
     subreddit_filter: str | None
 
     @classmethod
-    def from_env(cls, env: Env) -> Self | None:
+    def from_env(
+        cls, env: Env, options: Mapping[str, str] = _NO_OPTIONS
+    ) -> Self | None:
         client_id = env.get_string("client-id")
         client_secret = env.get_string("client-secret")
 
@@ -139,8 +235,10 @@ class RedditConfig:
             client_id=client_id,
             client_secret=client_secret,
             user_agent=env.get_string("user-agent", default="twittergram"),
-            source_username=env.get_string("source-username", required=True),
-            subreddit_filter=env.get_string("subreddit-filter"),
+            source_username=options.get("source-username")
+            or env.get_string("source-username", required=True),
+            subreddit_filter=options.get("subreddit-filter")
+            or env.get_string("subreddit-filter"),
         )
 
 
@@ -149,17 +247,41 @@ class RssOrder(str, Enum):
     REVERSE_CHRONOLOGICAL = "reverse_chronological"
 
 
+class RssParserType(str, Enum):
+    ELEMENT_TREE = "element_tree"
+    RSS_PARSER = "rss_parser"
+
+
 @dataclass(frozen=True, kw_only=True)
 class RssConfig:
     order: RssOrder | None
-    feed_url: str
+    feed_urls: list[str]
+    """
+    The feeds to forward. Items of several feeds are merged by their publication
+    time.
+    """
+    parser: RssParserType
 
     @classmethod
-    def from_env(cls, env: Env) -> Self | None:
+    def from_env(
+        cls, env: Env, options: Mapping[str, str] = _NO_OPTIONS
+    ) -> Self | None:
+        order: RssOrder | None
+        if raw_order := options.get("order"):
+            order = RssOrder(raw_order)
+        else:
+            order = env.get_string("order", transform=RssOrder)
+
+        parser = env.get_string("parser", transform=RssParserType)
+
         try:
             return cls(
-                feed_url=env.get_string("feed-url", required=True),
-                order=env.get_string("order", transform=RssOrder),
+                # Several feeds are separated by whitespace
+                feed_urls=(
+                    options.get("feed-url") or env.get_string("feed-url", required=True)
+                ).split(),
+                order=order,
+                parser=parser or RssParserType.RSS_PARSER,
             )
         except ValueError:
             return None
@@ -183,6 +305,29 @@ class ConfigMapStateConfig:
             return None
 
 
+@dataclass(frozen=True, kw_only=True)
+class ScheduleConfig:
+    timezone: str | None
+    bluesky: str | None
+    mail: str | None
+    mastodon: str | None
+    reddit: str | None
+    rss: str | None
+    xcode: str | None
+
+    @classmethod
+    def from_env(cls, env: Env) -> Self:
+        return cls(
+            timezone=env.get_string("timezone"),
+            bluesky=env.get_string("bluesky"),
+            mail=env.get_string("mail"),
+            mastodon=env.get_string("mastodon"),
+            reddit=env.get_string("reddit"),
+            rss=env.get_string("rss"),
+            xcode=env.get_string("xcode"),
+        )
+
+
 @dataclass(frozen=True, kw_only=True)
 class StateConfig:
     type: str
@@ -197,22 +342,66 @@ class StateConfig:
             state_file=env.get_string("file-path"),
         )
 
+    def for_instance(self, instance_id: str) -> Self:
+        config_map = self.config_map
+        if config_map is not None:
+            config_map = replace(config_map, name_suffix=instance_id)
+
+        state_file = self.state_file
+        if state_file is not None:
+            path = Path(state_file)
+            state_file = str(path.with_stem(f"{path.stem}-{instance_id}"))
+
+        return replace(self, config_map=config_map, state_file=state_file)
+
 
 @dataclass(frozen=True, kw_only=True)
-class TelegramConfig:
-    target_chat: int
+class TelegramBotConfig:
+    """
+    The bot all instances send with.
+    """
+
+    api_url: str | None
     token: str
-    upload_chat: int
 
     @classmethod
     def from_env(cls, env: Env) -> Self:
         return cls(
-            target_chat=env.get_int("target-chat-id", required=True),
+            api_url=env.get_string("api-url"),
             token=env.get_string("token", required=True),
+        )
+
+
+@dataclass(frozen=True, kw_only=True)
+class TelegramConfig:
+    send_by_url: bool
+    target_chat: int
+    upload_chat: int
+
+    @classmethod
+    def from_env(cls, env: Env, target_chat: int | None = None) -> Self:
+        if target_chat is None:
+            target_chat = env.get_int("target-chat-id", required=True)
+
+        return cls(
+            send_by_url=env.get_string("send-by-url", default="false") == "true",
+            target_chat=target_chat,
             upload_chat=env.get_int("upload-chat-id", required=True),
         )
 
 
+@dataclass(frozen=True, kw_only=True)
+class InstanceConfig:
+    """
+    A single feed instance out of a manifest. Its values take precedence over the
+    ones from the environment.
+    """
+
+    id: str
+    target_chat: int
+    options: Mapping[str, str]
+
+
 @dataclass(frozen=True, kw_only=True)
 class Config:
     bluesky: BlueskyConfig | None
@@ -222,21 +411,31 @@ class Config:
     reddit: RedditConfig | None
     rss: RssConfig | None
     sanitizer: HtmlSanitizerConfig
+    schedule: ScheduleConfig
     sentry: SentryConfig
     state: StateConfig
     telegram: TelegramConfig
 
     @classmethod
-    def from_env(cls, env: Env) -> Self:
+    def from_env(cls, env: Env, instance: InstanceConfig | None = None) -> Self:
+        options = instance.options if instance else _NO_OPTIONS
+        state = StateConfig.from_env(env / "state")
+        if instance:
+            state = state.for_instance(instance.id)
+
         return cls(
-            bluesky=BlueskyConfig.from_env(env / "bluesky"),
+            bluesky=BlueskyConfig.from_env(env / "bluesky", options),
             download=DownloadConfig.from_env(env),
-            mail=MailConfig.from_env(env / "mail"),
-            mastodon=MastodonConfig.from_env(env / "mastodon"),
-            reddit=RedditConfig.from_env(env / "reddit"),
-            rss=RssConfig.from_env(env / "rss"),
+            mail=MailConfig.from_env(env / "mail", options),
+            mastodon=MastodonConfig.from_env(env / "mastodon", options),
+            reddit=RedditConfig.from_env(env / "reddit", options),
+            rss=RssConfig.from_env(env / "rss", options),
             sanitizer=HtmlSanitizerConfig.from_env(env),
+            schedule=ScheduleConfig.from_env(env / "schedule"),
             sentry=SentryConfig.from_env(env),
-            state=StateConfig.from_env(env / "state"),
-            telegram=TelegramConfig.from_env(env / "telegram"),
+            state=state,
+            telegram=TelegramConfig.from_env(
+                env / "telegram",
+                target_chat=instance.target_chat if instance else None,
+            ),
         )
@@ -1,3 +1,4 @@
 # mypy: implicit-reexport
 
 from .atproto import AtprotoBlueskyReader
+from .jetstream import JetstreamBlueskyStream, ReplayBlueskyStream
@@ -10,16 +10,16 @@ from atproto_client.models.app.bsky.embed.external import Main as ExternalEmbed
 from atproto_client.models.app.bsky.embed.images import Main as ImageEmbed
 
 from twittergram.application.exceptions.io import IoException
-from twittergram.application.model import URL, BlueskyPost, MediaType, Medium, NamedUrl
+from twittergram.application.model import BlueskyPost, Medium, NamedUrl
 from twittergram.application.ports import BlueskyReader
 from twittergram.config import BlueskyConfig
 
+from .blob import create_image_medium
+
 _LOG = logging.getLogger(__name__)
 
 
 class AtprotoBlueskyReader(BlueskyReader):
-    BLOB_URL = URL("https://bsky.social/xrpc/com.atproto.sync.getBlob")
-
     def __init__(self, config: BlueskyConfig) -> None:
         self.config = config
         self.session: str | None = None
@@ -94,7 +94,7 @@ class AtprotoBlueskyReader(BlueskyReader):
     def _extract_images(cls, did: str, embed: Any) -> list[Medium]:
         if isinstance(embed, ImageEmbed):
             return [
-                cls._create_image_medium(
+                create_image_medium(
                     did=did,
                     cid=image.image.cid.encode(),
                 )
@@ -113,12 +113,3 @@ class AtprotoBlueskyReader(BlueskyReader):
             )
 
         return None
-
-    @classmethod
-    def _create_image_medium(cls, did: str, cid: str) -> Medium:
-        url = cls.BLOB_URL.copy_set_param("cid", cid).copy_set_param("did", did)
-        return Medium(
-            url=str(url),
-            id=cid,
-            type=MediaType.PHOTO,
-        )
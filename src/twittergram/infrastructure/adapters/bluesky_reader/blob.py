@@ -0,0 +1,12 @@
+from twittergram.application.model import URL, MediaType, Medium
+
+BLOB_URL = URL("https://bsky.social/xrpc/com.atproto.sync.getBlob")
+
+
+def create_image_medium(did: str, cid: str) -> Medium:
+    url = BLOB_URL.copy_set_param("cid", cid).copy_set_param("did", did)
+    return Medium(
+        url=str(url),
+        id=cid,
+        type=MediaType.PHOTO,
+    )
@@ -0,0 +1,197 @@
+import asyncio
+import json
+import logging
+from collections.abc import AsyncIterator, Iterable
+from contextlib import asynccontextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from httpx import URL, AsyncClient, HTTPError
+from websockets.asyncio.client import ClientConnection, connect
+from websockets.exceptions import WebSocketException
+
+from twittergram.application.exceptions.io import IoException
+from twittergram.application.model import (
+    BlueskyPost,
+    BlueskyPostEvent,
+    Medium,
+    NamedUrl,
+)
+from twittergram.application.ports import BlueskyStream
+
+from .blob import create_image_medium
+
+_LOG = logging.getLogger(__name__)
+
+_POST_COLLECTION = "app.bsky.feed.post"
+_RESOLVE_HANDLE_URL = (
+    "https://public.api.bsky.app/xrpc/com.atproto.identity.resolveHandle"
+)
+
+
+def _build_post(did: str, commit: dict[str, Any]) -> BlueskyPost | None:
+    record = commit["record"]
+    if "reply" in record:
+        return None
+
+    embed = record.get("embed") or {}
+    images: list[Medium] = []
+    url: NamedUrl | None = None
+    match embed.get("$type"):
+        case "app.bsky.embed.images":
+            images = [
+                create_image_medium(did=did, cid=image["image"]["ref"]["$link"])
+                for image in embed["images"]
+            ]
+        case "app.bsky.embed.external":
+            external = embed["external"]
+            url = NamedUrl(url=external["uri"], title=external.get("title"))
+
+    return BlueskyPost(
+        created_at=datetime.fromisoformat(record["createdAt"]),
+        id=commit["cid"],
+        text=record.get("text") or None,
+        images=images,
+        url=url,
+    )
+
+
+def _parse_event(message: str | bytes, did: str | None) -> BlueskyPostEvent | None:
+    """
+    Parses a Jetstream event, returning only newly created posts of the author.
+    """
+    event = json.loads(message)
+    if event.get("kind") != "commit" or (did is not None and event["did"] != did):
+        return None
+
+    commit = event["commit"]
+    if commit["operation"] != "create" or commit["collection"] != _POST_COLLECTION:
+        return None
+
+    post = _build_post(event["did"], commit)
+    if post is None:
+        return None
+
+    return BlueskyPostEvent(cursor=event["time_us"], post=post)
+
+
+async def _events(
+    messages: AsyncIterator[str | bytes],
+    did: str | None,
+) -> AsyncIterator[BlueskyPostEvent]:
+    async for message in messages:
+        try:
+            event = _parse_event(message, did)
+        except (KeyError, TypeError, ValueError) as e:
+            raise IoException("Could not parse event") from e
+
+        if event is not None:
+            yield event
+
+
+class JetstreamBlueskyStream(BlueskyStream):
+    """
+    Subscribes to the posts of the author on a Jetstream instance, which serves
+    the commits of the network as JSON, filtered by collection and author.
+    """
+
+    def __init__(
+        self,
+        author_id: str,
+        jetstream_url: str,
+        client: AsyncClient,
+    ) -> None:
+        self._author_id = author_id
+        self._jetstream_url = URL(jetstream_url)
+        self._client = client
+        self._did: str | None = author_id if author_id.startswith("did:") else None
+
+    async def _resolve_did(self) -> str:
+        if self._did is not None:
+            return self._did
+
+        try:
+            response = await self._client.get(
+                _RESOLVE_HANDLE_URL,
+                params={"handle": self._author_id},
+            )
+        except HTTPError as e:
+            raise IoException from e
+
+        if not response.is_success:
+            raise IoException(f"Could not resolve handle {self._author_id}")
+
+        self._did = did = response.json()["did"]
+        return did
+
+    @staticmethod
+    async def _messages(
+        websocket: ClientConnection,
+    ) -> AsyncIterator[str | bytes]:
+        try:
+            async for message in websocket:
+                yield message
+        except WebSocketException as e:
+            raise IoException("Subscription was interrupted") from e
+
+    @asynccontextmanager
+    async def open(
+        self, cursor: int | None
+    ) -> AsyncIterator[AsyncIterator[BlueskyPostEvent]]:
+        did = await self._resolve_did()
+        params: dict[str, str | int] = {
+            "wantedCollections": _POST_COLLECTION,
+            "wantedDids": did,
+        }
+        if cursor is not None:
+            params["cursor"] = cursor
+
+        url = self._jetstream_url.copy_merge_params(params)
+        try:
+            async with connect(str(url)) as websocket:
+                _LOG.info("Subscribed to posts of %s", did)
+                yield _events(self._messages(websocket), did)
+        except (OSError, WebSocketException) as e:
+            raise IoException from e
+
+
+class ReplayBlueskyStream(BlueskyStream):
+    """
+    Replays Jetstream events recorded in a file, one message per line, as if they
+    were received from a subscription. It ends after the last one, like a closed
+    connection. This allows running without network access.
+    """
+
+    def __init__(self, path: Path, author_id: str) -> None:
+        self._path = path
+        # Handles can't be resolved offline, then the events aren't filtered
+        self._did = author_id if author_id.startswith("did:") else None
+
+    @staticmethod
+    async def _messages(lines: Iterable[str]) -> AsyncIterator[str]:
+        for line in lines:
+            if line.strip():
+                yield line
+
+    @asynccontextmanager
+    async def open(
+        self, cursor: int | None
+    ) -> AsyncIterator[AsyncIterator[BlueskyPostEvent]]:
+        try:
+            text = await asyncio.to_thread(self._path.read_text)
+        except OSError as e:
+            raise IoException from e
+
+        events = _events(self._messages(text.splitlines()), self._did)
+        yield self._since(events, cursor)
+
+    @staticmethod
+    async def _since(
+        events: AsyncIterator[BlueskyPostEvent],
+        cursor: int | None,
+    ) -> AsyncIterator[BlueskyPostEvent]:
+        async for event in events:
+            # Without a cursor, a subscription only receives new events
+            if cursor is not None and event.cursor >= cursor:
+                yield event
@@ -0,0 +1,4 @@
+# mypy: implicit-reexport
+
+from .client import HostLimitedTransport, create_http_client
+from .validators import conditional_headers, response_validators
@@ -0,0 +1,97 @@
+import asyncio
+from collections.abc import AsyncIterator
+
+from httpx import (
+    AsyncBaseTransport,
+    AsyncByteStream,
+    AsyncClient,
+    AsyncHTTPTransport,
+    Limits,
+    Request,
+    Response,
+    Timeout,
+)
+
+from twittergram.config import HttpConfig
+
+
+class _ReleasingStream(AsyncByteStream):
+    def __init__(self, stream: AsyncByteStream, semaphore: asyncio.Semaphore) -> None:
+        self._stream = stream
+        self._semaphore: asyncio.Semaphore | None = semaphore
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if self._semaphore is not None:
+                self._semaphore.release()
+                self._semaphore = None
+
+
+class HostLimitedTransport(AsyncBaseTransport):
+    """
+    Limits the number of concurrent requests per host. A request holds its slot
+    until its response has been closed, so streamed bodies count as well.
+    """
+
+    def __init__(self, transport: AsyncBaseTransport, host_connections: int) -> None:
+        if host_connections < 1:
+            raise ValueError(f"Invalid host connections: {host_connections}")
+
+        self._transport = transport
+        self._host_connections = host_connections
+        self._hosts: dict[str, asyncio.Semaphore] = {}
+
+    def _semaphore(self, host: str) -> asyncio.Semaphore:
+        semaphore = self._hosts.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self._host_connections)
+            self._hosts[host] = semaphore
+        return semaphore
+
+    async def handle_async_request(self, request: Request) -> Response:
+        semaphore = self._semaphore(request.url.host)
+        await semaphore.acquire()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            semaphore.release()
+            raise
+
+        return Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_ReleasingStream(
+                # Transports always return async streams
+                response.stream,  # type: ignore[arg-type]
+                semaphore,
+            ),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def create_http_client(config: HttpConfig) -> AsyncClient:
+    """
+    Creates a client with a connection pool that is meant to be shared by all
+    adapters in the process. Hosts supporting HTTP/2 multiplex their requests over a
+    single connection.
+    """
+    transport = AsyncHTTPTransport(
+        http2=True,
+        limits=Limits(keepalive_expiry=config.keepalive_expiry.total_seconds()),
+    )
+    return AsyncClient(
+        transport=HostLimitedTransport(transport, config.host_connections),
+        timeout=Timeout(
+            config.read_timeout.total_seconds(),
+            connect=config.connect_timeout.total_seconds(),
+        ),
+    )
@@ -0,0 +1,26 @@
+from httpx import Response
+
+from twittergram.application.model import CacheValidators
+
+
+def conditional_headers(validators: CacheValidators | None) -> dict[str, str]:
+    """
+    Builds the headers making a request conditional on the resource having changed
+    since the given validators were received.
+    """
+    headers = {}
+    if validators:
+        if validators.etag:
+            headers["If-None-Match"] = validators.etag
+        if validators.last_modified:
+            headers["If-Modified-Since"] = validators.last_modified
+    return headers
+
+
+def response_validators(response: Response) -> CacheValidators | None:
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if not (etag or last_modified):
+        return None
+
+    return CacheValidators(etag=etag, last_modified=last_modified)
@@ -1,3 +1,5 @@
 # mypy: implicit-reexport
 
-from .mastodon_py import MastodonPyMastodonReader
+# The mastodon_py module is only imported on demand, it imports Mastodon.py
+from .rest_api import RestApiMastodonReader
+from .streaming import SseMastodonStream
@@ -1,6 +1,6 @@
 import asyncio
 import logging
-from collections.abc import AsyncIterable, Iterable
+from collections.abc import AsyncGenerator, Iterable
 
 from mastodon import Mastodon
 from mastodon import return_types as mastotypes
@@ -17,6 +17,10 @@ class MastodonPyMastodonReader(MastodonReader):
     def __init__(self, config: MastodonConfig):
         self.config = config
 
+    @property
+    def source_account(self) -> str:
+        return self.config.source_account
+
     @property
     def _client(self) -> Mastodon:
         return Mastodon(
@@ -99,7 +103,7 @@ class MastodonPyMastodonReader(MastodonReader):
         self,
         user_id: int,
         until_id: int | None = None,
-    ) -> AsyncIterable[Toot]:
+    ) -> AsyncGenerator[Toot]:
         limit = 10 if until_id is None else None
 
         loop = asyncio.get_running_loop()
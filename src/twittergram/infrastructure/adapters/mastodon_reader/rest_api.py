@@ -0,0 +1,89 @@
+from collections.abc import AsyncGenerator
+
+from httpx import AsyncClient, HTTPError
+
+from twittergram.application.exceptions.io import IoException
+from twittergram.application.model import Toot
+from twittergram.application.ports import MastodonReader
+from twittergram.config import MastodonConfig
+
+from .status import parse_status
+
+# The largest page the API allows
+_PAGE_SIZE = 40
+
+
+class RestApiMastodonReader(MastodonReader):
+    """
+    Reads public toots from the Mastodon REST API. Toots are fetched page by page
+    while they are being iterated, following the pagination links of the API.
+    """
+
+    def __init__(self, config: MastodonConfig, client: AsyncClient) -> None:
+        self._config = config
+        self._client = client
+
+    @property
+    def source_account(self) -> str:
+        return self._config.source_account
+
+    def _url(self, path: str) -> str:
+        return f"{self._config.api_base_url.rstrip('/')}/api/v1/{path}"
+
+    async def lookup_user_id(self) -> int:
+        account_name = self._config.source_account
+        try:
+            response = await self._client.get(
+                self._url("accounts/lookup"),
+                params={"acct": account_name},
+            )
+        except HTTPError as e:
+            raise IoException from e
+
+        if response.status_code == 404:
+            raise IoException(f"Could not look up user {account_name}")
+        if not response.is_success:
+            raise IoException(f"Got unsuccessful response {response.status_code}")
+
+        return int(response.json()["id"])
+
+    async def list_toots(
+        self,
+        user_id: int,
+        until_id: int | None = None,
+    ) -> AsyncGenerator[Toot]:
+        url: str | None = self._url(f"accounts/{user_id}/statuses")
+        query: dict[str, str | int] = {
+            "exclude_replies": "true",
+            "exclude_reblogs": "true",
+            "limit": _PAGE_SIZE,
+        }
+        if until_id is not None:
+            query["since_id"] = until_id
+
+        params: dict[str, str | int] | None = query
+
+        while url:
+            try:
+                response = await self._client.get(url, params=params)
+            except HTTPError as e:
+                raise IoException from e
+
+            if not response.is_success:
+                raise IoException(f"Got unsuccessful response {response.status_code}")
+
+            statuses = response.json()
+            if not statuses:
+                return
+
+            for status in statuses:
+                toot = parse_status(status)
+                # The pagination links don't keep since_id
+                if until_id is not None and toot.id <= until_id:
+                    return
+
+                yield toot
+
+            # The next link already contains the query, which any params would replace
+            url = response.links.get("next", {}).get("url")
+            params = None
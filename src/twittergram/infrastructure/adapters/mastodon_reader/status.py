@@ -0,0 +1,42 @@
+import logging
+from datetime import datetime
+from typing import Any
+
+from twittergram.application.model import MediaType, Medium, Toot
+
+_LOG = logging.getLogger(__name__)
+
+
+def _parse_medium(raw: dict[str, Any]) -> Medium | None:
+    media_type: MediaType
+
+    match raw["type"]:
+        case "image":
+            media_type = MediaType.PHOTO
+        case "video":
+            media_type = MediaType.VIDEO
+        case "gifv":
+            media_type = MediaType.GIF
+        case other:
+            _LOG.warning("Unsupported media type %s", other)
+            return None
+
+    return Medium(
+        id=str(raw["id"]),
+        url=raw["url"],
+        type=media_type,
+    )
+
+
+def parse_status(raw: dict[str, Any]) -> Toot:
+    return Toot(
+        id=int(raw["id"]),
+        url=raw["url"],
+        content=raw["content"],
+        created_at=datetime.fromisoformat(raw["created_at"]),
+        media_attachments=[
+            medium
+            for raw_medium in raw["media_attachments"]
+            if (medium := _parse_medium(raw_medium))
+        ],
+    )
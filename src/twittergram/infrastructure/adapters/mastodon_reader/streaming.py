@@ -0,0 +1,137 @@
+import json
+import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
+
+from httpx import AsyncClient, HTTPError, Response
+
+from twittergram.application.exceptions.io import IoException
+from twittergram.application.model import Toot
+from twittergram.application.ports import MastodonStream
+from twittergram.config import MastodonConfig, MastodonStreamType
+
+from .status import parse_status
+
+_LOG = logging.getLogger(__name__)
+
+# Toots that aren't visible to everyone must not be forwarded
+_PUBLIC_VISIBILITIES = frozenset({"public", "unlisted"})
+
+
+async def _read_events(response: Response) -> AsyncIterator[tuple[str, str]]:
+    """
+    Yields the type and data of the server-sent events of the response.
+    """
+    event = "message"
+    data: list[str] = []
+    async for line in response.aiter_lines():
+        if not line:
+            if data:
+                yield event, "\n".join(data)
+            event = "message"
+            data = []
+            continue
+
+        field, _, value = line.partition(":")
+        value = value.removeprefix(" ")
+        match field:
+            case "":
+                # A comment, sent as a heartbeat
+                pass
+            case "event":
+                event = value
+            case "data":
+                data.append(value)
+
+
+def _is_forwarded(status: dict[str, Any], user_id: int) -> bool:
+    # The same toots the account statuses are listed with: no reblogs, and no
+    # replies except to the account itself
+    account_id = status["account"]["id"]
+    return (
+        account_id == str(user_id)
+        and status.get("reblog") is None
+        and status.get("in_reply_to_account_id") in (None, account_id)
+        and status.get("visibility") in _PUBLIC_VISIBILITIES
+    )
+
+
+class SseMastodonStream(MastodonStream):
+    """
+    Receives toots from the streaming API as server-sent events. The streaming
+    server is looked up from the instance, since it often runs on another host.
+    """
+
+    def __init__(
+        self,
+        config: MastodonConfig,
+        stream: MastodonStreamType,
+        client: AsyncClient,
+    ) -> None:
+        self._config = config
+        self._stream = stream
+        self._client = client
+        self._streaming_url: str | None = None
+
+    def _headers(self) -> dict[str, str]:
+        if token := self._config.access_token:
+            return {"Authorization": f"Bearer {token}"}
+        return {}
+
+    async def _lookup_streaming_url(self) -> str:
+        api_base_url = self._config.api_base_url.rstrip("/")
+        response = await self._client.get(f"{api_base_url}/api/v2/instance")
+        if not response.is_success:
+            raise IoException(f"Got unsuccessful response {response.status_code}")
+
+        streaming_url: str | None = (
+            response.json().get("configuration", {}).get("urls", {}).get("streaming")
+        )
+        if not streaming_url:
+            return api_base_url
+
+        # Websocket URLs are given, but the same host serves server-sent events
+        return (
+            streaming_url.rstrip("/")
+            .replace("wss://", "https://", 1)
+            .replace("ws://", "http://", 1)
+        )
+
+    @staticmethod
+    async def _toots(response: Response, user_id: int) -> AsyncIterator[Toot]:
+        try:
+            async for event, data in _read_events(response):
+                if event != "update":
+                    continue
+
+                status = json.loads(data)
+                if _is_forwarded(status, user_id):
+                    yield parse_status(status)
+        except HTTPError as e:
+            raise IoException("Stream was interrupted") from e
+        except (KeyError, ValueError) as e:
+            raise IoException("Could not parse status") from e
+
+    @asynccontextmanager
+    async def open(self, user_id: int) -> AsyncIterator[AsyncIterator[Toot]]:
+        try:
+            if self._streaming_url is None:
+                self._streaming_url = await self._lookup_streaming_url()
+
+            # The server-sent events endpoints name the stream in the path
+            path = self._stream.value.replace(":", "/")
+            async with self._client.stream(
+                "GET",
+                f"{self._streaming_url}/api/v1/streaming/{path}",
+                headers={"Accept": "text/event-stream", **self._headers()},
+            ) as response:
+                if not response.is_success:
+                    raise IoException(
+                        f"Got unsuccessful response {response.status_code}"
+                    )
+
+                _LOG.info("Connected to the %s stream", self._stream.value)
+                yield self._toots(response, user_id)
+        except HTTPError as e:
+            raise IoException from e
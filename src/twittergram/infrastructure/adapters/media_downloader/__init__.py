@@ -1,4 +1,8 @@
 # mypy: implicit-reexport
 
+from .cache import DownloadCache
 from .gallery_dl import GalleryDlMediaDownloader
 from .http import HttpMediaDownloader
+from .registry import DownloaderRegistry
+from .scheduler import DownloadLimits, LimitedDownloadScheduler
+from .workspace import DownloadWorkspace
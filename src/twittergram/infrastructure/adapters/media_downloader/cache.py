@@ -0,0 +1,308 @@
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import shutil
+from collections import Counter
+from collections.abc import Mapping
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+from pydantic import BaseModel, ValidationError
+
+_LOG = logging.getLogger(__name__)
+
+_MAX_AGE_PATTERN = re.compile(r"max-age=(\d+)")
+
+
+class CachedFile(BaseModel):
+    name: str
+    digest: str
+    mime_type: str
+    size: int
+
+
+class CacheEntry(BaseModel):
+    files: list[CachedFile]
+    etag: str | None = None
+    last_modified: str | None = None
+    expires: datetime | None = None
+    """
+    Until when the entry may be used without revalidation. If this is None and there
+    are no validators, the entry never expires.
+    """
+    last_used: datetime
+
+    @property
+    def size(self) -> int:
+        return sum(file.size for file in self.files)
+
+    def is_fresh(self, now: datetime) -> bool:
+        if self.expires is not None:
+            return now < self.expires
+
+        return self.etag is None and self.last_modified is None
+
+    def validators(self) -> dict[str, str]:
+        headers = {}
+        if self.etag is not None:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified is not None:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class _Index(BaseModel):
+    entries: dict[str, CacheEntry]
+
+
+def freshness_lifetime(headers: Mapping[str, str]) -> timedelta | None:
+    """
+    Determines how long a response may be used without revalidation based on its
+    Cache-Control header.
+    """
+    cache_control = headers.get("Cache-Control", "").lower()
+    if "no-cache" in cache_control or "no-store" in cache_control:
+        return timedelta()
+
+    if match := _MAX_AGE_PATTERN.search(cache_control):
+        return timedelta(seconds=int(match.group(1)))
+
+    return None
+
+
+class DownloadCache:
+    """
+    A persistent cache of downloaded media files. Entries are keyed by the URL they
+    were downloaded from, while the files themselves are stored by their content
+    hash, so identical files from different URLs are only stored once.
+
+    Once the files exceed the byte budget, the least recently used entries are
+    evicted. A budget of zero disables the cache.
+
+    The index is kept in memory in the order the entries were used. It's only
+    written when entries are evicted and when the cache is closed, so hits don't
+    touch the disk.
+    """
+
+    def __init__(self, directory: Path, max_size: int) -> None:
+        self.directory = directory
+        self.max_size = max_size
+        self._lock = asyncio.Lock()
+        self._index: _Index | None = None
+        self._references: Counter[str] = Counter()
+        self._size = 0
+        self._dirty = False
+
+    @property
+    def _index_file(self) -> Path:
+        return self.directory / "index.json"
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.directory / "blobs" / digest[:2] / digest
+
+    def _load_index(self) -> _Index:
+        if self._index is not None:
+            return self._index
+
+        try:
+            index = _Index.model_validate_json(self._index_file.read_bytes())
+        except FileNotFoundError:
+            index = _Index(entries={})
+        except ValidationError as e:
+            _LOG.warning("Discarding invalid download cache index", exc_info=e)
+            index = _Index(entries={})
+
+        # The entries are kept from least to most recently used
+        index.entries = dict(
+            sorted(index.entries.items(), key=lambda it: it[1].last_used)
+        )
+        for entry in index.entries.values():
+            self._reference(entry)
+        self._index = index
+
+        # Blobs added after the index was last written aren't referenced by it
+        blobs = self.directory / "blobs"
+        if blobs.is_dir():
+            for blob in blobs.glob("*/*"):
+                if blob.name not in self._references:
+                    blob.unlink(missing_ok=True)
+
+        return index
+
+    def _store_index(self, index: _Index) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        temp_file = self._index_file.with_suffix(".tmp")
+        temp_file.write_text(index.model_dump_json())
+        temp_file.replace(self._index_file)
+        self._dirty = False
+
+    def _reference(self, entry: CacheEntry) -> None:
+        self._references.update(file.digest for file in entry.files)
+        self._size += entry.size
+
+    def _remove(self, index: _Index, url: str) -> None:
+        entry = index.entries.pop(url)
+        self._size -= entry.size
+        for file in entry.files:
+            self._references[file.digest] -= 1
+            if self._references[file.digest] <= 0:
+                del self._references[file.digest]
+                self._blob_path(file.digest).unlink(missing_ok=True)
+        self._dirty = True
+
+    def _evict(self, index: _Index) -> bool:
+        evicted = False
+        while self._size > self.max_size and index.entries:
+            url = next(iter(index.entries))
+            _LOG.debug("Evicting %s from download cache", url)
+            self._remove(index, url)
+            evicted = True
+
+        return evicted
+
+    def _has_files(self, entry: CacheEntry) -> bool:
+        return all(self._blob_path(file.digest).is_file() for file in entry.files)
+
+    def _add_blob(self, path: Path) -> str:
+        with path.open("rb") as f:
+            digest = hashlib.file_digest(f, "sha256").hexdigest()
+
+        blob = self._blob_path(digest)
+        if not blob.exists():
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            temp_file = blob.with_suffix(".tmp")
+            _link_or_copy(path, temp_file)
+            temp_file.replace(blob)
+
+        return digest
+
+    async def get(self, url: str) -> CacheEntry | None:
+        if not self.max_size:
+            return None
+
+        async with self._lock:
+            index = await asyncio.to_thread(self._load_index)
+            entry = index.entries.get(url)
+            if entry is None:
+                return None
+
+            if not await asyncio.to_thread(self._has_files, entry):
+                _LOG.warning("Files for %s are missing from download cache", url)
+                self._remove(index, url)
+                return None
+
+            # Moves the entry to the most recently used end
+            del index.entries[url]
+            index.entries[url] = entry
+            entry.last_used = datetime.now(UTC)
+            self._dirty = True
+            return entry.model_copy()
+
+    async def refresh(self, url: str, lifetime: timedelta | None) -> None:
+        """
+        Marks an entry as valid again after the server confirmed it's unchanged.
+        """
+        async with self._lock:
+            index = await asyncio.to_thread(self._load_index)
+            if entry := index.entries.get(url):
+                entry.expires = _expiry(lifetime)
+                self._dirty = True
+
+    async def put(
+        self,
+        url: str,
+        files: list[tuple[Path, str]],
+        *,
+        etag: str | None = None,
+        last_modified: str | None = None,
+        lifetime: timedelta | None = None,
+    ) -> None:
+        """
+        Adds the given files, with their MIME types, as the content found at the
+        given URL. The files remain at their original paths.
+        """
+        if not self.max_size:
+            return
+
+        def _put() -> None:
+            # Loads the index before adding blobs, which it would discard otherwise
+            index = self._load_index()
+            cached_files = []
+            for path, mime_type in files:
+                cached_files.append(
+                    CachedFile(
+                        name=path.name,
+                        digest=self._add_blob(path),
+                        mime_type=mime_type,
+                        size=path.stat().st_size,
+                    )
+                )
+
+            entry = CacheEntry(
+                files=cached_files,
+                etag=etag,
+                last_modified=last_modified,
+                expires=_expiry(lifetime),
+                last_used=datetime.now(UTC),
+            )
+            # References the new files first, so blobs shared with the replaced
+            # entry are kept
+            self._reference(entry)
+            if url in index.entries:
+                self._remove(index, url)
+            index.entries[url] = entry
+            self._dirty = True
+
+            if self._evict(index):
+                self._store_index(index)
+
+        async with self._lock:
+            await asyncio.to_thread(_put)
+
+    async def restore(self, entry: CacheEntry, directory: Path) -> list[Path] | None:
+        """
+        Places the files of the given entry in the given directory.
+
+        :return: the paths of the files, or None if they have been evicted meanwhile
+        """
+
+        def _restore() -> list[Path] | None:
+            directory.mkdir(parents=True, exist_ok=True)
+            paths = []
+            for file in entry.files:
+                path = directory / file.name
+                path.unlink(missing_ok=True)
+                try:
+                    _link_or_copy(self._blob_path(file.digest), path)
+                except FileNotFoundError:
+                    return None
+                paths.append(path)
+            return paths
+
+        async with self._lock:
+            return await asyncio.to_thread(_restore)
+
+    async def close(self) -> None:
+        """
+        Writes the index if it changed since it was last written.
+        """
+        async with self._lock:
+            if self._index is not None and self._dirty:
+                await asyncio.to_thread(self._store_index, self._index)
+
+
+def _expiry(lifetime: timedelta | None) -> datetime | None:
+    if lifetime is None:
+        return None
+
+    return datetime.now(UTC) + lifetime
+
+
+def _link_or_copy(source: Path, target: Path) -> None:
+    # Hard links are free, but they don't work across file systems
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copyfile(source, target)
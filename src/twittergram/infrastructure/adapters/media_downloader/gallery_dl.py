@@ -1,34 +1,53 @@
 import logging
 import mimetypes
 from asyncio import subprocess
+from collections.abc import Sequence
 from pathlib import Path
 
-from httpx import URL
-
 from twittergram.application.model import MediaFile, MediaType, Medium
-from twittergram.application.ports import MediaDownloader
+from twittergram.application.ports import MediaDownloader, MediaRoute
+
+from .cache import DownloadCache
+from .workspace import DownloadWorkspace
 
 _LOG = logging.getLogger(__name__)
 
 
 class GalleryDlMediaDownloader(MediaDownloader):
-    def __init__(self, directory: Path):
-        self.directory = directory
+    def __init__(self, workspace: DownloadWorkspace, cache: DownloadCache):
+        self._workspace = workspace
+        self._cache = cache
 
-    async def is_supported(self, medium: Medium) -> bool:
-        if not medium.type == MediaType.PHOTO:
-            return False
+    @property
+    def routes(self) -> Sequence[MediaRoute]:
+        return [
+            MediaRoute(
+                media_type=MediaType.PHOTO,
+                host="www.reddit.com",
+                path_prefix="/gallery/",
+            )
+        ]
 
-        url = URL(medium.url)
-        if url.host == "www.reddit.com" and url.path.startswith("/gallery/"):
-            return True
+    async def download(self, medium: Medium) -> list[MediaFile]:
+        download_dir = await self._workspace.create_directory()
+        result: list[MediaFile] = []
+        try:
+            result = await self._download(medium, download_dir)
+            return result
+        finally:
+            if not result:
+                await self._workspace.remove_directory(download_dir)
 
-        return False
+    async def _download(self, medium: Medium, download_dir: Path) -> list[MediaFile]:
+        # Galleries can't be revalidated, but they don't change either
+        if entry := await self._cache.get(medium.url):
+            if paths := await self._cache.restore(entry, download_dir):
+                _LOG.debug("Using cached download of %s", medium.url)
+                return [
+                    MediaFile(medium=medium, path=path, mime_type=file.mime_type)
+                    for path, file in zip(paths, entry.files, strict=True)
+                ]
 
-    async def download(self, medium: Medium) -> list[MediaFile]:
-        if not await self.is_supported(medium):
-            raise ValueError("Unsupported medium")
-        download_dir = self.directory / medium.id
         gallery = await subprocess.create_subprocess_exec(
             "gallery-dl",
             "-w",
@@ -58,4 +77,9 @@ class GalleryDlMediaDownloader(MediaDownloader):
             )
             result.append(media_file)
 
+        await self._cache.put(
+            medium.url,
+            [(media_file.path, media_file.mime_type) for media_file in result],
+        )
+
         return result
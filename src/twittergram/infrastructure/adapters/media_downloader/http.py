@@ -1,37 +1,161 @@
 import logging
 import mimetypes
-import uuid
+from collections.abc import Sequence
+from datetime import UTC, datetime
 from pathlib import Path
 
 import aiofiles
-from aiofiles.os import makedirs
-from httpx import URL, AsyncClient
+import aiofiles.os
+from httpx import URL, AsyncClient, HTTPError, Response
 
 from twittergram.application.exceptions.io import IoException
 from twittergram.application.exceptions.media import UnsupportedMediaTypeException
 from twittergram.application.model import MediaFile, MediaType, Medium
-from twittergram.application.ports import MediaDownloader
+from twittergram.application.ports import MediaDownloader, MediaRoute
+
+from .cache import CacheEntry, DownloadCache, freshness_lifetime
+from .workspace import DownloadWorkspace
 
 _LOG = logging.getLogger(__name__)
 
+_CHUNK_SIZE = 64 * 1024
+
 
 class HttpMediaDownloader(MediaDownloader):
-    def __init__(self, directory: Path):
-        self.directory = directory
-        self._session = AsyncClient(
-            timeout=120,
-            follow_redirects=True,
-        )
-
-    async def is_supported(self, medium: Medium) -> bool:
-        if not medium.type == MediaType.PHOTO:
-            return False
+    def __init__(
+        self,
+        workspace: DownloadWorkspace,
+        max_file_size: int,
+        cache: DownloadCache,
+        client: AsyncClient,
+    ):
+        self._workspace = workspace
+        self.max_file_size = max_file_size
+        self._cache = cache
+        self._client = client
+
+    def _is_too_large(self, size: int, url: URL) -> bool:
+        if size > self.max_file_size:
+            _LOG.error(
+                "File at %s exceeds the maximum size of %d bytes. Skipping.",
+                url,
+                self.max_file_size,
+            )
+            return True
+
+        return False
 
-        url = URL(medium.url)
-        if url.host == "www.reddit.com" and url.path.startswith("/gallery/"):
+    async def _write_body(self, response: Response, path: Path) -> bool:
+        """
+        Writes the response body to the given path chunk by chunk, so that at most one
+        chunk is kept in memory. Bodies exceeding the maximum size are discarded
+        without reading them completely.
+
+        :return: whether the body has been written
+        """
+        content_length = response.headers.get("Content-Length")
+        if content_length is not None and self._is_too_large(
+            int(content_length),
+            response.url,
+        ):
             return False
 
-        return True
+        size = 0
+        async with aiofiles.open(path, "wb") as f:
+            async for chunk in response.aiter_bytes(_CHUNK_SIZE):
+                size += len(chunk)
+                if self._is_too_large(size, response.url):
+                    break
+
+                await f.write(chunk)
+            else:
+                return True
+
+        await aiofiles.os.remove(path)
+        return False
+
+    @property
+    def routes(self) -> Sequence[MediaRoute]:
+        return [MediaRoute(media_type=MediaType.PHOTO)]
+
+    async def _restore(
+        self,
+        medium: Medium,
+        entry: CacheEntry,
+        directory: Path,
+    ) -> list[MediaFile] | None:
+        paths = await self._cache.restore(entry, directory)
+        if paths is None:
+            return None
+
+        _LOG.debug("Using cached download of %s", medium.url)
+        return [
+            MediaFile(medium=medium, path=path, mime_type=file.mime_type)
+            for path, file in zip(paths, entry.files, strict=True)
+        ]
+
+    async def _fetch(
+        self,
+        medium: Medium,
+        directory: Path,
+        entry: CacheEntry | None,
+    ) -> list[MediaFile]:
+        result: list[MediaFile] = []
+
+        headers = entry.validators() if entry else {}
+        try:
+            async with self._client.stream(
+                "GET",
+                medium.url,
+                headers=headers,
+                follow_redirects=True,
+            ) as response:
+                match response.status_code:
+                    case 200:
+                        mime_type = response.headers.get("Content-Type")
+                        extension = mimetypes.guess_extension(mime_type) or ""
+                        path = directory / f"{medium.id}{extension}"
+
+                        if await self._write_body(response, path):
+                            media_file = MediaFile(
+                                medium=medium,
+                                path=path,
+                                mime_type=mime_type,
+                            )
+                            result.append(media_file)
+                            await self._cache.put(
+                                medium.url,
+                                [(path, mime_type)],
+                                etag=response.headers.get("ETag"),
+                                last_modified=response.headers.get("Last-Modified"),
+                                lifetime=freshness_lifetime(response.headers),
+                            )
+                    case 304 if entry is not None:
+                        await self._cache.refresh(
+                            medium.url,
+                            freshness_lifetime(response.headers),
+                        )
+                        if restored := await self._restore(medium, entry, directory):
+                            return restored
+
+                        # The files have been evicted since we looked up the entry
+                        return await self._fetch(medium, directory, entry=None)
+                    case status_code if 400 <= status_code < 500:
+                        _LOG.error(
+                            "Received status code %d for URL %s. Skipping.",
+                            status_code,
+                            medium.url,
+                        )
+                    case status_code if 500 <= status_code < 600:
+                        raise IoException(
+                            "Received server error %d for URL %s",
+                            status_code,
+                            medium.url,
+                        )
+        except HTTPError as e:
+            raise IoException from e
+
+        return result
 
     async def download(self, medium: Medium) -> list[MediaFile]:
         if medium.type != MediaType.PHOTO:
@@ -39,38 +163,20 @@ class HttpMediaDownloader(MediaDownloader):
                 f"MediaType {medium.type} is not supported"
             )
 
-        directory = self.directory / str(uuid.uuid4())
-        await makedirs(directory)
-
+        directory = await self._workspace.create_directory()
         result: list[MediaFile] = []
+        try:
+            result = await self._download(medium, directory)
+            return result
+        finally:
+            if not result:
+                await self._workspace.remove_directory(directory)
 
-        response = await self._session.get(medium.url)
-        match response.status_code:
-            case 200:
-                mime_type = response.headers.get("Content-Type")
-                extension = mimetypes.guess_extension(mime_type) or ""
-                path = directory / f"{medium.id}.{extension}"
-
-                async with aiofiles.open(path, "wb") as f:
-                    await f.write(response.content)
-
-                media_file = MediaFile(
-                    medium=medium,
-                    path=path,
-                    mime_type=mime_type,
-                )
-                result.append(media_file)
-            case status_code if 400 <= status_code < 500:
-                _LOG.error(
-                    "Received status code %d for URL %s. Skipping.",
-                    status_code,
-                    medium.url,
-                )
-            case status_code if 500 <= status_code < 600:
-                raise IoException(
-                    "Received server error %d for URL %s",
-                    status_code,
-                    medium.url,
-                )
+    async def _download(self, medium: Medium, directory: Path) -> list[MediaFile]:
+        entry = await self._cache.get(medium.url)
+        if entry is not None and entry.is_fresh(datetime.now(UTC)):
+            if restored := await self._restore(medium, entry, directory):
+                return restored
+            entry = None
 
-        return result
+        return await self._fetch(medium, directory, entry)
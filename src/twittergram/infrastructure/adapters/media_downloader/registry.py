@@ -0,0 +1,69 @@
+import logging
+from collections.abc import Sequence
+
+from httpx import URL
+
+from twittergram.application.model import MediaType
+from twittergram.application.ports import MediaDownloader
+
+_LOG = logging.getLogger(__name__)
+
+type _Routes = list[tuple[str, MediaDownloader]]
+
+
+class DownloaderRegistry:
+    """
+    Routes media to the downloaders declaring routes for them. The routes for a
+    media type and host are collected once and then looked up by that pair, so only
+    their path prefixes have to be checked for each medium.
+    """
+
+    def __init__(self, downloaders: Sequence[MediaDownloader]) -> None:
+        self._routes: dict[tuple[MediaType, str | None], _Routes] = {}
+        for downloader in downloaders:
+            for route in downloader.routes:
+                key = (route.media_type, route.host)
+                self._routes.setdefault(key, []).append((route.path_prefix, downloader))
+
+        for routes in self._routes.values():
+            # Stable, so earlier downloaders win between equally specific routes
+            routes.sort(key=lambda it: len(it[0]), reverse=True)
+
+        self._routes_by_host: dict[tuple[MediaType, str], _Routes] = {}
+
+        for line in self.routing_table():
+            _LOG.debug("Download route %s", line)
+
+    def _routes_for(self, media_type: MediaType, host: str) -> _Routes:
+        key = (media_type, host)
+        routes = self._routes_by_host.get(key)
+        if routes is None:
+            routes = [
+                *self._routes.get(key, []),
+                *self._routes.get((media_type, None), []),
+            ]
+            self._routes_by_host[key] = routes
+
+        return routes
+
+    def resolve(self, media_type: MediaType, url: URL) -> MediaDownloader | None:
+        for path_prefix, downloader in self._routes_for(media_type, url.host):
+            if url.path.startswith(path_prefix):
+                return downloader
+
+        return None
+
+    def routing_table(self) -> list[str]:
+        """
+        Describes all routes in the order they are checked, for debugging.
+        """
+        return [
+            f"{media_type.value} {host or '*'}{path_prefix or '/'}*"
+            f" -> {type(downloader).__name__}"
+            for (media_type, host), routes in sorted(
+                self._routes.items(),
+                # Hosts before wildcards
+                key=lambda it: (it[0][0].value, it[0][1] is None, it[0][1] or ""),
+            )
+            for path_prefix, downloader in routes
+        ]
@@ -0,0 +1,134 @@
+import asyncio
+import logging
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from httpx import URL
+
+from twittergram.application.model import MediaFile, Medium
+from twittergram.application.ports import DownloadScheduler, MediaWorkspace
+
+from .registry import DownloaderRegistry
+
+_LOG = logging.getLogger(__name__)
+
+
+class _FairSemaphore:
+    """
+    A semaphore that hands freed slots to the waiting owners in turn, so an owner
+    queueing many downloads can't starve the others.
+    """
+
+    def __init__(self, value: int) -> None:
+        if value < 1:
+            raise ValueError(f"Invalid concurrency: {value}")
+
+        self._value = value
+        # Dicts keep their insertion order, owners are moved to the end when served
+        self._waiters: dict[object, deque[asyncio.Future[None]]] = {}
+
+    def _remove_waiter(self, owner: object, future: asyncio.Future[None]) -> None:
+        waiters = self._waiters.get(owner)
+        if waiters is None:
+            return
+
+        try:
+            waiters.remove(future)
+        except ValueError:
+            pass
+
+        if not waiters:
+            del self._waiters[owner]
+
+    async def acquire(self, owner: object) -> None:
+        if self._value > 0 and not self._waiters:
+            self._value -= 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(owner, deque()).append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot has been handed to us right before the cancellation
+                self.release()
+            else:
+                self._remove_waiter(owner, future)
+            raise
+
+    def release(self) -> None:
+        while self._waiters:
+            owner = next(iter(self._waiters))
+            waiters = self._waiters.pop(owner)
+            future = waiters.popleft()
+            if waiters:
+                self._waiters[owner] = waiters
+
+            if not future.done():
+                future.set_result(None)
+                return
+
+        self._value += 1
+
+
+class DownloadLimits:
+    """
+    Limits the number of concurrent downloads in total and per host. A single
+    instance should be shared by all feeds, which get the free slots in turn.
+    """
+
+    def __init__(self, concurrency: int, host_concurrency: int) -> None:
+        self.concurrency = concurrency
+        self.host_concurrency = host_concurrency
+        self._global = _FairSemaphore(concurrency)
+        self._hosts: dict[str, _FairSemaphore] = {}
+
+    def _host(self, host: str) -> _FairSemaphore:
+        semaphore = self._hosts.get(host)
+        if semaphore is None:
+            semaphore = _FairSemaphore(self.host_concurrency)
+            self._hosts[host] = semaphore
+        return semaphore
+
+    @asynccontextmanager
+    async def slot(self, host: str, owner: object) -> AsyncIterator[None]:
+        # The host slot is taken first, so waiting for a busy host doesn't block a
+        # global slot that could be used for another host.
+        host_semaphore = self._host(host)
+        await host_semaphore.acquire(owner)
+        try:
+            await self._global.acquire(owner)
+            try:
+                yield
+            finally:
+                self._global.release()
+        finally:
+            host_semaphore.release()
+
+
+class LimitedDownloadScheduler(DownloadScheduler):
+    def __init__(
+        self,
+        registry: DownloaderRegistry,
+        limits: DownloadLimits,
+        workspace: MediaWorkspace,
+    ) -> None:
+        self._registry = registry
+        self._limits = limits
+        self._workspace = workspace
+
+    async def download(self, medium: Medium) -> list[MediaFile]:
+        url = URL(medium.url)
+        downloader = self._registry.resolve(medium.type, url)
+        if downloader is None:
+            _LOG.warning("No downloader supports %s", medium)
+            return []
+
+        async with self._limits.slot(url.host, owner=self):
+            return await downloader.download(medium)
+
+    async def discard(self, media_files: list[MediaFile]) -> None:
+        if media_files:
+            await self._workspace.release(media_files)
@@ -0,0 +1,129 @@
+import asyncio
+import logging
+import shutil
+import time
+import uuid
+from collections.abc import Iterable
+from datetime import timedelta
+from pathlib import Path
+
+from twittergram.application.model import MediaFile
+from twittergram.application.ports import MediaWorkspace
+
+_LOG = logging.getLogger(__name__)
+
+
+def _size_of(directory: Path) -> int:
+    return sum(path.stat().st_size for path in directory.rglob("*") if path.is_file())
+
+
+class DownloadWorkspace(MediaWorkspace):
+    """
+    The directory in which media are downloaded before they are sent. Every
+    download gets its own subdirectory, which is removed once its files are
+    released. Files that also went into the download cache are hard links, so
+    releasing them leaves the cached copy intact.
+
+    Subdirectories left behind by failed or crashed runs are removed by sweep, as
+    are the ones of this process that have been in use for longer than the maximum
+    age, which must have been leaked.
+    """
+
+    def __init__(self, directory: Path, quota: int, max_age: timedelta) -> None:
+        self.directory = directory
+        self.quota = quota
+        self.max_age = max_age
+        # The directories in use by this process, with the time they were created
+        self._active: dict[Path, float] = {}
+
+    async def create_directory(self) -> Path:
+        directory = self.directory / str(uuid.uuid4())
+        await asyncio.to_thread(directory.mkdir, parents=True)
+        self._active[directory] = time.time()
+        return directory
+
+    async def remove_directory(self, directory: Path) -> None:
+        self._active.pop(directory, None)
+        await asyncio.to_thread(shutil.rmtree, directory, ignore_errors=True)
+
+    def _directory_of(self, path: Path) -> Path | None:
+        try:
+            parts = path.relative_to(self.directory).parts
+        except ValueError:
+            return None
+
+        if len(parts) < 2:
+            return None
+
+        return self.directory / parts[0]
+
+    async def release(self, media_files: Iterable[MediaFile]) -> None:
+        directories = {
+            directory
+            for media_file in media_files
+            if (directory := self._directory_of(media_file.path))
+        }
+        for directory in directories:
+            _LOG.debug("Removing download directory %s", directory)
+            await self.remove_directory(directory)
+
+    async def sweep(self) -> None:
+        """
+        Removes download directories that are older than the maximum age. If the
+        remaining directories exceed the quota, the oldest ones that are not in use
+        by this process are removed until they fit.
+        """
+
+        def _sweep() -> None:
+            if not self.directory.is_dir():
+                return
+
+            max_mtime = time.time() - self.max_age.total_seconds()
+            total_size = 0
+            candidates: list[tuple[float, int, Path]] = []
+            for directory in self.directory.iterdir():
+                if not directory.is_dir():
+                    continue
+
+                try:
+                    size = _size_of(directory)
+                    mtime = directory.stat().st_mtime
+                except FileNotFoundError:
+                    # Removed by another process meanwhile
+                    continue
+
+                created_at = self._active.get(directory)
+                if created_at is not None:
+                    if created_at >= max_mtime:
+                        total_size += size
+                        continue
+
+                    _LOG.warning("Removing leaked download directory %s", directory)
+                    self._active.pop(directory, None)
+                    shutil.rmtree(directory, ignore_errors=True)
+                    continue
+
+                if mtime < max_mtime:
+                    _LOG.debug("Removing stale download directory %s", directory)
+                    shutil.rmtree(directory, ignore_errors=True)
+                    continue
+
+                total_size += size
+                candidates.append((mtime, size, directory))
+
+            for _, size, directory in sorted(candidates):
+                if total_size <= self.quota:
+                    break
+
+                _LOG.debug("Removing download directory %s over quota", directory)
+                shutil.rmtree(directory, ignore_errors=True)
+                total_size -= size
+
+            if total_size > self.quota:
+                _LOG.warning(
+                    "Downloads in use occupy %d bytes, exceeding the quota of %d",
+                    total_size,
+                    self.quota,
+                )
+
+        await asyncio.to_thread(_sweep)
@@ -1,12 +1,68 @@
+import logging
 from collections.abc import AsyncIterable
 from datetime import UTC, datetime
+from typing import Any
 
 import asyncpraw
 
-from twittergram.application.model import URL, RedditPost
+from twittergram.application.model import URL, MediaType, Medium, RedditPost
 from twittergram.application.ports import RedditReader
 from twittergram.config import RedditConfig
 
+_LOG = logging.getLogger(__name__)
+
+_EXTENSIONS = {
+    "image/gif": "gif",
+    "image/jpeg": "jpg",
+    "image/jpg": "jpg",
+    "image/png": "png",
+    "image/webp": "webp",
+}
+
+
+def _gallery_media(submission: Any) -> list[Medium] | None:
+    """
+    Resolves the images of a gallery submission to their direct i.redd.it URLs.
+
+    :return: the images in gallery order, or None if the gallery can't be resolved
+    completely
+    """
+    gallery_data = getattr(submission, "gallery_data", None)
+    media_metadata = getattr(submission, "media_metadata", None)
+    if not gallery_data or not media_metadata:
+        return None
+
+    result = []
+    for index, item in enumerate(gallery_data["items"]):
+        metadata = media_metadata.get(item["media_id"])
+        if metadata is None or metadata.get("status") != "valid":
+            return None
+
+        extension = _EXTENSIONS.get(metadata.get("m", ""))
+        if metadata.get("e") != "Image" or extension is None:
+            return None
+
+        result.append(
+            Medium(
+                type=MediaType.PHOTO,
+                id=f"{submission.id}-{index}",
+                url=f"https://i.redd.it/{item['media_id']}.{extension}",
+            )
+        )
+
+    return result
+
+
+def _media(submission: Any) -> list[Medium]:
+    if getattr(submission, "is_gallery", False):
+        if (media := _gallery_media(submission)) is not None:
+            return media
+
+        _LOG.info("Could not resolve gallery %s", submission.url)
+
+    # Unresolved galleries are left to gallery-dl
+    return [Medium(type=MediaType.PHOTO, id=submission.id, url=submission.url)]
+
 
 class PrawRedditReader(RedditReader):
     def __init__(self, config: RedditConfig) -> None:
@@ -38,4 +94,5 @@ class PrawRedditReader(RedditReader):
                     title=submission.title,
                     url=URL(submission.url),
                     subreddit_name=subreddit.display_name,
+                    media=_media(submission),
                 )
@@ -1,3 +1,5 @@
 # mypy: implicit-reexport
 
+from .element_tree import ElementTreeRssReader
+from .feed import HttpFeedRssReader
 from .rss_parser import RssParserRssReader
@@ -0,0 +1,148 @@
+import asyncio
+import logging
+from collections.abc import AsyncGenerator
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from enum import StrEnum
+from xml.etree.ElementTree import Element, ParseError, XMLPullParser
+
+import httpx
+
+from twittergram.application.exceptions.io import IoException
+from twittergram.application.model import URL, RssItem
+
+from .feed import HttpFeedRssReader
+
+_LOG = logging.getLogger(__name__)
+
+_CHUNK_SIZE = 64 * 1024
+# Feeds larger than this are parsed in a worker thread from here on
+_LOOP_PARSE_SIZE = 256 * 1024
+
+_ATOM = "{http://www.w3.org/2005/Atom}"
+
+
+class _Tag(StrEnum):
+    CHANNEL = "channel"
+    ITEM = "item"
+    ATOM_FEED = f"{_ATOM}feed"
+    ATOM_ENTRY = f"{_ATOM}entry"
+
+
+def _parse_date(value: str) -> datetime | None:
+    try:
+        return parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        pass
+
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def _build_item(element: Element) -> RssItem | None:
+    links = [URL(link.text.strip()) for link in element.iterfind("link") if link.text]
+
+    item_id: str | None = None
+    if guid := element.findtext("guid"):
+        item_id = guid.strip()
+    elif links:
+        item_id = str(links[0])
+
+    published_at: datetime | None = None
+    if raw_pub_date := element.findtext("pubDate"):
+        published_at = _parse_date(raw_pub_date.strip())
+
+    if item_id is None or published_at is None:
+        _LOG.warning("Skipping item without ID or publication date")
+        return None
+
+    return RssItem(
+        id=item_id,
+        title=element.findtext("title", default=""),
+        synopsis=element.findtext("description"),
+        published_at=published_at,
+        links=links,
+    )
+
+
+def _atom_text(element: Element, tag: str) -> str | None:
+    child = element.find(f"{_ATOM}{tag}")
+    if child is None:
+        return None
+
+    # XHTML text constructs contain markup instead of text
+    return "".join(child.itertext()).strip()
+
+
+def _build_entry(element: Element) -> RssItem | None:
+    links = [
+        URL(link.attrib["href"])
+        for link in element.iterfind(f"{_ATOM}link")
+        if "href" in link.attrib and link.get("rel", "alternate") == "alternate"
+    ]
+
+    published_at: datetime | None = None
+    if raw_date := _atom_text(element, "published") or _atom_text(element, "updated"):
+        published_at = _parse_date(raw_date)
+
+    entry_id = _atom_text(element, "id")
+    if not entry_id or published_at is None:
+        _LOG.warning("Skipping entry without ID or date")
+        return None
+
+    return RssItem(
+        id=entry_id,
+        title=_atom_text(element, "title") or "",
+        synopsis=_atom_text(element, "summary") or _atom_text(element, "content"),
+        published_at=published_at,
+        links=links,
+    )
+
+
+class ElementTreeRssReader(HttpFeedRssReader):
+    """
+    Parses RSS 2.0 and Atom feeds while they are being downloaded and yields each
+    item as soon as it's complete. Yielded items are dropped from the tree, and the
+    rest of the feed isn't downloaded if the iteration is stopped early.
+    """
+
+    async def _parse_items(self, response: httpx.Response) -> AsyncGenerator[RssItem]:
+        parser = XMLPullParser(events=("start", "end"))
+        container: Element | None = None
+        parsed_size = 0
+        try:
+            async for chunk in response.aiter_bytes(_CHUNK_SIZE):
+                if parsed_size < _LOOP_PARSE_SIZE:
+                    parser.feed(chunk)
+                else:
+                    # Keeps large feeds from blocking the event loop
+                    await asyncio.to_thread(parser.feed, chunk)
+                parsed_size += len(chunk)
+
+                for event in parser.read_events():
+                    match event:
+                        case (
+                            "start",
+                            Element(tag=_Tag.CHANNEL | _Tag.ATOM_FEED) as element,
+                        ):
+                            container = element
+                            continue
+                        case ("end", Element(tag=_Tag.ITEM) as element):
+                            item = _build_item(element)
+                        case ("end", Element(tag=_Tag.ATOM_ENTRY) as element):
+                            item = _build_entry(element)
+                        case _:
+                            continue
+
+                    if container is not None:
+                        # Parsed items are of no use to the tree anymore
+                        container.remove(element)
+
+                    if item is not None:
+                        yield item
+
+            parser.close()
+        except ParseError as e:
+            raise IoException("Could not parse feed") from e
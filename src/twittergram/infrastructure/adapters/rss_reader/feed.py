@@ -0,0 +1,63 @@
+import abc
+from collections.abc import AsyncGenerator, AsyncIterator
+from contextlib import aclosing, asynccontextmanager
+
+import httpx
+
+from twittergram.application.exceptions.io import IoException
+from twittergram.application.model import CacheValidators, Listing, RssItem
+from twittergram.application.ports import RssReader
+from twittergram.infrastructure.adapters.http_client import (
+    conditional_headers,
+    response_validators,
+)
+
+
+class HttpFeedRssReader(RssReader, abc.ABC):
+    """
+    Base for readers fetching the feed over HTTP. Requests with validators are
+    conditional, so unchanged feeds aren't downloaded again.
+    """
+
+    def __init__(self, feed_url: str, client: httpx.AsyncClient):
+        self._feed_url = feed_url
+        self._client = client
+
+    @property
+    def feed_url(self) -> str:
+        return self._feed_url
+
+    @abc.abstractmethod
+    def _parse_items(self, response: httpx.Response) -> AsyncGenerator[RssItem]:
+        """
+        Yields the items of the feed while reading the body of the response.
+        """
+
+    @asynccontextmanager
+    async def list_items(
+        self,
+        validators: CacheValidators | None,
+    ) -> AsyncIterator[Listing[RssItem]]:
+        try:
+            async with self._client.stream(
+                "GET",
+                self._feed_url,
+                headers=conditional_headers(validators),
+            ) as response:
+                if response.status_code == 304:
+                    # Skips parsing the feed if nothing changed
+                    yield Listing.unchanged(validators)
+                    return
+
+                if not response.is_success:
+                    raise IoException(
+                        f"Got unsuccessful response {response.status_code}"
+                    )
+
+                async with aclosing(self._parse_items(response)) as items:
+                    yield Listing(
+                        validators=response_validators(response),
+                        items=items,
+                    )
+        except httpx.HTTPError as e:
+            raise IoException from e
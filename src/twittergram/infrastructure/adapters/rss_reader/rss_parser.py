@@ -1,5 +1,6 @@
-from collections.abc import AsyncIterable
+from collections.abc import AsyncGenerator
 from typing import cast
+from xml.parsers.expat import ExpatError
 
 import httpx
 from rss_parser import RSSParser
@@ -11,25 +12,17 @@ from rss_parser.models.types.tag import Tag
 
 from twittergram.application.exceptions.io import IoException
 from twittergram.application.model import RssItem
-from twittergram.application.ports import RssReader
-from twittergram.config import RssConfig
 
+from .feed import HttpFeedRssReader
 
-class RssParserRssReader(RssReader):
-    def __init__(self, config: RssConfig):
-        self._feed_url = config.feed_url
-        self._client = httpx.AsyncClient()
 
-    async def list_items(self) -> AsyncIterable[RssItem]:
+class RssParserRssReader(HttpFeedRssReader):
+    async def _parse_items(self, response: httpx.Response) -> AsyncGenerator[RssItem]:
+        await response.aread()
         try:
-            response = await self._client.get(self._feed_url)
-        except httpx.RequestError as e:
-            raise IoException from e
-
-        if not response.is_success:
-            raise IoException(f"Got unsuccessful response {response.status_code}")
-
-        feed = cast(RSS, RSSParser.parse(response.text, schema=RSS))
+            feed = cast(RSS, RSSParser.parse(response.text, schema=RSS))
+        except (ExpatError, ValueError) as e:
+            raise IoException("Could not parse feed") from e
         channel = cast(Channel, feed.channel.content)
         for item_tag in cast(list[Tag[ParserRssItem]], channel.items):
             item = cast(ParserRssItem, item_tag.content)
@@ -1,3 +1,6 @@
 # mypy: implicit-reexport
 
+from .bot import TelegramBotSession
+from .file_cache import TelegramFileCache, TelegramFileStore
 from .ptb import PtbTelegramUploader
+from .rate_limiter import TelegramRateLimiter
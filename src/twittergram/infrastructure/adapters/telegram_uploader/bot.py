@@ -0,0 +1,40 @@
+import asyncio
+
+import telegram
+from telegram.request import HTTPXRequest
+
+from twittergram.config import TelegramBotConfig
+
+# Allows sending to the upload chat and the target chats at the same time
+_CONNECTION_POOL_SIZE = 4
+
+
+class TelegramBotSession:
+    """
+    The bot shared by all uploaders sending with the same token. It's initialized on
+    first use and keeps its HTTP connections alive until the session is closed.
+    """
+
+    def __init__(self, config: TelegramBotConfig) -> None:
+        self._config = config
+        self._bot: telegram.Bot | None = None
+        self._lock = asyncio.Lock()
+
+    async def get_bot(self) -> telegram.Bot:
+        async with self._lock:
+            if self._bot is None:
+                bot = telegram.Bot(
+                    token=self._config.token,
+                    base_url=self._config.api_url or "https://api.telegram.org/bot",
+                    request=HTTPXRequest(connection_pool_size=_CONNECTION_POOL_SIZE),
+                )
+                await bot.initialize()
+                self._bot = bot
+
+            return self._bot
+
+    async def close(self) -> None:
+        async with self._lock:
+            if self._bot is not None:
+                await self._bot.shutdown()
+                self._bot = None
@@ -0,0 +1,110 @@
+import asyncio
+from collections import OrderedDict
+from collections.abc import Mapping
+
+from twittergram.application.model import TelegramFileState
+from twittergram.application.repos import StateRepo
+
+_DEFAULT_MAX_SIZE = 1000
+
+
+class TelegramFileCache:
+    """
+    Maps the content hashes of uploaded files to their Telegram file IDs, so that
+    files we already sent don't have to be uploaded again. Beyond the maximum size,
+    the least recently used entries are evicted.
+
+    File IDs are only valid for the bot that uploaded the file, so a single instance
+    should be shared by everything sending with the same bot token.
+    """
+
+    def __init__(self, max_size: int = _DEFAULT_MAX_SIZE) -> None:
+        self.max_size = max_size
+        self._entries: OrderedDict[str, str] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _evict(self) -> None:
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def get(self, key: str) -> str | None:
+        file_id = self._entries.get(key)
+        if file_id is not None:
+            self._entries.move_to_end(key)
+        return file_id
+
+    def put(self, key: str, file_id: str) -> None:
+        self._entries[key] = file_id
+        self._entries.move_to_end(key)
+        self._evict()
+
+    def remove(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def entries(self) -> dict[str, str]:
+        """
+        Returns all entries, ordered from least to most recently used.
+        """
+        return dict(self._entries)
+
+    def merge(self, entries: Mapping[str, str]) -> None:
+        """
+        Adds previously stored entries, which are considered less recently used than
+        the entries that are already present.
+        """
+        merged = OrderedDict(
+            (key, file_id)
+            for key, file_id in entries.items()
+            if key not in self._entries
+        )
+        merged.update(self._entries)
+        self._entries = merged
+        self._evict()
+
+
+class TelegramFileStore:
+    """
+    Loads a shared file cache from the state once and stores it back whenever
+    entries were added or removed, and finally when closed. The state repo must not
+    belong to a single instance, so the cache is stored once instead of once per
+    instance.
+    """
+
+    def __init__(self, cache: TelegramFileCache, state_repo: StateRepo) -> None:
+        self._cache = cache
+        self._state_repo = state_repo
+        self._lock = asyncio.Lock()
+        self._loaded = False
+        self._stored_file_ids: dict[str, str] = {}
+
+    async def load(self) -> TelegramFileCache:
+        async with self._lock:
+            if not self._loaded:
+                state = await self._state_repo.load_state(TelegramFileState)
+                self._cache.merge(state.file_ids)
+                self._stored_file_ids = state.file_ids
+                self._loaded = True
+
+            return self._cache
+
+    async def _store(self, force: bool) -> None:
+        async with self._lock:
+            if not self._loaded:
+                return
+
+            file_ids = self._cache.entries()
+            # Entries that were only used again change the order, which isn't worth
+            # a write until the final one
+            if not force and file_ids == self._stored_file_ids:
+                return
+
+            await self._state_repo.store_state(TelegramFileState(file_ids=file_ids))
+            self._stored_file_ids = file_ids
+
+    async def store(self) -> None:
+        await self._store(force=False)
+
+    async def close(self) -> None:
+        await self._store(force=True)
@@ -1,130 +1,255 @@
 import asyncio
+import hashlib
 import logging
 from collections.abc import Awaitable, Callable
+from contextlib import ExitStack
 from datetime import timedelta
 from pathlib import Path
-from typing import cast
+from typing import BinaryIO, cast
 
-import aiofiles
 import telegram
 from telegram import InputMediaDocument
-from telegram.constants import ParseMode
-from telegram.error import RetryAfter
+from telegram.constants import MessageLimit, ParseMode
+from telegram.error import BadRequest, RetryAfter
 
-from twittergram.application.model import MediaFile, MediaType
+from twittergram.application.model import (
+    MediaFile,
+    MediaType,
+    Medium,
+)
 from twittergram.application.ports import TelegramUploader
 from twittergram.config import TelegramConfig
 
+from .bot import TelegramBotSession
+from .file_cache import TelegramFileStore
+from .rate_limiter import TelegramRateLimiter
+
 _LOG = logging.getLogger(__name__)
 
+# The rate limiter should prevent flood errors, so they're only retried a few times
+_MAX_ATTEMPTS = 3
 
-async def _auto_retry[T](func: Callable[[], Awaitable[T]]) -> T:
-    try:
-        return await func()
-    except RetryAfter as e:
-        _LOG.debug(
-            "Received RetryAfter exception, waiting for %d seconds",
-            e.retry_after,
-        )
-        retry_after = cast(timedelta, e.retry_after)
-        await asyncio.sleep(retry_after.total_seconds())
 
-    return await func()
+def _streamed_input_file(
+    fd: BinaryIO,
+    filename: str | None = None,
+    attach: bool = False,
+) -> telegram.InputFile:
+    # The file handle is passed on to the HTTP client, which reads it in chunks while
+    # sending the request, so a file is never loaded into memory as a whole. The
+    # handle must stay open until the request is done.
+    return telegram.InputFile(
+        fd,
+        filename=filename,
+        attach=attach,
+        read_file_handle=False,
+    )
 
 
 class PtbTelegramUploader(TelegramUploader):
-    def __init__(self, config: TelegramConfig):
+    def __init__(
+        self,
+        config: TelegramConfig,
+        session: TelegramBotSession,
+        rate_limiter: TelegramRateLimiter,
+        file_store: TelegramFileStore,
+    ):
         self.config = config
+        self._session = session
+        self._rate_limiter = rate_limiter
+        self._file_store = file_store
+
+    async def _get_bot(self) -> telegram.Bot:
+        return await self._session.get_bot()
+
+    async def _send[T](
+        self,
+        chat_id: int,
+        func: Callable[[], Awaitable[T]],
+        messages: int = 1,
+    ) -> T:
+        for attempt in range(1, _MAX_ATTEMPTS + 1):
+            await self._rate_limiter.acquire(chat_id, messages)
+            try:
+                return await func()
+            except RetryAfter as e:
+                if attempt == _MAX_ATTEMPTS:
+                    raise
+
+                _LOG.warning(
+                    "Received RetryAfter exception, waiting for %s",
+                    e.retry_after,
+                )
+                retry_after = cast(timedelta, e.retry_after)
+                await asyncio.sleep(retry_after.total_seconds())
+
+        raise AssertionError("unreachable")
+
+    async def flush(self) -> None:
+        await self._file_store.store()
+
+    async def close(self) -> None:
+        # The bot and the file cache are shared with other instances, so they're
+        # closed by their owners
+        pass
+
+    @staticmethod
+    async def _file_key(media_type: MediaType, file_path: Path) -> str:
+        def _digest() -> str:
+            with file_path.open("rb") as f:
+                return hashlib.file_digest(f, "sha256").hexdigest()
+
+        return f"{media_type.value}:{await asyncio.to_thread(_digest)}"
+
+    async def _send_file[T](
+        self,
+        key: str,
+        file_path: Path,
+        send: Callable[[str | telegram.InputFile], Awaitable[T]],
+        get_file_id: Callable[[T], str],
+    ) -> T:
+        """
+        Sends a file by its cached file ID if it has been uploaded before, and
+        uploads it otherwise.
+        """
+        file_cache = await self._file_store.load()
+
+        if file_id := file_cache.get(key):
+            try:
+                return await send(file_id)
+            except BadRequest as e:
+                _LOG.warning("Cached file ID for %s was rejected: %s", file_path, e)
+                file_cache.remove(key)
+
+        with file_path.open("rb") as fd:
+            result = await send(_streamed_input_file(fd))
+
+        file_cache.put(key, get_file_id(result))
+        return result
 
     async def _send_image(
         self,
         bot: telegram.Bot,
         chat_id: int,
         file_path: Path,
+        key: str,
         caption: str | None,
         use_html: bool,
     ) -> telegram.PhotoSize:
-        async with aiofiles.open(file_path, "rb") as fd:
-            input_file = telegram.InputFile(await fd.read())
-            message = await _auto_retry(
+        async def _send_photo(photo: str | telegram.InputFile) -> telegram.PhotoSize:
+            message = await self._send(
+                chat_id,
                 lambda: bot.send_photo(
                     chat_id=chat_id,
-                    photo=input_file,
+                    photo=photo,
                     caption=caption,
                     disable_notification=True,
                     parse_mode=ParseMode.HTML if use_html else None,
-                )
+                ),
             )
             return max(message.photo, key=lambda p: p.file_size or 0)
 
+        return await self._send_file(
+            key,
+            file_path,
+            _send_photo,
+            lambda photo: photo.file_id,
+        )
+
     async def _send_video(
         self,
         bot: telegram.Bot,
         chat_id: int,
         file_path: Path,
+        key: str,
         caption: str | None,
         use_html: bool,
     ) -> telegram.Video:
-        async with aiofiles.open(file_path, "rb") as fd:
-            input_file = telegram.InputFile(await fd.read())
-            message = await _auto_retry(
+        async def _send_video(video: str | telegram.InputFile) -> telegram.Video:
+            message = await self._send(
+                chat_id,
                 lambda: bot.send_video(
                     chat_id=chat_id,
-                    video=input_file,
+                    video=video,
                     caption=caption,
                     disable_notification=True,
                     parse_mode=ParseMode.HTML if use_html else None,
-                )
+                ),
             )
             return cast(telegram.Video, message.video)
 
+        return await self._send_file(
+            key,
+            file_path,
+            _send_video,
+            lambda video: video.file_id,
+        )
+
     async def _create_items(
         self,
         bot: telegram.Bot,
         files: list[MediaFile],
     ) -> list[telegram.InputMediaPhoto | telegram.InputMediaVideo]:
+        file_cache = await self._file_store.load()
         items: list[telegram.InputMediaPhoto | telegram.InputMediaVideo] = []
         chat_id = self.config.upload_chat
         for file in files:
+            key = await self._file_key(file.medium.type, file.path)
+            # Files we sent before don't need to go through the upload chat again
+            file_id = file_cache.get(key)
+
             media_type = file.medium.type
             if media_type == MediaType.VIDEO:
-                video = await self._send_video(
-                    bot,
-                    chat_id,
-                    file.path,
-                    caption=None,
-                    use_html=False,
-                )
-                items.append(telegram.InputMediaVideo(media=video))
+                if file_id is None:
+                    video = await self._send_video(
+                        bot,
+                        chat_id,
+                        file.path,
+                        key,
+                        caption=None,
+                        use_html=False,
+                    )
+                    file_id = video.file_id
+                items.append(telegram.InputMediaVideo(media=file_id))
             elif media_type == MediaType.PHOTO:
-                photo = await self._send_image(
-                    bot,
-                    chat_id,
-                    file.path,
-                    caption=None,
-                    use_html=False,
-                )
-                items.append(telegram.InputMediaPhoto(photo))
+                if file_id is None:
+                    photo = await self._send_image(
+                        bot,
+                        chat_id,
+                        file.path,
+                        key,
+                        caption=None,
+                        use_html=False,
+                    )
+                    file_id = photo.file_id
+                items.append(telegram.InputMediaPhoto(media=file_id))
             else:
                 raise ValueError(f"Unknown media type {media_type}")
 
         return items
 
+    async def _forget_files(self, files: list[MediaFile]) -> None:
+        file_cache = await self._file_store.load()
+        for file in files:
+            key = await self._file_key(file.medium.type, file.path)
+            file_cache.remove(key)
+
     async def send_text_message(
         self,
         text: str,
         use_html: bool = False,
     ) -> None:
-        async with telegram.Bot(token=self.config.token) as bot:
-            await _auto_retry(
-                lambda: bot.send_message(
-                    chat_id=self.config.target_chat,
-                    disable_notification=True,
-                    disable_web_page_preview=True,
-                    text=text,
-                    parse_mode=ParseMode.HTML if use_html else None,
-                )
-            )
+        bot = await self._get_bot()
+        await self._send(
+            self.config.target_chat,
+            lambda: bot.send_message(
+                chat_id=self.config.target_chat,
+                disable_notification=True,
+                disable_web_page_preview=True,
+                text=text,
+                parse_mode=ParseMode.HTML if use_html else None,
+            ),
+        )
 
     async def send_documents_message(
         self,
@@ -138,31 +263,34 @@ class PtbTelegramUploader(TelegramUploader):
             raise ValueError("No input documents")
 
         chat_id = self.config.target_chat
-        async with telegram.Bot(token=self.config.token) as bot:
+        bot = await self._get_bot()
+        is_multi_doc = len(documents) > 1
+        with ExitStack() as stack:
             input_files = []
-            is_multi_doc = len(documents) > 1
             for document in documents:
-                async with aiofiles.open(document.path, "rb") as fd:
-                    file_bytes = await fd.read()
-                    _LOG.info(
-                        "Document %s has %d bytes", document.path, len(file_bytes)
-                    )
-                    input_file = telegram.InputFile(
-                        file_bytes,
-                        filename=document.path.name,
-                        attach=is_multi_doc,
-                    )
-                    input_files.append(input_file)
+                _LOG.info(
+                    "Document %s has %d bytes",
+                    document.path,
+                    document.path.stat().st_size,
+                )
+                fd = stack.enter_context(document.path.open("rb"))
+                input_file = _streamed_input_file(
+                    fd,
+                    filename=document.path.name,
+                    attach=is_multi_doc,
+                )
+                input_files.append(input_file)
 
             if not is_multi_doc:
-                await _auto_retry(
+                await self._send(
+                    chat_id,
                     lambda: bot.send_document(
                         chat_id=chat_id,
                         document=input_file,
                         caption=caption,
                         disable_notification=disable_notification,
                         parse_mode=ParseMode.HTML if use_html else None,
-                    )
+                    ),
                 )
             else:
                 media = []
@@ -178,14 +306,77 @@ class PtbTelegramUploader(TelegramUploader):
                     )
                     media.append(doc)
 
-                await _auto_retry(
+                await self._send(
+                    chat_id,
                     lambda: bot.send_media_group(
                         chat_id=chat_id,
                         media=media,
                         disable_notification=disable_notification,
                         parse_mode=ParseMode.HTML if use_html else None,
-                    )
+                    ),
+                    messages=len(media),
+                )
+
+    @property
+    def sends_by_url(self) -> bool:
+        return self.config.send_by_url
+
+    async def send_image_urls_message(
+        self,
+        images: list[Medium],
+        caption: str | None,
+        use_html: bool = False,
+    ) -> bool:
+        if not images:
+            raise ValueError("No input images")
+
+        if any(image.type != MediaType.PHOTO for image in images):
+            return False
+
+        chat_id = self.config.target_chat
+        parse_mode = ParseMode.HTML if use_html else None
+        bot = await self._get_bot()
+        try:
+            if len(images) == 1:
+                await self._send(
+                    chat_id,
+                    lambda: bot.send_photo(
+                        chat_id=chat_id,
+                        photo=images[0].url,
+                        caption=caption,
+                        disable_notification=True,
+                        parse_mode=parse_mode,
+                    ),
                 )
+                return True
+
+            # Uploaded media groups get their caption as a separate message first.
+            # That message couldn't be taken back if Telegram rejected the URLs, so
+            # the caption has to go on the group itself.
+            if caption and len(caption) > MessageLimit.CAPTION_LENGTH:
+                return False
+
+            items = [
+                telegram.InputMediaPhoto(
+                    media=image.url,
+                    caption=caption if index == 0 else None,
+                    parse_mode=parse_mode,
+                )
+                for index, image in enumerate(images)
+            ]
+            await self._send(
+                chat_id,
+                lambda: bot.send_media_group(
+                    chat_id,
+                    items,
+                    disable_notification=True,
+                ),
+                messages=len(items),
+            )
+            return True
+        except BadRequest as e:
+            _LOG.info("Telegram couldn't send images by URL: %s", e)
+            return False
 
     async def send_image_message(
         self,
@@ -195,31 +386,50 @@ class PtbTelegramUploader(TelegramUploader):
     ) -> None:
         chat_id = self.config.target_chat
 
-        async with telegram.Bot(token=self.config.token) as bot:
-            if len(image_files) == 1:
-                await self._send_image(
-                    bot,
+        bot = await self._get_bot()
+        if len(image_files) == 1:
+            image_file = image_files[0]
+            await self._send_image(
+                bot,
+                chat_id,
+                image_file.path,
+                await self._file_key(MediaType.PHOTO, image_file.path),
+                caption,
+                use_html,
+            )
+        else:
+            items = await self._create_items(bot, image_files)
+            if caption:
+                await self._send(
+                    chat_id,
+                    lambda: bot.send_message(
+                        chat_id,
+                        caption,
+                        disable_notification=True,
+                        disable_web_page_preview=True,
+                        parse_mode=ParseMode.HTML if use_html else None,
+                    ),
+                )
+            try:
+                await self._send(
                     chat_id,
-                    image_files[0].path,
-                    caption,
-                    use_html,
+                    lambda: bot.send_media_group(
+                        chat_id,
+                        items,
+                        disable_notification=True,
+                    ),
+                    messages=len(items),
                 )
-            else:
+            except BadRequest as e:
+                _LOG.warning("Media group was rejected, uploading all items: %s", e)
+                await self._forget_files(image_files)
                 items = await self._create_items(bot, image_files)
-                if caption:
-                    await _auto_retry(
-                        lambda: bot.send_message(
-                            chat_id,
-                            caption,
-                            disable_notification=True,
-                            disable_web_page_preview=True,
-                            parse_mode=ParseMode.HTML if use_html else None,
-                        )
-                    )
-                await _auto_retry(
+                await self._send(
+                    chat_id,
                     lambda: bot.send_media_group(
                         chat_id,
                         items,
                         disable_notification=True,
-                    )
+                    ),
+                    messages=len(items),
                 )
@@ -0,0 +1,127 @@
+import asyncio
+import bisect
+import logging
+import time
+from collections.abc import Awaitable, Callable
+
+_LOG = logging.getLogger(__name__)
+
+# https://core.telegram.org/bots/faq#my-bot-is-hitting-limits-how-do-i-avoid-this
+_GLOBAL_MESSAGES_PER_SECOND = 30
+_CHAT_MESSAGES_PER_SECOND = 1
+_GROUP_MESSAGES_PER_MINUTE = 20
+
+
+class _Slots:
+    """
+    The send times reserved under a single limit, which are kept at least
+    `interval` seconds apart.
+    """
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self._times: list[float] = []
+
+    def __bool__(self) -> bool:
+        return bool(self._times)
+
+    def prune(self, now: float) -> None:
+        # Slots this old can't conflict with a send that happens now or later
+        del self._times[: bisect.bisect_right(self._times, now - self.interval)]
+
+    def earliest(self, after: float) -> float:
+        times = self._times
+        result = after
+        index = bisect.bisect_right(times, result - self.interval)
+        while index < len(times) and times[index] < result + self.interval:
+            result = times[index] + self.interval
+            index += 1
+
+        return result
+
+    def reserve(self, moment: float) -> None:
+        bisect.insort(self._times, moment)
+
+
+class TelegramRateLimiter:
+    """
+    Schedules sends ahead of time so that they stay within Telegram's rate limits:
+    one message per second per chat, 20 messages per minute per group and 30
+    messages per second in total. A single instance should be shared by everything
+    sending with the same bot token.
+
+    Each send reserves the earliest time all limits allow, so a send to an idle chat
+    doesn't have to wait for sends that are delayed by the limit of another chat.
+    """
+
+    def __init__(
+        self,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ) -> None:
+        self._clock = clock
+        self._sleep = sleep
+        self._global = _Slots(1 / _GLOBAL_MESSAGES_PER_SECOND)
+        self._chats: dict[int, _Slots] = {}
+        self._groups: dict[int, _Slots] = {}
+
+    def _limits(self, chat_id: int, now: float) -> list[_Slots]:
+        for slots_by_chat in (self._chats, self._groups):
+            # Forget chats that didn't send anything for a while
+            for other_id, slots in list(slots_by_chat.items()):
+                slots.prune(now)
+                if not slots and other_id != chat_id:
+                    del slots_by_chat[other_id]
+
+        limits = [self._global]
+        self._global.prune(now)
+
+        chat = self._chats.get(chat_id)
+        if chat is None:
+            chat = _Slots(1 / _CHAT_MESSAGES_PER_SECOND)
+            self._chats[chat_id] = chat
+        limits.append(chat)
+
+        # Groups, supergroups and channels have negative IDs
+        if chat_id < 0:
+            group = self._groups.get(chat_id)
+            if group is None:
+                group = _Slots(60 / _GROUP_MESSAGES_PER_MINUTE)
+                self._groups[chat_id] = group
+            limits.append(group)
+
+        return limits
+
+    def reserve(self, chat_id: int, messages: int = 1) -> float:
+        """
+        Reserves slots for the given number of messages to the given chat.
+
+        :return: the number of seconds to wait before sending
+        """
+        if messages < 1:
+            raise ValueError(f"Invalid message count: {messages}")
+
+        now = self._clock()
+        limits = self._limits(chat_id, now)
+
+        moments: list[float] = []
+        moment = now
+        for _ in range(messages):
+            # Each limit can only push the moment further, so this terminates
+            while True:
+                candidate = max(slots.earliest(moment) for slots in limits)
+                if candidate == moment:
+                    break
+                moment = candidate
+
+            for slots in limits:
+                slots.reserve(moment)
+            moments.append(moment)
+
+        return moments[0] - now
+
+    async def acquire(self, chat_id: int, messages: int = 1) -> None:
+        delay = self.reserve(chat_id, messages)
+        if delay > 0:
+            _LOG.debug("Delaying send to chat %d by %.2f seconds", chat_id, delay)
+            await self._sleep(delay)
@@ -0,0 +1,67 @@
+import json
+from collections.abc import Iterator
+from typing import Any
+
+_WHITESPACE = " \t\n\r"
+
+
+class JsonArrayParser:
+    """
+    Parses the elements of a JSON array incrementally, so they can be processed
+    while the rest of the document is still being downloaded. Only the elements
+    that haven't been returned yet are kept in memory.
+    """
+
+    def __init__(self) -> None:
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._started = False
+        self._finished = False
+
+    def _skip_whitespace(self, position: int) -> int:
+        while position < len(self._buffer) and self._buffer[position] in _WHITESPACE:
+            position += 1
+        return position
+
+    def feed(self, text: str) -> Iterator[Any]:
+        """
+        Adds the next part of the document and yields the elements completed by it.
+        """
+        self._buffer += text
+        position = self._skip_whitespace(0)
+
+        if not self._started and position < len(self._buffer):
+            if self._buffer[position] != "[":
+                raise ValueError("Document is not a JSON array")
+            self._started = True
+            position = self._skip_whitespace(position + 1)
+            if self._buffer.startswith("]", position):
+                self._finished = True
+
+        try:
+            while self._started and not self._finished:
+                try:
+                    element, end = self._decoder.raw_decode(self._buffer, position)
+                except json.JSONDecodeError:
+                    # The element is incomplete
+                    break
+
+                # Numbers may continue in the next part, so the element only counts
+                # once the separator after it has been read. Anything else is left
+                # unparsed, which close() reports.
+                separator = self._skip_whitespace(end)
+                if self._buffer.startswith(",", separator):
+                    position = self._skip_whitespace(separator + 1)
+                elif self._buffer.startswith("]", separator):
+                    position = separator + 1
+                    self._finished = True
+                else:
+                    break
+
+                yield element
+        finally:
+            self._buffer = self._buffer[position:]
+
+    def close(self) -> None:
+        if not self._finished:
+            raise ValueError("Incomplete JSON array")
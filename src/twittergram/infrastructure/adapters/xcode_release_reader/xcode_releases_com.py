@@ -1,36 +1,77 @@
-from collections.abc import AsyncIterable
+import logging
+from collections.abc import AsyncGenerator, AsyncIterator
+from contextlib import aclosing, asynccontextmanager
 from datetime import date
-from typing import Any, cast
+from typing import Any
 
-from httpx import AsyncClient, RequestError
+from httpx import AsyncClient, HTTPError, Response
 
 from twittergram.application.exceptions.io import IoException
-from twittergram.application.model import URL, XcodeRelease
+from twittergram.application.model import (
+    URL,
+    CacheValidators,
+    Listing,
+    XcodeRelease,
+)
 from twittergram.application.ports import XcodeReleaseReader
+from twittergram.infrastructure.adapters.http_client import (
+    conditional_headers,
+    response_validators,
+)
+
+from .json_array import JsonArrayParser
+
+_LOG = logging.getLogger(__name__)
 
 
 class XcrXcodeReleaseReader(XcodeReleaseReader):
-    def __init__(self) -> None:
-        self._client = AsyncClient(timeout=10)
+    def __init__(self, client: AsyncClient) -> None:
+        self._client = client
 
-    async def get_releases(self) -> AsyncIterable[XcodeRelease]:
+    @asynccontextmanager
+    async def get_releases(
+        self,
+        validators: CacheValidators | None,
+    ) -> AsyncIterator[Listing[XcodeRelease]]:
         try:
-            response = await self._client.get(
+            async with self._client.stream(
+                "GET",
                 "https://xcodereleases.com/data.json",
-                headers=dict(Accept="application/json"),
-            )
-        except RequestError as e:
-            raise IoException from e
+                headers={
+                    "Accept": "application/json",
+                    **conditional_headers(validators),
+                },
+            ) as response:
+                if response.status_code == 304:
+                    _LOG.debug("Releases haven't changed")
+                    yield Listing.unchanged(validators)
+                    return
 
-        if 500 <= response.status_code < 600:
-            raise IoException(f"Encountered server error {response.status_code}")
+                if not response.is_success:
+                    raise IoException(
+                        f"Got unsuccessful response {response.status_code}"
+                    )
 
-        raw_releases = cast(list[dict[str, Any]], response.json())
+                async with aclosing(self._parse_releases(response)) as releases:
+                    yield Listing(
+                        validators=response_validators(response),
+                        items=releases,
+                    )
+        except HTTPError as e:
+            raise IoException from e
 
-        for raw_release in raw_releases:
-            release = self._build_release(raw_release)
-            if release:
-                yield release
+    async def _parse_releases(self, response: Response) -> AsyncGenerator[XcodeRelease]:
+        # The releases are parsed as they arrive, newest first, so the rest of the
+        # document isn't even downloaded once the caller is done.
+        parser = JsonArrayParser()
+        try:
+            async for text in response.aiter_text():
+                for raw_release in parser.feed(text):
+                    if release := self._build_release(raw_release):
+                        yield release
+            parser.close()
+        except ValueError as e:
+            raise IoException("Could not parse releases") from e
 
     @staticmethod
     def _build_release(raw: dict[str, Any]) -> XcodeRelease | None:
@@ -1,3 +1,3 @@
 # mypy: implicit-reexport
 
-from .bs import BsStateRepo
+from .bs import BsStateBackend, BsStateRepo
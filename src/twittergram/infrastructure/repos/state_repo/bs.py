@@ -7,45 +7,72 @@ from bs_state import StateStorage
 
 from twittergram.application.model import State
 from twittergram.application.repos import StateRepo
+from twittergram.config import StateConfig
 
-type StorageLoader = Callable[[State], Awaitable[StateStorage[State]]]
+type StorageLoader = Callable[[State, StateConfig], Awaitable[StateStorage[State]]]
 
 
-class BsStateRepo(StateRepo):
+class BsStateBackend:
+    """
+    Loads the state storages of all instances in the process and keeps them until
+    it's closed. A storage is identified by the state config of its instance and
+    its state type.
+    """
+
     def __init__(self, storage_loader: StorageLoader):
         self._storages_lock = Lock()
-        self._storages: dict[type, StateStorage[Any]] = {}
+        self._storages: dict[tuple[StateConfig, type], StateStorage[Any]] = {}
         self.storage_loader = storage_loader
 
-    async def _load_storage[T: State](self, state_type: type[T]) -> StateStorage[T]:
-        return cast(StateStorage[T], await self.storage_loader(state_type.initial()))
+    async def _load_storage[T: State](
+        self,
+        config: StateConfig,
+        state_type: type[T],
+    ) -> StateStorage[T]:
+        storage = await self.storage_loader(state_type.initial(), config)
+        return cast(StateStorage[T], storage)
 
-    async def _get_storage[T: State](self, state_type: type[T]) -> StateStorage[T]:
-        storage = cast(StateStorage[T] | None, self._storages.get(state_type))
+    async def get_storage[T: State](
+        self,
+        config: StateConfig,
+        state_type: type[T],
+    ) -> StateStorage[T]:
+        key = (config, state_type)
+        storage = cast(StateStorage[T] | None, self._storages.get(key))
 
         if storage is not None:
             return storage
 
         async with self._storages_lock:
-            storage = cast(StateStorage[T] | None, self._storages.get(state_type))
+            storage = cast(StateStorage[T] | None, self._storages.get(key))
 
             if storage is None:
-                storage = await self._load_storage(state_type)
-                self._storages[state_type] = storage
+                storage = await self._load_storage(config, state_type)
+                self._storages[key] = storage
 
             return storage
 
+    async def close(self) -> None:
+        async with self._storages_lock:
+            async with asyncio.TaskGroup() as tg:
+                for state_storage in self._storages.values():
+                    tg.create_task(state_storage.close())
+            self._storages.clear()
+
+
+class BsStateRepo(StateRepo):
+    def __init__(self, backend: BsStateBackend, config: StateConfig):
+        self._backend = backend
+        self._config = config
+
     async def load_state[T: State](self, state_type: type[T]) -> T:
-        storage = await self._get_storage(state_type)
+        storage = await self._backend.get_storage(self._config, state_type)
         return await storage.load()
 
     async def store_state[T: State](self, state: T) -> None:
-        storage = await self._get_storage(type(state))
+        storage = await self._backend.get_storage(self._config, type(state))
         await storage.store(state)
 
     async def close(self) -> None:
-        async with self._storages_lock:
-            async with asyncio.TaskGroup() as tg:
-                for state_storage in self._storages.values():
-                    tg.create_task(state_storage.close())
-            self._storages.clear()
+        # The storages are shared with other instances and closed with the backend
+        pass
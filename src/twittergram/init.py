@@ -1,33 +1,45 @@
+import asyncio
 import logging
 from collections.abc import Iterable
+from dataclasses import dataclass
 from pathlib import Path
 
-import sentry_sdk
 from bs_config import Env
 from bs_state import StateStorage
-from injector import Injector, Module, multiprovider, provider
+from httpx import URL, AsyncClient
+from injector import Injector, Module, multiprovider, provider, singleton
 
 from twittergram.application import Application, ports, repos
 from twittergram.application.model import State
 from twittergram.config import (
+    BlueskyConfig,
     Config,
-    ConfigMapStateConfig,
+    DownloadConfig,
+    HttpConfig,
+    MastodonConfig,
+    MastodonReaderType,
     RedditConfig,
     RssConfig,
+    RssParserType,
+    ScheduleConfig,
     SentryConfig,
+    StateConfig,
+    TelegramBotConfig,
 )
-from twittergram.infrastructure.adapters import (
-    bluesky_reader,
-    html_sanitizer,
-    mail_reader,
-    mastodon_reader,
-    media_downloader,
-    reddit_reader,
-    rss_reader,
-    telegram_uploader,
-    xcode_release_reader,
+from twittergram.infrastructure.adapters.http_client import create_http_client
+from twittergram.infrastructure.adapters.media_downloader import (
+    DownloadCache,
+    DownloadLimits,
+    DownloadWorkspace,
+)
+from twittergram.infrastructure.adapters.telegram_uploader import (
+    TelegramBotSession,
+    TelegramFileCache,
+    TelegramFileStore,
+    TelegramRateLimiter,
 )
 from twittergram.infrastructure.repos import state_repo
+from twittergram.manifest import Manifest
 
 _LOG = logging.getLogger(__name__)
 
@@ -45,16 +57,175 @@ def _setup_sentry(config: SentryConfig) -> None:
         _LOG.warning("Sentry DSN not found")
         return
 
+    import sentry_sdk
+
     sentry_sdk.init(
         dsn=dsn,
         release=config.release,
     )
 
 
+class SharedModule(Module):
+    """
+    Bindings shared by all instances in the process. They must not depend on the
+    config of a single instance.
+    """
+
+    def __init__(
+        self,
+        download_config: DownloadConfig,
+        http_config: HttpConfig,
+        state_config: StateConfig,
+        telegram_bot_config: TelegramBotConfig,
+    ) -> None:
+        self.download_config = download_config
+        self.http_config = http_config
+        self.state_config = state_config
+        self.telegram_bot_config = telegram_bot_config
+
+    @singleton
+    @provider
+    def provide_http_client(self) -> AsyncClient:
+        # One connection pool, so connections are reused across feeds
+        return create_http_client(self.http_config)
+
+    @singleton
+    @provider
+    def provide_telegram_rate_limiter(self) -> TelegramRateLimiter:
+        # All instances send using the same bot token
+        return TelegramRateLimiter()
+
+    @singleton
+    @provider
+    def provide_telegram_bot_session(self) -> TelegramBotSession:
+        # One bot and connection pool for all instances
+        return TelegramBotSession(self.telegram_bot_config)
+
+    @staticmethod
+    def _camel_to_slug(value: str) -> str:
+        result = value[0].lower()
+        for char in value[1:]:
+            if char.isupper():
+                result += f"-{char.lower()}"
+            else:
+                result += char
+        return result
+
+    @classmethod
+    async def _load_state_storage(
+        cls,
+        initial_state: State,
+        config: StateConfig,
+    ) -> StateStorage[State]:
+        match config.type:
+            case "file":
+                from bs_state.implementation import file_storage
+
+                state_file = config.state_file
+                if not state_file:
+                    raise ValueError("State file path not configured")
+
+                return await file_storage.load(
+                    initial_state=initial_state,
+                    file=Path(state_file),
+                )
+            case "configmap":
+                from bs_state.implementation import config_map_storage
+
+                config_map_config = config.config_map
+                if not config_map_config:
+                    raise ValueError("ConfigMap state is not configured, but selected")
+
+                slug_name = cls._camel_to_slug(type(initial_state).__name__)
+                config_map_name = f"{config_map_config.name_prefix}-{slug_name}"
+                if config_map_config.name_suffix is not None:
+                    config_map_name = (
+                        f"{config_map_name}-{config_map_config.name_suffix}"
+                    )
+
+                return await config_map_storage.load(
+                    initial_state=initial_state,
+                    namespace=config_map_config.namespace,
+                    config_map_name=config_map_name,
+                )
+            case other:
+                raise ValueError(f"Unknown state repo type: {other}")
+
+    @singleton
+    @provider
+    def provide_state_backend(self) -> state_repo.BsStateBackend:
+        # Instances only differ in the state config their storages are loaded with
+        return state_repo.BsStateBackend(self._load_state_storage)
+
+    @singleton
+    @provider
+    def provide_telegram_file_store(
+        self,
+        backend: state_repo.BsStateBackend,
+    ) -> TelegramFileStore:
+        # File IDs belong to the bot, so they're stored once for all instances under
+        # the state config that isn't specific to an instance
+        return TelegramFileStore(
+            TelegramFileCache(),
+            state_repo.BsStateRepo(backend, self.state_config),
+        )
+
+    def _download_directory(self) -> Path:
+        download_directory = self.download_config.download_directory
+
+        if not download_directory:
+            raise ValueError("Missing download directory")
+
+        return download_directory
+
+    @singleton
+    @provider
+    def provide_download_cache(self) -> DownloadCache:
+        return DownloadCache(
+            self._download_directory() / "cache",
+            max_size=self.download_config.cache_size,
+        )
+
+    @singleton
+    @provider
+    def provide_download_limits(self) -> DownloadLimits:
+        return DownloadLimits(
+            concurrency=self.download_config.concurrency,
+            host_concurrency=self.download_config.host_concurrency,
+        )
+
+    @singleton
+    @provider
+    def provide_download_workspace(self) -> DownloadWorkspace:
+        return DownloadWorkspace(
+            self._download_directory() / "work",
+            quota=self.download_config.quota,
+            max_age=self.download_config.max_age,
+        )
+
+
 class ConfigsModule(Module):
     def __init__(self, config: Config) -> None:
         self.config = config
 
+    @provider
+    def provide_config(self) -> Config:
+        return self.config
+
+    @provider
+    def provide_bluesky_config(self) -> BlueskyConfig:
+        config = self.config.bluesky
+        if config is None:
+            raise ValueError("Missing Bluesky config")
+        return config
+
+    @provider
+    def provide_mastodon_config(self) -> MastodonConfig:
+        config = self.config.mastodon
+        if config is None:
+            raise ValueError("Missing mastodon config")
+        return config
+
     @provider
     def provide_reddit_config(self) -> RedditConfig:
         config = self.config.reddit
@@ -69,79 +240,38 @@ class ConfigsModule(Module):
             raise ValueError("Missing RSS config")
         return config
 
+    @provider
+    def provide_schedule_config(self) -> ScheduleConfig:
+        return self.config.schedule
+
 
 class ReposModule(Module):
     def __init__(self, config: Config) -> None:
         self.config = config
 
-    @staticmethod
-    def _create_file_repo(file_path: str) -> repos.StateRepo:
-        from bs_state.implementation import file_storage
-
-        async def load_file_storage(
-            initial_state: State,
-        ) -> StateStorage[State]:
-            return await file_storage.load(
-                initial_state=initial_state,
-                file=Path(file_path),
-            )
-
-        return state_repo.BsStateRepo(load_file_storage)
-
-    @staticmethod
-    def _camel_to_slug(value: str) -> str:
-        result = value[0].lower()
-        for char in value[1:]:
-            if char.isupper():
-                result += f"-{char.lower()}"
-            else:
-                result += char
-        return result
-
-    def _create_config_map_repo(self, config: ConfigMapStateConfig) -> repos.StateRepo:
-        from bs_state.implementation import config_map_storage
-
-        async def load_configmap_storage(
-            initial_state: State,
-        ) -> StateStorage[State]:
-            slug_name = self._camel_to_slug(type(initial_state).__name__)
-            config_map_name = f"{config.name_prefix}-{slug_name}"
-            if config.name_suffix is not None:
-                config_map_name = f"{config_map_name}-{config.name_suffix}"
-
-            return await config_map_storage.load(
-                initial_state=initial_state,
-                namespace=config.namespace,
-                config_map_name=config_map_name,
-            )
-
-        return state_repo.BsStateRepo(load_configmap_storage)
-
+    @singleton
     @provider
-    def provide_state_repo(self) -> repos.StateRepo:
-        state_type = self.config.state.type
-
-        match state_type:
-            case "file":
-                state_file = self.config.state.state_file
-                if not state_file:
-                    raise ValueError("State file path not configured")
-                return self._create_file_repo(state_file)
-            case "configmap":
-                config_map_config = self.config.state.config_map
-                if not config_map_config:
-                    raise ValueError("ConfigMap state is not configured, but selected")
-                return self._create_config_map_repo(config_map_config)
-            case _:
-                raise ValueError(f"Unknown state repo type: {state_type}")
+    def provide_state_repo(
+        self,
+        backend: state_repo.BsStateBackend,
+    ) -> repos.StateRepo:
+        return state_repo.BsStateRepo(backend, self.config.state)
 
 
 class PortsModule(Module):
+    """
+    Adapters are imported by their providers, so a command only pays for importing
+    the (often heavy) third-party packages of the ports it actually uses.
+    """
+
     def __init__(self, config: Config) -> None:
         self.config = config
 
+    @singleton
     @provider
     def provide_bluesky_reader(self) -> ports.BlueskyReader:
+        from twittergram.infrastructure.adapters import bluesky_reader
+
         config = self.config.bluesky
 
         if not config:
@@ -149,8 +279,32 @@ class PortsModule(Module):
 
         return bluesky_reader.AtprotoBlueskyReader(config)
 
+    @singleton
+    @provider
+    def provide_bluesky_stream(
+        self,
+        config: BlueskyConfig,
+        http_client: AsyncClient,
+    ) -> ports.BlueskyStream:
+        from twittergram.infrastructure.adapters import bluesky_reader
+
+        url = config.jetstream_url
+        if url is None:
+            raise ValueError("Bluesky streaming is not configured")
+
+        if url.startswith("file:"):
+            return bluesky_reader.ReplayBlueskyStream(
+                Path(URL(url).path),
+                config.author_id,
+            )
+
+        return bluesky_reader.JetstreamBlueskyStream(config.author_id, url, http_client)
+
+    @singleton
     @provider
     def provide_mail_reader(self) -> ports.MailReader:
+        from twittergram.infrastructure.adapters import mail_reader
+
         config = self.config.mail
 
         if not config:
@@ -158,8 +312,11 @@ class PortsModule(Module):
 
         return mail_reader.JmapcMailReader(config)
 
+    @singleton
     @provider
     def provide_html_sanitizer(self) -> ports.HtmlSanitizer:
+        from twittergram.infrastructure.adapters import html_sanitizer
+
         config = self.config.sanitizer
 
         match config.type:
@@ -168,62 +325,283 @@ class PortsModule(Module):
             case other:
                 raise ValueError(f"Unsupported HTML sanitizer type: {other}")
 
+    @singleton
     @provider
-    def provide_mastodon_reader(self) -> ports.MastodonReader:
+    def provide_mastodon_reader(self, http_client: AsyncClient) -> ports.MastodonReader:
+        from twittergram.infrastructure.adapters import mastodon_reader
+
         config = self.config.mastodon
         if not config:
             raise ValueError("Missing mastodon config")
 
-        return mastodon_reader.MastodonPyMastodonReader(config)
+        match config.reader:
+            case MastodonReaderType.MASTODON_PY:
+                from twittergram.infrastructure.adapters.mastodon_reader import (
+                    mastodon_py,
+                )
+
+                return mastodon_py.MastodonPyMastodonReader(config)
+            case MastodonReaderType.REST_API:
+                return mastodon_reader.RestApiMastodonReader(config, http_client)
 
+    @singleton
+    @provider
+    def provide_mastodon_stream(
+        self,
+        config: MastodonConfig,
+        http_client: AsyncClient,
+    ) -> ports.MastodonStream:
+        from twittergram.infrastructure.adapters import mastodon_reader
+
+        if config.stream is None:
+            raise ValueError("Mastodon streaming is not configured")
+
+        return mastodon_reader.SseMastodonStream(config, config.stream, http_client)
+
+    @singleton
     @provider
     def provide_reddit_reader(self, config: RedditConfig) -> ports.RedditReader:
+        from twittergram.infrastructure.adapters import reddit_reader
+
         return reddit_reader.PrawRedditReader(config)
 
-    @provider
-    def provide_rss_reader(self) -> ports.RssReader:
-        if rss_config := self.config.rss:
-            return rss_reader.RssParserRssReader(rss_config)
+    @singleton
+    @multiprovider
+    def provide_rss_readers(self, http_client: AsyncClient) -> list[ports.RssReader]:
+        from twittergram.infrastructure.adapters import rss_reader
 
-        raise ValueError("RSS config is missing")
+        rss_config = self.config.rss
+        if not rss_config:
+            raise ValueError("RSS config is missing")
 
+        reader_type: type[rss_reader.HttpFeedRssReader]
+        match rss_config.parser:
+            case RssParserType.ELEMENT_TREE:
+                reader_type = rss_reader.ElementTreeRssReader
+            case RssParserType.RSS_PARSER:
+                reader_type = rss_reader.RssParserRssReader
+
+        return [reader_type(feed_url, http_client) for feed_url in rss_config.feed_urls]
+
+    @singleton
     @provider
-    def provide_telegram_uploader(self) -> ports.TelegramUploader:
-        return telegram_uploader.PtbTelegramUploader(self.config.telegram)
+    def provide_telegram_uploader(
+        self,
+        session: TelegramBotSession,
+        rate_limiter: TelegramRateLimiter,
+        file_store: TelegramFileStore,
+    ) -> ports.TelegramUploader:
+        from twittergram.infrastructure.adapters import telegram_uploader
+
+        return telegram_uploader.PtbTelegramUploader(
+            self.config.telegram,
+            session,
+            rate_limiter,
+            file_store,
+        )
 
+    @singleton
     @multiprovider
-    def provide_media_downloader(self) -> list[ports.MediaDownloader]:
-        download_directory = self.config.download.download_directory
-
-        if not download_directory:
-            raise ValueError("Missing download directory")
+    def provide_media_downloader(
+        self,
+        cache: DownloadCache,
+        workspace: DownloadWorkspace,
+        http_client: AsyncClient,
+    ) -> list[ports.MediaDownloader]:
+        from twittergram.infrastructure.adapters import media_downloader
 
         return [
-            media_downloader.GalleryDlMediaDownloader(download_directory),
-            media_downloader.HttpMediaDownloader(download_directory),
+            media_downloader.GalleryDlMediaDownloader(workspace, cache),
+            media_downloader.HttpMediaDownloader(
+                workspace,
+                max_file_size=self.config.download.max_file_size,
+                cache=cache,
+                client=http_client,
+            ),
         ]
 
+    @singleton
     @provider
-    def provide_xcode_release_reader(self) -> ports.XcodeReleaseReader:
-        return xcode_release_reader.XcrXcodeReleaseReader()
+    def provide_download_scheduler(
+        self,
+        downloaders: list[ports.MediaDownloader],
+        limits: DownloadLimits,
+        workspace: DownloadWorkspace,
+    ) -> ports.DownloadScheduler:
+        from twittergram.infrastructure.adapters import media_downloader
+
+        return media_downloader.LimitedDownloadScheduler(
+            media_downloader.DownloaderRegistry(downloaders),
+            limits,
+            workspace,
+        )
 
+    @provider
+    def provide_media_workspace(
+        self,
+        workspace: DownloadWorkspace,
+    ) -> ports.MediaWorkspace:
+        return workspace
 
-def initialize(env_names: Iterable[str]) -> Application:
-    _setup_logging()
+    @singleton
+    @provider
+    def provide_xcode_release_reader(
+        self,
+        http_client: AsyncClient,
+    ) -> ports.XcodeReleaseReader:
+        from twittergram.infrastructure.adapters import xcode_release_reader
+
+        return xcode_release_reader.XcrXcodeReleaseReader(http_client)
+
+
+@dataclass(frozen=True, kw_only=True)
+class Instance:
+    id: str | None
+    source: str | None
+    """
+    The source this instance is restricted to, or None if it can run any use case.
+    """
+    schedule: str | None
+    app: Application
+
+
+@dataclass(frozen=True, kw_only=True)
+class Runtime:
+    concurrency: int | None
+    download_cache: DownloadCache | None
+    """
+    The cache shared by all instances, or None if no download directory is
+    configured. Its index is written after the instances are closed.
+    """
+    download_workspace: DownloadWorkspace | None
+    """
+    The workspace shared by all instances, or None if no download directory is
+    configured.
+    """
+    http_client: AsyncClient
+    """
+    The HTTP client shared by all instances. It's closed after the instances.
+    """
+    instances: list[Instance]
+    state_backend: state_repo.BsStateBackend
+    """
+    The state storages of all instances. They're closed after the instances.
+    """
+    telegram_session: TelegramBotSession
+    """
+    The bot shared by all instances. It's shut down after the instances.
+    """
+    telegram_file_store: TelegramFileStore
+    """
+    The file IDs uploaded by all instances. They're stored after the instances.
+    """
+
+    def instances_for(self, source: str) -> list[Instance]:
+        return [
+            instance
+            for instance in self.instances
+            if instance.source is None or instance.source == source
+        ]
 
-    config = Config.from_env(
-        Env.load(
-            include_default_dotenv=True,
-            additional_dotenvs=list(env_names),
-        )
-    )
-    _setup_sentry(config.sentry)
+    async def sweep_downloads(self) -> None:
+        if self.download_workspace is not None:
+            await self.download_workspace.sweep()
 
+    async def close(self) -> None:
+        async with asyncio.TaskGroup() as tg:
+            for instance in self.instances:
+                tg.create_task(instance.app.close())
+
+        await self.telegram_session.close()
+        await self.telegram_file_store.close()
+        if self.download_cache is not None:
+            await self.download_cache.close()
+        await self.state_backend.close()
+        await self.http_client.aclose()
+        await self.sweep_downloads()
+
+
+def _create_app(config: Config, shared: Injector) -> Application:
     injector = Injector(
         modules=[
             ConfigsModule(config),
             ReposModule(config),
             PortsModule(config),
-        ]
+        ],
+        parent=shared,
     )
     return Application(injector)
+
+
+def initialize(env_names: Iterable[str], manifest_path: Path | None) -> Runtime:
+    _setup_logging()
+
+    env = Env.load(
+        include_default_dotenv=True,
+        additional_dotenvs=list(env_names),
+    )
+    _setup_sentry(SentryConfig.from_env(env))
+    download_config = DownloadConfig.from_env(env)
+    shared = Injector(
+        modules=[
+            SharedModule(
+                download_config,
+                HttpConfig.from_env(env),
+                StateConfig.from_env(env / "state"),
+                TelegramBotConfig.from_env(env / "telegram"),
+            )
+        ],
+    )
+    http_client = shared.get(AsyncClient)
+    state_backend = shared.get(state_repo.BsStateBackend)
+    telegram_session = shared.get(TelegramBotSession)
+    telegram_file_store = shared.get(TelegramFileStore)
+    download_cache = (
+        shared.get(DownloadCache) if download_config.download_directory else None
+    )
+    download_workspace = (
+        shared.get(DownloadWorkspace) if download_config.download_directory else None
+    )
+
+    if manifest_path is None:
+        return Runtime(
+            concurrency=None,
+            download_cache=download_cache,
+            download_workspace=download_workspace,
+            http_client=http_client,
+            instances=[
+                Instance(
+                    id=None,
+                    source=None,
+                    schedule=None,
+                    app=_create_app(Config.from_env(env), shared),
+                )
+            ],
+            state_backend=state_backend,
+            telegram_session=telegram_session,
+            telegram_file_store=telegram_file_store,
+        )
+
+    manifest = Manifest.load(manifest_path)
+    instances = []
+    for source, manifest_instance in manifest.instances():
+        config = Config.from_env(env, manifest_instance.to_config())
+        instances.append(
+            Instance(
+                id=manifest_instance.id,
+                source=source,
+                schedule=manifest_instance.schedule,
+                app=_create_app(config, shared),
+            )
+        )
+
+    return Runtime(
+        concurrency=manifest.concurrency,
+        download_cache=download_cache,
+        download_workspace=download_workspace,
+        http_client=http_client,
+        instances=instances,
+        state_backend=state_backend,
+        telegram_session=telegram_session,
+        telegram_file_store=telegram_file_store,
+    )
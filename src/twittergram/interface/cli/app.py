@@ -1,25 +1,67 @@
+import asyncio
 import logging
 import sys
-from collections.abc import Coroutine
+from collections.abc import Awaitable, Callable, Coroutine
+from datetime import UTC, tzinfo
+from functools import partial
+from pathlib import Path
 from typing import Any
+from zoneinfo import ZoneInfo
 
 import click
 import uvloop
 
 from twittergram.application import Application
-from twittergram.init import initialize
+from twittergram.init import Instance, Runtime, initialize
+from twittergram.interface.scheduler import CronSchedule, Job, Scheduler, Service
 
 _LOG = logging.getLogger(__name__)
 
 
+type _UseCase = Callable[[Application], Awaitable[None]]
+
+# Command names and use cases by source, as named in the manifest and schedule config
+_USE_CASES: dict[str, tuple[str, _UseCase]] = {
+    "bluesky": ("forward-bluesky-posts", lambda app: app.forward_bluesky_posts()),
+    "mail": ("forward-mails", lambda app: app.forward_mails()),
+    "mastodon": ("forward-toots", lambda app: app.forward_toots()),
+    "reddit": ("forward-reddit-posts", lambda app: app.forward_reddit_posts()),
+    "rss": ("forward-rss-feed", lambda app: app.forward_rss_feed()),
+    "xcode": ("forward-xcode", lambda app: app.forward_xcode()),
+}
+
+# Service names, whether an instance streams, and use cases by source. Streaming
+# sources are forwarded by a service instead of their scheduled job.
+_STREAMS: dict[str, tuple[str, Callable[[Application], bool], _UseCase]] = {
+    "bluesky": (
+        "stream-bluesky-posts",
+        lambda app: app.streams_bluesky_posts,
+        lambda app: app.stream_bluesky_posts(),
+    ),
+    "mastodon": (
+        "stream-toots",
+        lambda app: app.streams_toots,
+        lambda app: app.stream_toots(),
+    ),
+}
+
+# Removes download directories left behind by failed runs while serving
+_SWEEP_DOWNLOADS_SCHEDULE = "*/15 * * * *"
+
+
 @click.group
 @click.pass_context
 @click.option("--env", multiple=True)
-def main(context: click.Context, env: list[str]) -> None:
-    context.obj = initialize(env)
+@click.option(
+    "--manifest",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    help="A TOML file listing the feed instances to run.",
+)
+def main(context: click.Context, env: list[str], manifest: Path | None) -> None:
+    context.obj = initialize(env, manifest)
 
 
-def _run_command(app: Application, command: Coroutine[Any, Any, Any]) -> None:
+def _run_command(runtime: Runtime, command: Coroutine[Any, Any, Any]) -> None:
     async def __run() -> None:
         try:
             await command
@@ -27,45 +69,164 @@ def _run_command(app: Application, command: Coroutine[Any, Any, Any]) -> None:
             _LOG.error("Got an exception", exc_info=e)
             sys.exit(1)
         finally:
-            await app.close()
+            await runtime.close()
 
     uvloop.run(__run())
 
 
+async def _run_instances(
+    instances: list[Instance],
+    use_case: _UseCase,
+    concurrency: int | None,
+) -> None:
+    if len(instances) == 1:
+        await use_case(instances[0].app)
+        return
+
+    semaphore = asyncio.Semaphore(concurrency or len(instances))
+    failed_ids: list[str | None] = []
+
+    async def _run_instance(instance: Instance) -> None:
+        async with semaphore:
+            _LOG.info("Running instance %s", instance.id)
+            try:
+                await use_case(instance.app)
+            except Exception as e:
+                _LOG.error("Instance %s failed", instance.id, exc_info=e)
+                failed_ids.append(instance.id)
+
+    async with asyncio.TaskGroup() as tg:
+        for instance in instances:
+            tg.create_task(_run_instance(instance))
+
+    if failed_ids:
+        raise RuntimeError(f"{len(failed_ids)} of {len(instances)} instances failed")
+
+
+def _run_use_case(runtime: Runtime, source: str) -> None:
+    instances = runtime.instances_for(source)
+    if not instances:
+        raise click.UsageError(f"The manifest contains no {source} instances")
+
+    _, use_case = _USE_CASES[source]
+    _run_command(runtime, _run_instances(instances, use_case, runtime.concurrency))
+
+
+@main.command
+@click.pass_obj
+def forward_bluesky_posts(runtime: Runtime) -> None:
+    _run_use_case(runtime, "bluesky")
+
+
 @main.command
 @click.pass_obj
-def forward_bluesky_posts(app: Application) -> None:
-    _run_command(app, app.forward_bluesky_posts())
+def forward_mails(runtime: Runtime) -> None:
+    _run_use_case(runtime, "mail")
 
 
 @main.command
 @click.pass_obj
-def forward_mails(app: Application) -> None:
-    _run_command(app, app.forward_mails())
+def forward_reddit_posts(runtime: Runtime) -> None:
+    _run_use_case(runtime, "reddit")
 
 
 @main.command
 @click.pass_obj
-def forward_reddit_posts(app: Application) -> None:
-    _run_command(app, app.forward_reddit_posts())
+def forward_rss_feed(runtime: Runtime) -> None:
+    _run_use_case(runtime, "rss")
 
 
 @main.command
 @click.pass_obj
-def forward_rss_feed(app: Application) -> None:
-    _run_command(app, app.forward_rss_feed())
+def forward_toots(runtime: Runtime) -> None:
+    _run_use_case(runtime, "mastodon")
 
 
 @main.command
 @click.pass_obj
-def forward_toots(app: Application) -> None:
-    _run_command(app, app.forward_toots())
+def forward_xcode(runtime: Runtime) -> None:
+    _run_use_case(runtime, "xcode")
+
+
+def _create_jobs(runtime: Runtime) -> list[Job]:
+    jobs = []
+    forwards = False
+    for instance in runtime.instances:
+        schedule_config = instance.app.schedule_config
+        sources = [instance.source] if instance.source else list(_USE_CASES)
+
+        for source in sources:
+            expression = instance.schedule or getattr(schedule_config, source)
+            if not expression:
+                continue
+
+            forwards = True
+            if (stream := _STREAMS.get(source)) and stream[1](instance.app):
+                continue
+
+            name, use_case = _USE_CASES[source]
+            if instance.id is not None:
+                name = f"{name}[{instance.id}]"
+
+            jobs.append(
+                Job(
+                    name=name,
+                    schedule=CronSchedule.parse(expression),
+                    run=partial(use_case, instance.app),
+                )
+            )
+
+    if forwards and runtime.download_workspace is not None:
+        jobs.append(
+            Job(
+                name="sweep-downloads",
+                schedule=CronSchedule.parse(_SWEEP_DOWNLOADS_SCHEDULE),
+                run=runtime.sweep_downloads,
+            )
+        )
+
+    return jobs
+
+
+def _create_services(runtime: Runtime) -> list[Service]:
+    services = []
+    for source, (name, streams, use_case) in _STREAMS.items():
+        for instance in runtime.instances_for(source):
+            schedule_config = instance.app.schedule_config
+            # Like the job it replaces, a service only runs if the source is forwarded
+            if not (instance.schedule or getattr(schedule_config, source)):
+                continue
+            if not streams(instance.app):
+                continue
+
+            service_name = name
+            if instance.id is not None:
+                service_name = f"{name}[{instance.id}]"
+
+            services.append(
+                Service(name=service_name, run=partial(use_case, instance.app))
+            )
+
+    return services
 
 
 @main.command
 @click.pass_obj
-def forward_xcode(app: Application) -> None:
-    _run_command(app, app.forward_xcode())
+def serve(runtime: Runtime) -> None:
+    timezone: tzinfo = UTC
+    if runtime.instances:
+        # All instances share the same environment
+        schedule_config = runtime.instances[0].app.schedule_config
+        if timezone_name := schedule_config.timezone:
+            timezone = ZoneInfo(timezone_name)
+
+    scheduler = Scheduler(
+        _create_jobs(runtime),
+        timezone=timezone,
+        concurrency=runtime.concurrency,
+        services=_create_services(runtime),
+    )
+    _run_command(runtime, scheduler.run())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,4 @@
+# mypy: implicit-reexport
+
+from .cron import CronSchedule
+from .scheduler import Job, Scheduler, Service
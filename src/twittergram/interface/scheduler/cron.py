@@ -0,0 +1,110 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Self
+
+
+def _parse_field(value: str, minimum: int, maximum: int) -> frozenset[int]:
+    result: set[int] = set()
+
+    for part in value.split(","):
+        range_part, has_step, raw_step = part.partition("/")
+        step = int(raw_step) if has_step else 1
+        if step < 1:
+            raise ValueError(f"Invalid step in cron field: {value}")
+
+        if range_part == "*":
+            start, end = minimum, maximum
+        elif "-" in range_part:
+            raw_start, raw_end = range_part.split("-", maxsplit=1)
+            start, end = int(raw_start), int(raw_end)
+        else:
+            start = int(range_part)
+            end = maximum if has_step else start
+
+        if not minimum <= start <= end <= maximum:
+            raise ValueError(f"Cron field out of range: {value}")
+
+        result.update(range(start, end + 1, step))
+
+    return frozenset(result)
+
+
+@dataclass(frozen=True, kw_only=True)
+class CronSchedule:
+    """
+    A classic five-field cron expression (minute, hour, day of month, month, day
+    of week), evaluated in the wall-clock time of the datetimes passed to it.
+    """
+
+    expression: str
+    minutes: frozenset[int]
+    hours: frozenset[int]
+    days_of_month: frozenset[int]
+    months: frozenset[int]
+    days_of_week: frozenset[int]
+    restricts_day_of_month: bool
+    restricts_day_of_week: bool
+
+    @classmethod
+    def parse(cls, expression: str) -> Self:
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Expected five fields in cron expression: {expression}")
+
+        minute, hour, day_of_month, month, day_of_week = fields
+        try:
+            return cls(
+                expression=expression,
+                minutes=_parse_field(minute, 0, 59),
+                hours=_parse_field(hour, 0, 23),
+                days_of_month=_parse_field(day_of_month, 1, 31),
+                months=_parse_field(month, 1, 12),
+                # Both 0 and 7 are Sunday
+                days_of_week=frozenset(
+                    day % 7 for day in _parse_field(day_of_week, 0, 7)
+                ),
+                restricts_day_of_month=day_of_month != "*",
+                restricts_day_of_week=day_of_week != "*",
+            )
+        except ValueError as e:
+            raise ValueError(f"Invalid cron expression: {expression}") from e
+
+    def _matches_day(self, moment: datetime) -> bool:
+        day_of_month_matches = moment.day in self.days_of_month
+        day_of_week_matches = (moment.weekday() + 1) % 7 in self.days_of_week
+
+        if self.restricts_day_of_month and self.restricts_day_of_week:
+            # Like cron, match if either of them matches
+            return day_of_month_matches or day_of_week_matches
+
+        return day_of_month_matches and day_of_week_matches
+
+    def next_after(self, moment: datetime) -> datetime:
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        # Expressions like "0 0 31 2 *" never match
+        limit = candidate + timedelta(days=5 * 366)
+
+        while candidate < limit:
+            if candidate.month not in self.months:
+                candidate = candidate.replace(day=1, hour=0, minute=0)
+                if candidate.month == 12:
+                    candidate = candidate.replace(year=candidate.year + 1, month=1)
+                else:
+                    candidate = candidate.replace(month=candidate.month + 1)
+                continue
+
+            if not self._matches_day(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+                continue
+
+            if candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+                continue
+
+            if candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+                continue
+
+            return candidate
+
+        raise ValueError(f"Cron expression never matches: {self.expression}")
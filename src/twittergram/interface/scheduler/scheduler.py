@@ -0,0 +1,137 @@
+import asyncio
+import logging
+import signal
+import time
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import dataclass
+from datetime import datetime, timedelta, tzinfo
+
+from .cron import CronSchedule
+
+_LOG = logging.getLogger(__name__)
+
+# The delay before a failed or stopped service is started again
+_SERVICE_RESTART_DELAY = 30.0
+
+
+@dataclass(frozen=True, kw_only=True)
+class Job:
+    name: str
+    schedule: CronSchedule
+    run: Callable[[], Awaitable[None]]
+
+
+@dataclass(frozen=True, kw_only=True)
+class Service:
+    """
+    Runs for as long as the scheduler does, instead of on schedule.
+    """
+
+    name: str
+    run: Callable[[], Awaitable[None]]
+
+
+class Scheduler:
+    def __init__(
+        self,
+        jobs: Sequence[Job],
+        timezone: tzinfo,
+        concurrency: int | None = None,
+        services: Sequence[Service] = (),
+    ) -> None:
+        self._jobs = list(jobs)
+        self._services = list(services)
+        self._timezone = timezone
+        self._semaphore = asyncio.Semaphore(concurrency or len(self._jobs) or 1)
+        self._stopping = asyncio.Event()
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    async def run(self) -> None:
+        if not (self._jobs or self._services):
+            raise ValueError("No jobs are scheduled")
+
+        loop = asyncio.get_running_loop()
+        stop_signals = [signal.SIGINT, signal.SIGTERM]
+        for stop_signal in stop_signals:
+            loop.add_signal_handler(stop_signal, self.stop)
+
+        _LOG.info(
+            "Scheduling %d jobs and %d services",
+            len(self._jobs),
+            len(self._services),
+        )
+        try:
+            async with asyncio.TaskGroup() as tg:
+                for job in self._jobs:
+                    tg.create_task(self._run_job(job))
+                for service in self._services:
+                    tg.create_task(self._run_service(service))
+        finally:
+            for stop_signal in stop_signals:
+                loop.remove_signal_handler(stop_signal)
+
+        _LOG.info("Scheduler stopped")
+
+    async def _sleep_until(self, moment: datetime) -> bool:
+        # Aware datetimes with the same tzinfo are subtracted in wall-clock time,
+        # which would be off by an hour across DST changes.
+        delay = max(0.0, moment.timestamp() - time.time())
+        try:
+            await asyncio.wait_for(self._stopping.wait(), timeout=delay)
+        except TimeoutError:
+            return True
+
+        return False
+
+    async def _run_job(self, job: Job) -> None:
+        while not self._stopping.is_set():
+            next_run = job.schedule.next_after(datetime.now(self._timezone))
+            _LOG.debug("Next run of job %s at %s", job.name, next_run)
+
+            if not await self._sleep_until(next_run):
+                return
+
+            # Runs never overlap: the next one is only scheduled after this one
+            # completed, so ticks during a long run are skipped.
+            async with self._semaphore:
+                _LOG.info("Running job %s", job.name)
+                try:
+                    await job.run()
+                except Exception as e:
+                    _LOG.error("Job %s failed", job.name, exc_info=e)
+
+    async def _run_service(self, service: Service) -> None:
+        # Services don't take part in the job concurrency limit, they would hold
+        # their slot forever.
+        while not self._stopping.is_set():
+            _LOG.info("Starting service %s", service.name)
+            task = asyncio.ensure_future(service.run())
+            stopping = asyncio.ensure_future(self._stopping.wait())
+            try:
+                await asyncio.wait(
+                    {task, stopping},
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+            finally:
+                stopping.cancel()
+                if not task.done():
+                    task.cancel()
+                    await asyncio.wait({task})
+
+            if self._stopping.is_set():
+                return
+
+            if task.cancelled():
+                _LOG.error("Service %s was cancelled", service.name)
+            elif error := task.exception():
+                _LOG.error("Service %s failed", service.name, exc_info=error)
+            else:
+                _LOG.warning("Service %s stopped", service.name)
+
+            restart_at = datetime.now(self._timezone) + timedelta(
+                seconds=_SERVICE_RESTART_DELAY
+            )
+            if not await self._sleep_until(restart_at):
+                return
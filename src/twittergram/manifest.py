@@ -0,0 +1,105 @@
+import tomllib
+from collections.abc import Iterable
+from enum import Enum
+from pathlib import Path
+from typing import Self
+
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
+
+from twittergram.config import InstanceConfig, RssOrder
+from twittergram.interface.scheduler import CronSchedule
+
+# The options each source accepts per instance, named like the respective env keys
+_SOURCE_OPTIONS: dict[str, frozenset[str]] = {
+    "bluesky": frozenset({"author-id"}),
+    "mail": frozenset({"mailbox-name"}),
+    "mastodon": frozenset({"source-account"}),
+    "reddit": frozenset({"source-username", "subreddit-filter"}),
+    "rss": frozenset({"feed-url", "order"}),
+    "xcode": frozenset(),
+}
+
+# The options whose values must be members of an enum, per source
+_ENUM_OPTIONS: dict[str, dict[str, type[Enum]]] = {
+    "rss": {"order": RssOrder},
+}
+
+
+class ManifestInstance(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    id: str
+    target_chat: int = Field(alias="target-chat")
+    schedule: str | None = None
+
+    @field_validator("schedule")
+    @classmethod
+    def _validate_schedule(cls, schedule: str | None) -> str | None:
+        # Fails on load rather than when the scheduler starts
+        if schedule is not None:
+            CronSchedule.parse(schedule)
+        return schedule
+
+    @property
+    def options(self) -> dict[str, str]:
+        extra = self.model_extra or {}
+        return {key: str(value) for key, value in extra.items()}
+
+    def to_config(self) -> InstanceConfig:
+        return InstanceConfig(
+            id=self.id,
+            target_chat=self.target_chat,
+            options=self.options,
+        )
+
+
+class Manifest(BaseModel):
+    """
+    A list of feed instances per source, which are run in a single process. Each
+    instance has its own target chat and state.
+    """
+
+    model_config = ConfigDict(extra="forbid")
+
+    concurrency: int = Field(default=4, ge=1)
+    bluesky: list[ManifestInstance] = []
+    mail: list[ManifestInstance] = []
+    mastodon: list[ManifestInstance] = []
+    reddit: list[ManifestInstance] = []
+    rss: list[ManifestInstance] = []
+    xcode: list[ManifestInstance] = []
+
+    @model_validator(mode="after")
+    def _validate_instances(self) -> Self:
+        ids: set[str] = set()
+        for source, instance in self.instances():
+            # The ID is used as state key, so it must be unique across sources
+            if instance.id in ids:
+                raise ValueError(f"Duplicate instance ID {instance.id}")
+            ids.add(instance.id)
+
+            unknown = set(instance.options) - _SOURCE_OPTIONS[source]
+            if unknown:
+                raise ValueError(
+                    f"Unknown options for {source} instance {instance.id}: "
+                    + ", ".join(sorted(unknown))
+                )
+
+            for key, enum_type in _ENUM_OPTIONS.get(source, {}).items():
+                value = instance.options.get(key)
+                if value is not None and value not in {m.value for m in enum_type}:
+                    raise ValueError(
+                        f"Invalid {key} for {source} instance {instance.id}: {value}"
+                    )
+
+        return self
+
+    def instances(self) -> Iterable[tuple[str, ManifestInstance]]:
+        for source in _SOURCE_OPTIONS:
+            for instance in getattr(self, source):
+                yield source, instance
+
+    @classmethod
+    def load(cls, path: Path) -> Self:
+        with path.open("rb") as f:
+            return cls.model_validate(tomllib.load(f))